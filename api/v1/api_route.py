@@ -1,6 +1,7 @@
 from fastapi import APIRouter
-from api.v1.endpoints import user, chat
+from api.v1.endpoints import user, chat, search
 
 router = APIRouter()
 router.include_router(user.router, prefix="/user", tags=["User"])
 router.include_router(chat.router, prefix="/chat", tags=["Chat"])
+router.include_router(search.router, prefix="/search", tags=["Search"])
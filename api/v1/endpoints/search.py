@@ -0,0 +1,83 @@
+from fastapi import APIRouter
+from dataclasses import asdict
+from typing import Optional
+from fastapi.responses import JSONResponse
+from repositories.single_flight import flight_stats
+from repositories.vector_repository import vector_repository
+from schemas.search_schema import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    GroupSearchRequest,
+    GroupSearchResponse,
+)
+import logging
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+
+@router.post("/batch", response_model=BatchSearchResponse)
+async def batch_search(request: BatchSearchRequest):
+    """여러 질의(벡터/텍스트, 질의별 필터)를 query_batch_points 1회로 검색 → 요청 순서대로 결과"""
+    from services.batch_search import batch_search_service
+
+    return await batch_search_service.search(request)
+
+
+@router.post("/groups", response_model=GroupSearchResponse)
+async def grouped_search(request: GroupSearchRequest):
+    """group_by payload(문서 id) 기준 서로 다른 문서 k 개와 문서별 상위 청크 (with_lookup: 문서 컬렉션 payload)"""
+    from services.grouped_search import grouped_search_service
+
+    return await grouped_search_service.search(request)
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """검색결과 캐시 hit/miss/eviction 카운터"""
+    return JSONResponse(content=vector_repository.cache.stats())
+
+
+@router.get("/payload-index/usage")
+async def payload_index_usage(collection_name: Optional[str] = None):
+    """검색 필터에 사용된 payload key / 인덱스 타입별 횟수"""
+    return JSONResponse(
+        content=vector_repository.payload_indexes.usage(collection_name)
+    )
+
+
+@router.get("/payload-index/advice")
+async def payload_index_advice(collection_name: str, min_uses: int = 1):
+    """필터 사용량 기준 인덱스 점검 (missing / exists / type_mismatch)"""
+    advice = await vector_repository.payload_index_advice(
+        collection_name, min_uses=min_uses
+    )
+    return JSONResponse(content=[asdict(a) for a in advice])
+
+
+@router.post("/payload-index/advice/apply")
+async def apply_payload_index_advice(collection_name: str, min_uses: int = 1):
+    """점검 결과 중 누락 인덱스 생성 (타입 불일치는 보고만) → 생성 key + 갱신된 점검 결과"""
+    created = await vector_repository.apply_payload_index_advice(
+        collection_name, min_uses=min_uses
+    )
+    advice = await vector_repository.payload_index_advice(
+        collection_name, min_uses=min_uses
+    )
+    return JSONResponse(
+        content={"created": created, "advice": [asdict(a) for a in advice]}
+    )
+
+
+@router.get("/planner/stats")
+async def planner_stats():
+    """검색 계획 전략(exact / hnsw / hnsw_boost)별 호출 수와 p50/p95/p99 지연시간"""
+    planner = vector_repository.planner
+    return JSONResponse(content=planner.stats() if planner else {})
+
+
+@router.get("/single-flight/stats")
+async def single_flight_stats():
+    """embedding / search / llm 그룹별 호출 수, 실제 실행 수, 합쳐진(collapsed) 호출 수"""
+    return JSONResponse(content=flight_stats())
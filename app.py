@@ -18,12 +18,37 @@ def create_app():
     from core.middleware import add_middleware
     from api.v1 import api_route
 
+    def load_tuned_profiles():
+        from repositories.collection_profile import load_profiles
+
+        try:
+            load_profiles()
+        except Exception as e:
+            logger.error(f"튜닝 프로파일 로드 실패: {e}")
+
+    async def ensure_payload_indexes():
+        from repositories.vector_repository import vector_repository
+
+        try:
+            await vector_repository.payload_indexes.ensure_configured(
+                vector_repository.client
+            )
+        except Exception as e:
+            logger.error(f"payload index 생성 실패: {e}")
+
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         from core.database import check_db_connection
+        from core.vector_db import init_vector_client, close_vector_client
         from services.kafka import KafkaInfluenceConsumer
 
         await check_db_connection()
+        # 튜닝된 컬렉션 프로파일 적용 (VectorSettings.tuned_profiles_file)
+        load_tuned_profiles()
+        # Qdrant 공유 클라이언트(연결풀) 생성
+        await init_vector_client()
+        # 선언된 payload 인덱스 생성 (VectorSettings.payload_indexes)
+        await ensure_payload_indexes()
 
         consumer = KafkaInfluenceConsumer(
             topics=["my-topic"],
@@ -36,6 +61,8 @@ def create_app():
         consumer.consume_messages(message_handler=test_handler)
         yield
 
+        await close_vector_client()
+
     # app설정
     app = FastAPI(title="test api", lifespan=lifespan)
 
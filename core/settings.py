@@ -1,5 +1,6 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 from pathlib import Path
 import os
 
@@ -28,11 +29,58 @@ class DatabaseSettings(BaseSettings):
 
 class VectorSettings(BaseSettings):
     vector_db_url: str
+    vector_db_api_key: Optional[str] = None
     vector_dim: int = 768
-    index_type: str = "IVF_FLAT"
+    # 기본 컬렉션 프로파일 (hnsw | hnsw_accurate | scalar | binary | product | multitenant | on_disk)
+    index_type: str = "hnsw"
+    # 컬렉션별 프로파일 지정 (env 에는 JSON, 예: {"docs": "scalar"})
+    collection_profiles: Dict[str, str] = {}
+    # 컬렉션별 payload 인덱스 선언 (env 에는 JSON, 예: {"docs": {"city": "keyword"}})
+    payload_indexes: Dict[str, Dict[str, str]] = {}
+    # 멀티테넌트 공유 컬렉션 → 테넌트 payload 키 (env 에는 JSON, 예: {"docs": "tenant_id"})
+    tenant_collections: Dict[str, str] = {}
+    tenant_key: str = "tenant_id"
+    # 튜닝 결과 프로파일 파일 (시작 시 로드, services.profile_tuner 가 기록)
+    tuned_profiles_file: str = "./mnt/tuned_profiles.json"
+    # AsyncQdrantClient 연결풀 설정
+    vector_pool_size: int = 20
+    vector_keepalive: int = 10
+    vector_timeout: int = 30
+    prefer_grpc: bool = False
+    # 대용량 적재(bulk upsert) 설정
+    upsert_batch_size: int = 256
+    upsert_parallel: int = 4
+    upsert_max_retries: int = 3
+    # 검색결과 캐시 (search_cache_size=0 이면 비활성)
+    search_cache_size: int = 1024
+    search_cache_ttl: float = 30.0
+    # 필터 선택도 기반 검색 계획 (후보 수 ≤ exact_max_points → exact,
+    # 선택도 < boost_selectivity → hnsw_ef=boost_ef, count 캐시 TTL 초)
+    planner_enabled: bool = True
+    planner_exact_max_points: int = 5000
+    planner_boost_selectivity: float = 0.05
+    planner_boost_ef: int = 256
+    planner_count_ttl: float = 60.0
+    # 동일 검색/임베딩/LLM 동시 호출을 1회 실행으로 합침 (single-flight)
+    single_flight_enabled: bool = True
+    # 다중 컬렉션 fan-out 검색 전체 제한 시간(초)
+    fanout_deadline: float = 1.0
+    # 하이브리드 검색 (fusion: rrf | dbsf, 분기별 prefetch 건수)
+    hybrid_fusion: str = "rrf"
+    hybrid_prefetch_limit: int = 20
+    # MMR 다양화 (mmr_lambda=None 이면 미사용, 1.0 에 가까울수록 관련도 우선 / 후보 N 건)
+    mmr_lambda: Optional[float] = Field(None, ge=0.0, le=1.0)
+    mmr_candidates: int = Field(50, ge=1)
+    # 임베딩 캐시 (모델명 + 본문 해시, 디스크 memmap + LRU)
+    embedding_cache_dir: str = "./mnt/embedding_cache"
+    embedding_cache_hot_size: int = 10000
+    # 질의 임베딩 마이크로 배치 (최대 건수, 최대 대기 초)
+    embed_batch_size: int = 64
+    embed_batch_delay: float = 0.005
 
     class Config(Config_):
         """env_prefix = "DB_"""
 
 
 db_setting = DatabaseSettings()
+vector_setting = VectorSettings()
@@ -0,0 +1,69 @@
+from typing import Optional
+import httpx
+from qdrant_client import AsyncQdrantClient
+from core.settings import vector_setting
+import logging
+
+logger = logging.getLogger(__name__)
+
+"""
+Qdrant 비동기 클라이언트 관리
+- 앱 전체에서 AsyncQdrantClient 하나를 공유한다(연결풀 재사용).
+- FastAPI lifespan에서 init_vector_client()/close_vector_client()로 열고 닫는다.
+- 블로킹 QdrantClient를 이벤트루프에서 호출하면 요청이 직렬화되므로 사용하지 않는다.
+"""
+_async_client: Optional[AsyncQdrantClient] = None
+
+
+def create_async_client(location: Optional[str] = None) -> AsyncQdrantClient:
+    """설정값 기준 AsyncQdrantClient 생성 (location=":memory:" 이면 로컬모드)"""
+    if location is not None:
+        return AsyncQdrantClient(location=location)
+
+    return AsyncQdrantClient(
+        url=vector_setting.vector_db_url,
+        api_key=vector_setting.vector_db_api_key,
+        timeout=vector_setting.vector_timeout,
+        prefer_grpc=vector_setting.prefer_grpc,
+        limits=httpx.Limits(
+            max_connections=vector_setting.vector_pool_size,
+            max_keepalive_connections=vector_setting.vector_keepalive,
+        ),
+    )
+
+
+async def init_vector_client(location: Optional[str] = None) -> AsyncQdrantClient:
+    """공유 클라이언트 생성 및 연결 확인"""
+    global _async_client
+
+    if _async_client is None:
+        _async_client = create_async_client(location)
+
+    try:
+        collections = await _async_client.get_collections()
+        logger.info(
+            f"Qdrant 연결 성공! collections: {[c.name for c in collections.collections]}"
+        )
+    except Exception as e:
+        logger.error(f"Qdrant 연결 실패: {e}")
+
+    return _async_client
+
+
+async def close_vector_client() -> None:
+    """공유 클라이언트 종료"""
+    global _async_client
+
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+        logger.info("Qdrant 연결 종료")
+
+
+def get_vector_client() -> AsyncQdrantClient:
+    """lifespan에서 생성된 공유 클라이언트 반환"""
+    if _async_client is None:
+        raise RuntimeError(
+            "Qdrant 클라이언트가 초기화되지 않았습니다. init_vector_client()를 먼저 호출하세요."
+        )
+    return _async_client
@@ -3,6 +3,7 @@
 import asyncio
 import numpy as np
 from qdrant_client import AsyncQdrantClient, models
+from repositories.vector_codec import ArrayBatch, to_query
 
 
 async def main():
@@ -30,20 +31,19 @@ async def main():
     ]
     vectors = np.random.rand(len(documents), vector_dim)
 
-    # 4. 벡터DB에 데이터 업로드 (비동기)
-    points = [
-        models.PointStruct(
-            id=i, vector=vectors[i].tolist(), payload={"text": documents[i]}
-        )
-        for i in range(len(documents))
-    ]
-    await client.upsert(collection_name=collection_name, points=points)
+    # 4. 벡터DB에 데이터 업로드 (비동기) - ndarray 배치를 그대로 전달
+    batch = ArrayBatch.of(
+        ids=np.arange(len(documents)),
+        vectors=vectors,
+        payloads=[{"text": doc} for doc in documents],
+    )
+    await client.upsert(collection_name=collection_name, points=batch.to_models())
 
     # 5. 검색 쿼리(임베딩) 생성 및 유사도 검색 (비동기)
-    query_vector = np.random.rand(vector_dim).tolist()
+    query_vector = np.random.rand(vector_dim)
     results = await client.query_points(
         collection_name=collection_name,
-        query=query_vector,
+        query=to_query(query_vector),
         limit=2,  # 상위 2개 결과 반환
     )
 
@@ -0,0 +1,408 @@
+# repositories/bulk_loader.py
+"""
+파일 기반 대용량 적재 (.npy / Parquet → Qdrant)
+- .npy 임베딩 행렬은 np.load(mmap_mode="r") 로 열어 필요한 행만 읽는다
+- Parquet 는 row group / record batch 단위로 읽는다 (벡터 컬럼 FixedSizeList 또는 list)
+- payload 는 같은 행 순서의 .parquet / .ndjson(.jsonl) 파일
+- 행 범위를 task 로 나눠 프로세스 풀에서 worker 별로 업로드 → worker 당 메모리는 배치 1개 분량
+- id 는 (namespace, 행 번호) 기반 uuid5 또는 행 번호 → 다시 실행해도 같은 포인트를 덮어쓴다(멱등)
+"""
+
+import itertools
+import json
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from core.settings import vector_setting
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadSource:
+    vectors: str  # .npy 또는 .parquet
+    payloads: Optional[str] = (
+        None  # .parquet | .ndjson | .jsonl (vectors 와 같은 행 순서)
+    )
+    vector_column: str = "vector"  # Parquet 벡터 컬럼
+    vector_name: str = ""  # 컬렉션 named vector ("" 는 기본 벡터)
+    id_mode: str = "uuid5"  # uuid5 | row | field
+    id_field: Optional[str] = (
+        None  # id_mode="field" 일 때 payload 의 id 컬럼 (문자열 키는 uuid5, payload 에 유지)
+    )
+    id_namespace: Optional[str] = None  # uuid5 namespace (기본: 벡터 파일명)
+    id_offset: int = 0  # id_mode="row" 일 때 시작 번호
+
+    def __post_init__(self):
+        if self.id_mode not in ("uuid5", "row", "field"):
+            raise ValueError(f"지원하지 않는 id_mode: {self.id_mode}")
+        if self.id_mode == "field" and not (self.id_field and self.payloads):
+            raise ValueError("id_mode='field' 는 payloads 와 id_field 가 필요합니다.")
+
+    @property
+    def namespace(self) -> uuid.UUID:
+        return uuid.uuid5(
+            uuid.NAMESPACE_URL, self.id_namespace or Path(self.vectors).name
+        )
+
+
+@dataclass
+class LoadStats:
+    points: int = 0
+    batches: int = 0
+    tasks: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def points_per_sec(self) -> float:
+        return self.points / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (
+            f"points={self.points} batches={self.batches} tasks={self.tasks} "
+            f"elapsed={self.elapsed:.2f}s rate={self.points_per_sec:.0f} pts/s"
+        )
+
+
+def _parquet_file(path: str):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet 적재에는 pyarrow 가 필요합니다.") from e
+    return pq.ParquetFile(path)
+
+
+def row_count(path: str) -> int:
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r").shape[0]
+    return _parquet_file(path).metadata.num_rows
+
+
+def _iter_parquet(
+    path: str, columns: List[str], start: int, stop: int, batch_size: int
+) -> Iterator[Any]:
+    """[start, stop) 행과 겹치는 row group 만 record batch 단위로 읽기"""
+    pf = _parquet_file(path)
+    groups, row = [], 0
+    first_row = None
+    for i in range(pf.metadata.num_row_groups):
+        n = pf.metadata.row_group(i).num_rows
+        if row + n > start and row < stop:
+            groups.append(i)
+            first_row = row if first_row is None else first_row
+        row += n
+    if not groups:
+        return
+    row = first_row
+    for batch in pf.iter_batches(
+        batch_size=batch_size, row_groups=groups, columns=columns
+    ):
+        lo, hi = max(start - row, 0), min(stop - row, batch.num_rows)
+        if hi > lo:
+            yield batch.slice(lo, hi - lo)
+        row += batch.num_rows
+        if row >= stop:
+            break
+
+
+def _rechunk(chunks: Iterator[Any], batch_size: int, concat) -> Iterator[Any]:
+    """임의 크기 chunk → batch_size 크기로 재분할"""
+    buffer, size = [], 0
+    for chunk in chunks:
+        while len(chunk):
+            take = min(batch_size - size, len(chunk))
+            buffer.append(chunk[:take])
+            size += take
+            chunk = chunk[take:]
+            if size == batch_size:
+                yield concat(buffer)
+                buffer, size = [], 0
+    if buffer:
+        yield concat(buffer)
+
+
+def _iter_vectors(
+    source: LoadSource, start: int, stop: int, batch_size: int
+) -> Iterator[np.ndarray]:
+    if source.vectors.endswith(".npy"):
+        matrix = np.load(source.vectors, mmap_mode="r")
+        for a in range(start, stop, batch_size):
+            # memmap 슬라이스 → 이 배치 행만 디스크에서 읽음
+            yield np.ascontiguousarray(
+                matrix[a : min(a + batch_size, stop)], np.float32
+            )
+        return
+
+    def to_matrix(batch) -> np.ndarray:
+        column = batch.column(0)
+        flat = np.asarray(column.flatten(), dtype=np.float32)
+        return flat.reshape(len(column), -1)
+
+    yield from _rechunk(
+        (
+            to_matrix(b)
+            for b in _iter_parquet(
+                source.vectors, [source.vector_column], start, stop, batch_size
+            )
+        ),
+        batch_size,
+        np.concatenate,
+    )
+
+
+def _is_ndjson(path: Optional[str]) -> bool:
+    return bool(path) and path.endswith((".ndjson", ".jsonl"))
+
+
+def _ndjson_offsets(path: str, rows: List[int]) -> Tuple[Dict[int, int], int]:
+    """한 번 훑어서 지정한 행 번호의 byte offset 만 기록 → (offsets, 전체 행 수)"""
+    wanted, offsets = set(rows), {}
+    position = count = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if count in wanted:
+                offsets[count] = position
+            position += len(line)
+            count += 1
+    return offsets, count
+
+
+def _iter_payloads(
+    source: LoadSource,
+    start: int,
+    stop: int,
+    batch_size: int,
+    byte_offset: Optional[int] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    path = source.payloads
+    if path is None:
+        return
+    if _is_ndjson(path):
+
+        def lines():
+            with open(path, "rb") as f:
+                row = 0
+                if byte_offset is not None:
+                    f.seek(byte_offset)
+                    row = start
+                for line in f:
+                    if row >= stop:
+                        break
+                    if row >= start:
+                        yield [json.loads(line)]
+                    row += 1
+
+        chunks = lines()
+    else:
+        chunks = (
+            b.to_pylist() for b in _iter_parquet(path, None, start, stop, batch_size)
+        )
+    yield from _rechunk(
+        chunks, batch_size, lambda parts: list(itertools.chain.from_iterable(parts))
+    )
+
+
+def _point_id(namespace: uuid.UUID, value: Any) -> Any:
+    """정수 / UUID 문자열은 그대로, 그 외 키는 uuid5 로 변환"""
+    if isinstance(value, int):
+        return value
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return str(uuid.uuid5(namespace, str(value)))
+
+
+def _ids(
+    source: LoadSource, start: int, count: int, payloads: Optional[List[dict]]
+) -> List[Any]:
+    if source.id_mode == "field":
+        # id 컬럼은 payload 에도 그대로 남김 (원본 키로 필터/조회 가능)
+        return [_point_id(source.namespace, p[source.id_field]) for p in payloads]
+    if source.id_mode == "row":
+        return list(range(source.id_offset + start, source.id_offset + start + count))
+    namespace = source.namespace
+    return [str(uuid.uuid5(namespace, str(row))) for row in range(start, start + count)]
+
+
+def _load_range(
+    source: LoadSource,
+    collection_name: str,
+    start: int,
+    stop: int,
+    batch_size: int,
+    byte_offset: Optional[int] = None,
+    location: Optional[str] = None,
+    client: Any = None,
+) -> Tuple[int, int]:
+    """worker: [start, stop) 행 업로드 → (포인트 수, 배치 수)"""
+    from qdrant_client import QdrantClient
+    from repositories.vector_codec import ArrayBatch
+
+    own_client = client is None
+    if own_client:
+        client = (
+            QdrantClient(location=location)
+            if location
+            else QdrantClient(
+                url=vector_setting.vector_db_url,
+                api_key=vector_setting.vector_db_api_key,
+                timeout=vector_setting.vector_timeout,
+                prefer_grpc=vector_setting.prefer_grpc,
+            )
+        )
+    points = batches = 0
+    payload_iter = _iter_payloads(source, start, stop, batch_size, byte_offset)
+    row = start
+    try:
+        for vectors in _iter_vectors(source, start, stop, batch_size):
+            payloads = next(payload_iter, None) if source.payloads else None
+            if payloads is not None and len(payloads) != len(vectors):
+                raise ValueError(
+                    f"행 {row}: payload 수({len(payloads)})와 벡터 수({len(vectors)})가 다릅니다."
+                )
+            batch = ArrayBatch.of(
+                ids=_ids(source, row, len(vectors), payloads),
+                vectors=(
+                    {source.vector_name: vectors} if source.vector_name else vectors
+                ),
+                payloads=payloads,
+            )
+            client.upsert(
+                collection_name=collection_name, points=batch.to_models(), wait=True
+            )
+            row += len(vectors)
+            points += len(vectors)
+            batches += 1
+    finally:
+        if own_client:
+            client.close()
+    return points, batches
+
+
+class BulkLoader:
+    """행 범위 task 를 프로세스 풀로 병렬 적재"""
+
+    def __init__(
+        self,
+        source: LoadSource,
+        collection_name: str,
+        workers: int = 4,
+        batch_size: Optional[int] = None,
+        rows_per_task: int = 100_000,
+        location: Optional[str] = None,
+        client: Any = None,
+        repository: Any = None,
+    ):
+        if location == ":memory:" and client is None:
+            # worker(task)마다 클라이언트를 새로 만들므로 각자 별도의 빈 DB 에 적재되고 사라짐
+            raise ValueError(
+                "location=':memory:' 는 지원하지 않습니다. "
+                "QdrantClient(':memory:') 를 client 로 넘기세요 (현재 프로세스에서 적재)."
+            )
+        self.source = source
+        self.collection_name = collection_name
+        self.workers = workers
+        self.batch_size = batch_size or vector_setting.upsert_batch_size
+        self.rows_per_task = rows_per_task
+        self.location = location
+        # 동기 QdrantClient 를 직접 넘기면(로컬 모드 등) 프로세스 풀 없이 현재 프로세스에서 적재
+        self.client = client
+        # 적재 후 검색결과 / planner 캐시를 무효화할 VectorRepository (기본: 공유 인스턴스)
+        self.repository = repository
+
+    def tasks(self) -> List[Tuple[int, int, Optional[int]]]:
+        """(시작 행, 끝 행, ndjson payload byte offset) 목록"""
+        total = row_count(self.source.vectors)
+        starts = list(range(0, total, self.rows_per_task))
+        offsets: Dict[int, int] = {}
+        if _is_ndjson(self.source.payloads):
+            # worker 가 처음부터 다시 읽지 않도록 task 시작 행의 위치만 미리 기록
+            offsets, payload_rows = _ndjson_offsets(self.source.payloads, starts)
+        elif self.source.payloads:
+            payload_rows = row_count(self.source.payloads)
+        else:
+            payload_rows = total
+        if payload_rows != total:
+            raise ValueError(f"벡터 {total}행 / payload {payload_rows}행 불일치")
+        return [(a, min(a + self.rows_per_task, total), offsets.get(a)) for a in starts]
+
+    def run(self, start: int = 0, stop: Optional[int] = None) -> LoadStats:
+        """[start, stop) 행 적재 (중단 후 재실행해도 같은 id 로 덮어씀)"""
+        started = time.perf_counter()
+        tasks = [
+            # 범위 중간에서 시작하는 task 는 offset 없이 읽음
+            (
+                max(a, start),
+                b if stop is None else min(b, stop),
+                o if a >= start else None,
+            )
+            for a, b, o in self.tasks()
+            if b > start and (stop is None or a < stop)
+        ]
+        stats = LoadStats(tasks=len(tasks))
+        try:
+            self._run_tasks(tasks, stats)
+        finally:
+            # worker 는 클라이언트로 직접 쓰므로 현재 프로세스의 캐시를 여기서 무효화
+            self._invalidate()
+
+        stats.elapsed = time.perf_counter() - started
+        logger.info(f"[bulk load] {self.collection_name} 완료: {stats}")
+        return stats
+
+    def _invalidate(self) -> None:
+        repository = self.repository
+        if repository is None:
+            from repositories.vector_repository import vector_repository
+
+            repository = vector_repository
+        repository.invalidate(self.collection_name)
+
+    def _run_tasks(
+        self, tasks: List[Tuple[int, int, Optional[int]]], stats: LoadStats
+    ) -> None:
+        args = (self.source, self.collection_name)
+        if self.client is not None or self.workers <= 1:
+            results = (
+                _load_range(
+                    *args, a, b, self.batch_size, o, self.location, client=self.client
+                )
+                for a, b, o in tasks
+            )
+            for points, batches in results:
+                stats.points += points
+                stats.batches += batches
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [
+                    pool.submit(
+                        _load_range, *args, a, b, self.batch_size, o, self.location
+                    )
+                    for a, b, o in tasks
+                ]
+                for future in as_completed(futures):
+                    points, batches = future.result()
+                    stats.points += points
+                    stats.batches += batches
+                    logger.info(
+                        f"[bulk load] {self.collection_name} {stats.points}건 적재"
+                    )
+
+
+if __name__ == "__main__":
+    # python -m repositories.bulk_loader <collection> <vectors.npy|parquet> [payloads] [workers]
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    collection_name, vectors, *rest = sys.argv[1:]
+    loader = BulkLoader(
+        LoadSource(vectors=vectors, payloads=rest[0] if rest else None),
+        collection_name,
+        workers=int(rest[1]) if len(rest) > 1 else 4,
+    )
+    print(loader.run())
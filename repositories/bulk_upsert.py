@@ -0,0 +1,261 @@
+# repositories/bulk_upsert.py
+"""
+대용량 벡터 적재 파이프라인
+- 임의의 iterable / async iterator 의 포인트를 batch_size 단위로 나눠 업로드
+- 동시 업로드 수(max_in_flight)를 세마포어로 제한 → 슬롯이 빌 때까지 원본을 더 읽지 않음(backpressure)
+- 실패한 배치는 지수 백오프로 재시도
+- QdrantClient(동기, ":memory:"/로컬경로 포함)와 AsyncQdrantClient 모두 지원
+- ArrayBatch(ndarray) 입력은 view 슬라이스로 나누고 업로드 직전에만 직렬화
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Optional,
+    Union,
+)
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+from core.settings import vector_setting
+from repositories.vector_codec import ArrayBatch
+import logging
+
+logger = logging.getLogger(__name__)
+
+PointSource = Union[Iterable[models.PointStruct], AsyncIterable[models.PointStruct]]
+
+
+@dataclass
+class BulkUpsertStats:
+    points: int = 0
+    batches: int = 0
+    retries: int = 0
+    failed_batches: int = 0
+    failed_points: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def points_per_sec(self) -> float:
+        return self.points / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (
+            f"points={self.points} batches={self.batches} retries={self.retries} "
+            f"failed={self.failed_batches}({self.failed_points} pts) "
+            f"elapsed={self.elapsed:.2f}s rate={self.points_per_sec:.0f} pts/s"
+        )
+
+
+class BulkUpsertError(Exception):
+    def __init__(self, stats: BulkUpsertStats, cause: BaseException):
+        super().__init__(f"bulk upsert 실패: {cause} ({stats})")
+        self.stats = stats
+        self.cause = cause
+
+
+async def _aiter_batches(source: PointSource, batch_size: int) -> AsyncIterator[list]:
+    """원본을 batch_size 단위 리스트로 분할 (원본 전체를 메모리에 올리지 않음)"""
+    batch = []
+    if hasattr(source, "__aiter__"):
+        async for point in source:
+            batch.append(point)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    else:
+        for point in source:
+            batch.append(point)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+async def _aiter_slices(
+    batch: ArrayBatch, batch_size: int
+) -> AsyncIterator[ArrayBatch]:
+    for start in range(0, len(batch), batch_size):
+        yield batch.slice(start, start + batch_size)
+
+
+class BulkUpserter:
+    """배치 분할 + 병렬 업로드 + 재시도"""
+
+    def __init__(
+        self,
+        client: Union[AsyncQdrantClient, QdrantClient],
+        collection_name: str,
+        batch_size: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff: float = 0.5,
+        wait: bool = False,
+        raise_on_error: bool = True,
+        log_every: int = 100,
+        serialize: Optional[bool] = None,
+    ):
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_size = batch_size or vector_setting.upsert_batch_size
+        self.max_in_flight = max_in_flight or vector_setting.upsert_parallel
+        self.max_retries = (
+            vector_setting.upsert_max_retries if max_retries is None else max_retries
+        )
+        self.retry_backoff = retry_backoff
+        self.wait = wait
+        self.raise_on_error = raise_on_error
+        self.log_every = log_every
+        self._is_async = inspect.iscoroutinefunction(client.upsert)
+        # 동기 로컬모드(":memory:" / path)는 thread-safe 하지 않으므로 업로드를 직렬화
+        # serialize 미지정시 클라이언트 생성 옵션(init_options)으로 판단
+        if serialize is None:
+            options = getattr(client, "init_options", None) or {}
+            serialize = options.get("location") == ":memory:" or bool(
+                options.get("path")
+            )
+        self._thread_lock = asyncio.Lock() if not self._is_async and serialize else None
+
+    async def _send(self, points: Any) -> None:
+        if self._is_async:
+            await self.client.upsert(
+                collection_name=self.collection_name, points=points, wait=self.wait
+            )
+        elif self._thread_lock is not None:
+            async with self._thread_lock:
+                await self._send_in_thread(points)
+        else:
+            await self._send_in_thread(points)
+
+    async def _send_in_thread(self, points: Any) -> None:
+        # 동기 클라이언트는 스레드에서 실행하여 이벤트루프를 막지 않음
+        await asyncio.to_thread(
+            self.client.upsert,
+            collection_name=self.collection_name,
+            points=points,
+            wait=self.wait,
+        )
+
+    async def _upload(self, batch: Any, stats: BulkUpsertStats) -> None:
+        size = len(batch)
+        attempt = 0
+        while True:
+            try:
+                if isinstance(batch, ArrayBatch):
+                    await self._send(batch.to_models())
+                else:
+                    await self._send(batch)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    stats.failed_batches += 1
+                    stats.failed_points += size
+                    logger.error(
+                        f"[bulk upsert] 배치 업로드 실패({attempt + 1}회 시도): {e}"
+                    )
+                    raise
+                delay = self.retry_backoff * (2**attempt)
+                attempt += 1
+                stats.retries += 1
+                logger.warning(
+                    f"[bulk upsert] 배치 업로드 재시도 {attempt}/{self.max_retries} "
+                    f"({delay:.2f}s 후): {e}"
+                )
+                await asyncio.sleep(delay)
+
+        stats.points += size
+        stats.batches += 1
+        if self.log_every and stats.batches % self.log_every == 0:
+            logger.info(f"[bulk upsert] {self.collection_name} 진행: {stats}")
+
+    async def _run(self, batches: AsyncIterator[Any]) -> BulkUpsertStats:
+        stats = BulkUpsertStats()
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        tasks: set = set()
+        error: Optional[BaseException] = None
+        start = time.perf_counter()
+
+        def _done(task: asyncio.Task):
+            nonlocal error
+            tasks.discard(task)
+            semaphore.release()
+            if not task.cancelled() and task.exception() is not None:
+                error = error or task.exception()
+
+        try:
+            async for batch in batches:
+                # 업로드 슬롯이 빌 때까지 원본을 더 읽지 않음(backpressure)
+                await semaphore.acquire()
+                if error is not None and self.raise_on_error:
+                    semaphore.release()
+                    break
+                task = asyncio.create_task(self._upload(batch, stats))
+                tasks.add(task)
+                task.add_done_callback(_done)
+
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for task in list(tasks):
+                task.cancel()
+            stats.elapsed = time.perf_counter() - start
+
+        logger.info(f"[bulk upsert] {self.collection_name} 완료: {stats}")
+        if error is not None and self.raise_on_error:
+            raise BulkUpsertError(stats, error)
+        return stats
+
+    async def upsert(self, points: PointSource) -> BulkUpsertStats:
+        return await self._run(_aiter_batches(points, self.batch_size))
+
+    async def upsert_arrays(self, batch: ArrayBatch) -> BulkUpsertStats:
+        """ndarray 배치 적재 (변환은 업로드 중인 배치에 대해서만 발생)"""
+        return await self._run(_aiter_slices(batch, self.batch_size))
+
+
+async def bulk_upsert(
+    client: Union[AsyncQdrantClient, QdrantClient],
+    collection_name: str,
+    points: Union[PointSource, ArrayBatch],
+    **kwargs,
+) -> BulkUpsertStats:
+    """포인트 스트림(또는 ArrayBatch)을 배치 병렬 업로드"""
+    upserter = BulkUpserter(client, collection_name, **kwargs)
+    if isinstance(points, ArrayBatch):
+        return await upserter.upsert_arrays(points)
+    return await upserter.upsert(points)
+
+
+if __name__ == "__main__":
+    import random
+
+    # 로컬모드 동작 확인: python -m repositories.bulk_upsert
+    logging.basicConfig(level=logging.INFO)
+
+    def generate_points(n: int, dim: int):
+        for i in range(n):
+            yield models.PointStruct(
+                id=i,
+                vector=[random.random() for _ in range(dim)],
+                payload={"no": i},
+            )
+
+    async def main():
+        client = QdrantClient(":memory:")
+        client.create_collection(
+            collection_name="bulk_test",
+            vectors_config=models.VectorParams(
+                size=32, distance=models.Distance.COSINE
+            ),
+        )
+        stats = await bulk_upsert(
+            client, "bulk_test", generate_points(20_000, 32), batch_size=500
+        )
+        print(stats, client.count("bulk_test").count)
+
+    asyncio.run(main())
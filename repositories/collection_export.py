@@ -0,0 +1,416 @@
+# repositories/collection_export.py
+"""
+컬렉션 스트리밍 내보내기 (Parquet / NDJSON)
+- scroll 의 next_page_offset 으로 페이지 단위로 읽어 바로 파일에 기록 → 컬렉션 크기와 무관하게 메모리 일정
+- id 공간을 shard 구간으로 나눠 구간별 reader 를 동시에 실행 (구간 시작 id 를 offset 으로 scroll)
+  구간 경계는 무작위 표본 id 의 분위수 → 계획 단계에서 전체 id 를 읽지 않음
+- 파일은 part-{shard}-{seq}.{ext} 단위로 임시파일 → rename 후 상태파일(resume token)에 기록
+  중단 후 다시 실행하면 마지막으로 완료된 part 다음부터 이어서 내보낸다
+- Parquet: id, dense 벡터(FixedSizeList<float32>), sparse 벡터(struct indices/values), payload(JSON 문자열)
+  컬럼 스키마는 첫 페이지가 아니라 컬렉션 설정(vectors / sparse_vectors)에서 한 번 만들어 모든 part 에 사용
+  (벡터가 빠진 포인트가 먼저 나와도 컬럼 구성/타입이 part 마다 달라지지 않음)
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+import numpy as np
+from qdrant_client import AsyncQdrantClient, models
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "export_state.json"
+FORMATS = ("parquet", "ndjson")
+# shard 경계 선정용 표본 크기 (shard 당)
+SAMPLES_PER_SHARD = 64
+
+
+def _id_key(point_id: Any) -> tuple:
+    """Qdrant scroll 순서와 같은 id 정렬 키 (정수 id → uuid)"""
+    if isinstance(point_id, int):
+        return (0, point_id)
+    return (1, uuid.UUID(str(point_id)).int)
+
+
+@dataclass
+class ShardState:
+    start: Optional[models.ExtendedPointId]  # 구간 시작 id (포함)
+    stop: Optional[models.ExtendedPointId]  # 구간 끝 id (미포함, None 이면 끝까지)
+    offset: Optional[models.ExtendedPointId] = None  # 다음에 읽을 id (resume 위치)
+    part: int = 0  # 다음 part 번호
+    rows: int = 0
+    done: bool = False
+
+
+@dataclass
+class ExportState:
+    """resume token: 완료된 part 까지의 shard 별 진행 상태"""
+
+    collection_name: str
+    format: str
+    shards: List[ShardState] = field(default_factory=list)
+    id_type: str = "int"  # int | str
+
+    def save(self, directory: Path) -> None:
+        tmp = directory / f"{STATE_FILE}.tmp"
+        tmp.write_text(json.dumps(asdict(self), ensure_ascii=False))
+        os.replace(tmp, directory / STATE_FILE)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional["ExportState"]:
+        path = directory / STATE_FILE
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text())
+        data["shards"] = [ShardState(**s) for s in data["shards"]]
+        return cls(**data)
+
+    @property
+    def rows(self) -> int:
+        return sum(s.rows for s in self.shards)
+
+    @property
+    def done(self) -> bool:
+        return all(s.done for s in self.shards)
+
+
+def _vector_json(value: Any) -> Any:
+    if isinstance(value, models.SparseVector):
+        return {"indices": value.indices, "values": value.values}
+    if isinstance(value, dict):
+        return {name: _vector_json(v) for name, v in value.items()}
+    return value
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("parquet 내보내기에는 pyarrow 가 필요합니다.") from e
+    return pa, pq
+
+
+def _vector_columns(
+    params: models.CollectionParams, with_vectors: Union[bool, Sequence[str]]
+) -> Dict[str, tuple]:
+    """컬럼 이름 → (벡터 이름, VectorParams | SparseVectorParams), 이름없는 벡터는 "" """
+    if with_vectors is False:
+        return {}
+    vectors = params.vectors
+    dense = vectors if isinstance(vectors, dict) else {"": vectors}
+    found = {**(dense if vectors is not None else {}), **(params.sparse_vectors or {})}
+    names = list(found) if with_vectors is True else list(with_vectors)
+    unknown = set(names) - set(found)
+    if unknown:
+        raise ValueError(f"컬렉션에 없는 벡터: {sorted(unknown)}")
+    return {f"vector.{n}" if n else "vector": (n, found[n]) for n in names}
+
+
+class _NdjsonPart:
+    def __init__(self, path: Path, schema: Any = None):
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, records: Sequence[models.Record], id_type: str) -> None:
+        lines = []
+        for r in records:
+            line = {"id": r.id, "payload": r.payload}
+            if r.vector is not None:
+                line["vector"] = _vector_json(r.vector)
+            lines.append(json.dumps(line, ensure_ascii=False))
+        self._file.write("\n".join(lines) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def parquet_schema(
+    params: models.CollectionParams,
+    id_type: str = "int",
+    with_vectors: Union[bool, Sequence[str]] = True,
+):
+    """컬렉션 설정 → 내보내기 Parquet 스키마 (벡터 이름은 field metadata 에 기록)"""
+    pa, _ = _pyarrow()
+    fields = [pa.field("id", pa.int64() if id_type == "int" else pa.string())]
+    for column, (name, config) in _vector_columns(params, with_vectors).items():
+        if isinstance(config, models.SparseVectorParams):
+            type_ = pa.struct(
+                [
+                    ("indices", pa.list_(pa.uint32())),
+                    ("values", pa.list_(pa.float32())),
+                ]
+            )
+        elif config.multivector_config is not None:
+            type_ = pa.list_(pa.list_(pa.float32(), config.size))
+        else:
+            type_ = pa.list_(pa.float32(), config.size)
+        fields.append(pa.field(column, type_, metadata={"vector": name}))
+    fields.append(pa.field("payload", pa.string()))
+    return pa.schema(fields)
+
+
+class _ParquetPart:
+    def __init__(self, path: Path, schema: Any):
+        self.pa, self.pq = _pyarrow()
+        self.path = path
+        self.schema = schema
+        self._writer = None
+
+    def _vector_column(self, values: List[Any], type_: Any):
+        pa = self.pa
+        if pa.types.is_struct(type_):
+            return pa.array(
+                [
+                    None if v is None else {"indices": v.indices, "values": v.values}
+                    for v in values
+                ],
+                type=type_,
+            )
+        if pa.types.is_fixed_size_list(type_) and all(v is not None for v in values):
+            # dense: 행렬 한 번 변환 후 고정길이 리스트 (행별 파이썬 리스트 없음)
+            matrix = np.asarray(values, dtype=np.float32).reshape(len(values), -1)
+            if matrix.shape[1] != type_.list_size:
+                raise ValueError(
+                    f"벡터 차원 {matrix.shape[1]} ≠ 컬렉션 설정 {type_.list_size}"
+                )
+            return pa.FixedSizeListArray.from_arrays(
+                pa.array(matrix.ravel()), type=type_
+            )
+        # multivector / 일부 누락
+        return pa.array(values, type=type_)
+
+    def write(self, records: Sequence[models.Record], id_type: str) -> None:
+        pa = self.pa
+        columns = []
+        for schema_field in self.schema:
+            if schema_field.name == "id":
+                column = pa.array(
+                    [r.id if id_type == "int" else str(r.id) for r in records],
+                    type=schema_field.type,
+                )
+            elif schema_field.name == "payload":
+                column = pa.array(
+                    [json.dumps(r.payload, ensure_ascii=False) for r in records],
+                    type=schema_field.type,
+                )
+            else:
+                name = schema_field.metadata[b"vector"].decode()
+                values = [
+                    (
+                        (r.vector or {}).get(name)
+                        if isinstance(r.vector, dict)
+                        else (r.vector if not name else None)
+                    )
+                    for r in records
+                ]
+                column = self._vector_column(values, schema_field.type)
+            columns.append(column)
+        table = pa.Table.from_arrays(columns, schema=self.schema)
+        if self._writer is None:
+            self._writer = self.pq.ParquetWriter(self.path, self.schema)
+        self._writer.write_table(table)  # 페이지마다 row group
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+class CollectionExporter:
+    """scroll 기반 스트리밍 내보내기 (shard 병렬 + resume)"""
+
+    def __init__(
+        self,
+        client: AsyncQdrantClient,
+        collection_name: str,
+        directory: Union[str, Path],
+        format: str = "parquet",
+        shards: int = 4,
+        page_size: int = 1_000,
+        rows_per_part: int = 100_000,
+        with_vectors: Union[bool, Sequence[str]] = True,
+        scroll_filter: Optional[models.Filter] = None,
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"지원하지 않는 형식: {format} {FORMATS}")
+        self.client = client
+        self.collection_name = collection_name
+        self.directory = Path(directory)
+        self.format = format
+        self.shards = shards
+        self.page_size = page_size
+        self.rows_per_part = rows_per_part
+        self.with_vectors = with_vectors
+        self.scroll_filter = scroll_filter
+        self._lock = asyncio.Lock()
+        self._schema = None  # parquet: 모든 part 공통 스키마
+
+    async def _build_schema(self, id_type: str) -> None:
+        if self.format != "parquet":
+            return
+        info = await self.client.get_collection(collection_name=self.collection_name)
+        self._schema = parquet_schema(info.config.params, id_type, self.with_vectors)
+
+    async def plan(self) -> ExportState:
+        """
+        shard 경계 id = 무작위 표본 id 의 분위수 (전체 id 를 scroll 하지 않으므로 컬렉션 크기와 무관하게 요청 2회)
+        + 컬렉션 설정으로 Parquet 스키마 생성
+        """
+        sample = await self.client.query_points(
+            self.collection_name,
+            query=models.SampleQuery(sample=models.Sample.RANDOM),
+            query_filter=self.scroll_filter,
+            limit=max(self.shards, 1) * SAMPLES_PER_SHARD,
+            with_payload=False,
+            with_vectors=False,
+        )
+        ids = sorted({p.id for p in sample.points}, key=_id_key)
+        # 첫 shard 는 처음부터(start=None), 나머지는 표본 분위수 id 부터
+        n = max(min(self.shards, len(ids)), 1)
+        boundaries = [None] + [ids[len(ids) * i // n] for i in range(1, n)]
+        shards = [
+            ShardState(start=start, stop=stop, offset=start)
+            for start, stop in zip(boundaries, boundaries[1:] + [None])
+        ]
+        id_type = "str" if await self._has_uuid_ids() else "int"
+        await self._build_schema(id_type)
+        return ExportState(self.collection_name, self.format, shards, id_type)
+
+    async def _has_uuid_ids(self) -> bool:
+        """uuid id 존재 여부: scroll 순서상 uuid 는 정수 id 뒤 → 가장 작은 uuid 부터 1건만 조회"""
+        records, _ = await self.client.scroll(
+            self.collection_name,
+            scroll_filter=self.scroll_filter,
+            limit=1,
+            offset=str(uuid.UUID(int=0)),
+            with_payload=False,
+            with_vectors=False,
+        )
+        return bool(records)
+
+    def _part_path(self, shard_no: int, part: int) -> Path:
+        ext = "parquet" if self.format == "parquet" else "ndjson"
+        return self.directory / f"part-{shard_no:03d}-{part:06d}.{ext}"
+
+    async def _commit(self, state: ExportState) -> None:
+        async with self._lock:
+            await asyncio.to_thread(state.save, self.directory)
+
+    async def _export_shard(
+        self, state: ExportState, shard_no: int, shard: ShardState
+    ) -> None:
+        writer_cls = _ParquetPart if self.format == "parquet" else _NdjsonPart
+        stop_key = None if shard.stop is None else _id_key(shard.stop)
+
+        while not shard.done:
+            path = self._part_path(shard_no, shard.part)
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            writer = await asyncio.to_thread(writer_cls, tmp, self._schema)
+            rows, offset = 0, shard.offset
+            try:
+                while rows < self.rows_per_part:
+                    records, next_offset = await self.client.scroll(
+                        self.collection_name,
+                        scroll_filter=self.scroll_filter,
+                        limit=self.page_size,
+                        offset=offset,
+                        with_payload=True,
+                        with_vectors=self.with_vectors,
+                    )
+                    # 다음 shard 구간에 도달하면 종료
+                    if stop_key is not None:
+                        records = [r for r in records if _id_key(r.id) < stop_key]
+                        if next_offset is not None and _id_key(next_offset) >= stop_key:
+                            next_offset = None
+                    if records:
+                        await asyncio.to_thread(writer.write, records, state.id_type)
+                        rows += len(records)
+                    offset = next_offset
+                    if offset is None:
+                        break
+            finally:
+                await asyncio.to_thread(writer.close)
+
+            if rows:
+                os.replace(tmp, path)
+                shard.part += 1
+            else:
+                tmp.unlink(missing_ok=True)
+            # part 가 완료된 뒤에만 resume 위치 갱신
+            shard.rows += rows
+            shard.offset = offset
+            shard.done = offset is None
+            await self._commit(state)
+
+    async def run(self, resume: bool = True) -> ExportState:
+        """내보내기 실행 (resume=True 면 상태파일 기준으로 이어서)"""
+        started = time.perf_counter()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        state = ExportState.load(self.directory) if resume else None
+        if state is None or state.collection_name != self.collection_name:
+            state = await self.plan()
+            await self._commit(state)
+        elif state.format != self.format:
+            raise ValueError(
+                f"기존 내보내기 형식({state.format})과 다릅니다: {self.format}"
+            )
+        else:
+            logger.info(
+                f"[export] {self.collection_name} 이어서 진행 (완료 {state.rows}건)"
+            )
+            await self._build_schema(state.id_type)
+
+        tasks = [
+            asyncio.create_task(self._export_shard(state, shard_no, shard))
+            for shard_no, shard in enumerate(state.shards)
+            if not shard.done
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # 한 shard 라도 실패하면 나머지도 중단 (완료된 part 까지는 상태파일에 기록됨)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"[export] {self.collection_name} → {self.directory} "
+            f"{state.rows}건 ({elapsed:.2f}s, {state.rows / max(elapsed, 1e-9):.0f} pts/s)"
+        )
+        return state
+
+
+async def export_collection(
+    client: AsyncQdrantClient,
+    collection_name: str,
+    directory: Union[str, Path],
+    **kwargs,
+) -> ExportState:
+    return await CollectionExporter(client, collection_name, directory, **kwargs).run()
+
+
+if __name__ == "__main__":
+    # python -m repositories.collection_export <collection> <directory> [parquet|ndjson]
+    import sys
+    from core.vector_db import create_async_client
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def main(collection_name: str, directory: str, format: str = "parquet"):
+        client = create_async_client()
+        try:
+            state = await export_collection(
+                client, collection_name, directory, format=format
+            )
+            print(f"{state.rows} rows, done={state.done}")
+        finally:
+            await client.close()
+
+    asyncio.run(main(*sys.argv[1:]))
@@ -0,0 +1,371 @@
+# repositories/collection_profile.py
+"""
+컬렉션 인덱스/저장 프로파일
+- VectorSettings.index_type(기본 프로파일)과 collection_profiles(컬렉션별 지정)로 선택
+- 생성 시: HNSW(m, ef_construct), 양자화(scalar/binary/product), on_disk 벡터/페이로드 적용
+- 검색 시: SearchParams(hnsw_ef, 양자화 rescore/oversampling) 적용
+- 코드 변경 없이 컬렉션별로 RAM ↔ 지연시간을 조절한다
+- 튜닝 결과(tuned_profiles_file)는 시작 시 load_profiles() 로 등록/컬렉션에 지정
+"""
+
+import json
+import os
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from qdrant_client import models
+from core.settings import vector_setting
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_TYPES = (None, "scalar", "binary", "product")
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    name: str
+    # HNSW 그래프
+    m: int = 16
+    ef_construct: int = 100
+    # 테넌트(is_tenant payload 인덱스) 값별 그래프 연결 수 (멀티테넌트는 m=0 + payload_m)
+    payload_m: Optional[int] = None
+    full_scan_threshold: Optional[int] = None
+    hnsw_on_disk: bool = False
+    # 양자화: None | scalar | binary | product
+    quantization: Optional[str] = None
+    quantile: float = 0.99
+    pq_compression: str = "x16"
+    always_ram: bool = True
+    # 원본 벡터 / 페이로드 저장 위치
+    on_disk: bool = False
+    on_disk_payload: bool = False
+    # 검색 시점 파라미터 (None 이면 서버 기본값)
+    hnsw_ef: Optional[int] = None
+    rescore: Optional[bool] = None
+    oversampling: Optional[float] = None
+
+    def __post_init__(self):
+        if self.quantization not in QUANTIZATION_TYPES:
+            raise ValueError(
+                f"지원하지 않는 quantization: {self.quantization} {QUANTIZATION_TYPES}"
+            )
+
+    def hnsw_config(self) -> models.HnswConfigDiff:
+        return models.HnswConfigDiff(
+            m=self.m,
+            ef_construct=self.ef_construct,
+            payload_m=self.payload_m,
+            full_scan_threshold=self.full_scan_threshold,
+            on_disk=self.hnsw_on_disk or None,
+        )
+
+    def quantization_config(self) -> Optional[models.QuantizationConfig]:
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=self.quantile,
+                    always_ram=self.always_ram,
+                )
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=self.always_ram)
+            )
+        if self.quantization == "product":
+            return models.ProductQuantization(
+                product=models.ProductQuantizationConfig(
+                    compression=models.CompressionRatio(self.pq_compression),
+                    always_ram=self.always_ram,
+                )
+            )
+        return None
+
+    def vector_params(
+        self,
+        size: Optional[int] = None,
+        distance: models.Distance = models.Distance.COSINE,
+    ) -> models.VectorParams:
+        return models.VectorParams(
+            size=size or vector_setting.vector_dim,
+            distance=distance,
+            on_disk=self.on_disk,
+        )
+
+    def apply_vectors_config(
+        self,
+        vectors_config: Union[
+            models.VectorParams, Dict[str, models.VectorParams], None
+        ],
+    ) -> Union[models.VectorParams, Dict[str, models.VectorParams]]:
+        """on_disk 를 지정하지 않은 dense 벡터에 프로파일 저장 위치 적용"""
+        if vectors_config is None:
+            return self.vector_params()
+
+        def apply(params: models.VectorParams) -> models.VectorParams:
+            if params.on_disk is None:
+                return params.model_copy(update={"on_disk": self.on_disk})
+            return params
+
+        if isinstance(vectors_config, dict):
+            return {name: apply(params) for name, params in vectors_config.items()}
+        return apply(vectors_config)
+
+    def collection_kwargs(self) -> Dict[str, Any]:
+        """create_collection 에 넘길 hnsw/양자화/페이로드 설정"""
+        kwargs = {
+            "hnsw_config": self.hnsw_config(),
+            "on_disk_payload": self.on_disk_payload,
+        }
+        quantization_config = self.quantization_config()
+        if quantization_config is not None:
+            kwargs["quantization_config"] = quantization_config
+        return kwargs
+
+    def search_params(self, **overrides) -> Optional[models.SearchParams]:
+        """검색 파라미터 (모두 기본값이면 None → 서버 기본값 사용)"""
+        values = {
+            "hnsw_ef": self.hnsw_ef,
+            "rescore": self.rescore,
+            "oversampling": self.oversampling,
+            **overrides,
+        }
+        quantization = None
+        if self.quantization and (
+            values["rescore"] is not None or values["oversampling"] is not None
+        ):
+            quantization = models.QuantizationSearchParams(
+                rescore=values["rescore"], oversampling=values["oversampling"]
+            )
+        if values["hnsw_ef"] is None and quantization is None:
+            return None
+        return models.SearchParams(hnsw_ef=values["hnsw_ef"], quantization=quantization)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+PROFILES: Dict[str, CollectionProfile] = {
+    # 원본 float32 벡터 + HNSW 모두 RAM (기본)
+    "hnsw": CollectionProfile(name="hnsw"),
+    # 높은 recall: 촘촘한 그래프 + 넓은 탐색
+    "hnsw_accurate": CollectionProfile(
+        name="hnsw_accurate", m=32, ef_construct=256, hnsw_ef=128
+    ),
+    # int8 양자화 벡터만 RAM, 원본은 디스크에서 rescore (RAM 약 1/4)
+    "scalar": CollectionProfile(
+        name="scalar",
+        quantization="scalar",
+        on_disk=True,
+        rescore=True,
+        oversampling=2.0,
+    ),
+    # 1bit 양자화 (RAM 약 1/32, 고차원 임베딩용), oversampling 으로 recall 보정
+    "binary": CollectionProfile(
+        name="binary",
+        quantization="binary",
+        on_disk=True,
+        rescore=True,
+        oversampling=3.0,
+    ),
+    # product 양자화 x16 (RAM 최소, 지연/정확도 손해가 가장 큼)
+    "product": CollectionProfile(
+        name="product",
+        quantization="product",
+        on_disk=True,
+        rescore=True,
+        oversampling=3.0,
+    ),
+    # 테넌트 단일 컬렉션: 전역 그래프 없이(m=0) 테넌트별 그래프만 구성
+    # (테넌트 필터 검색 전용, repositories.tenant_repository 와 함께 사용)
+    "multitenant": CollectionProfile(name="multitenant", m=0, payload_m=16),
+    # 벡터/그래프/페이로드 모두 디스크 (RAM 최소, page cache 의존)
+    "on_disk": CollectionProfile(
+        name="on_disk", on_disk=True, on_disk_payload=True, hnsw_on_disk=True
+    ),
+}
+
+# Qdrant 에 없는 인덱스 이름(이전 설정값) → 대응 프로파일
+_LEGACY_INDEX_TYPES = {"ivf_flat": "hnsw", "flat": "hnsw", "ivf_pq": "product"}
+_warned_legacy = set()
+
+
+def _profile_key(name: str) -> str:
+    # 이름은 대소문자 구분 없음 (tuned_{컬렉션} 처럼 대문자가 섞일 수 있음)
+    return name.lower()
+
+
+def register_profile(profile: CollectionProfile) -> None:
+    """프로파일 추가/교체 (튜닝 결과 로드 등)"""
+    PROFILES[_profile_key(profile.name)] = profile
+
+
+def get_profile(name: Optional[str] = None) -> CollectionProfile:
+    """이름 → 프로파일 (미지정시 VectorSettings.index_type)"""
+    key = _profile_key(name or vector_setting.index_type)
+    if key in _LEGACY_INDEX_TYPES:
+        if key not in _warned_legacy:
+            _warned_legacy.add(key)
+            logger.warning(
+                f"index_type={key} 는 Qdrant 인덱스가 아닙니다. "
+                f"'{_LEGACY_INDEX_TYPES[key]}' 프로파일을 사용합니다."
+            )
+        key = _LEGACY_INDEX_TYPES[key]
+    try:
+        return PROFILES[key]
+    except KeyError:
+        raise ValueError(f"알 수 없는 컬렉션 프로파일: {key} ({list(PROFILES)})")
+
+
+def profile_for(collection_name: str) -> CollectionProfile:
+    """컬렉션별 지정(collection_profiles) 우선, 없으면 기본 프로파일"""
+    return get_profile(vector_setting.collection_profiles.get(collection_name))
+
+
+def _read_profiles_file(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {"profiles": {}, "collections": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_profile(
+    profile: CollectionProfile,
+    collection_name: Optional[str] = None,
+    path: Optional[str] = None,
+    metrics: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """프로파일 파일에 추가/교체 (collection_name 지정시 해당 컬렉션에 연결)"""
+    path = Path(path or vector_setting.tuned_profiles_file)
+    data = _read_profiles_file(path)
+    data["profiles"][profile.name] = {
+        **profile.to_dict(),
+        **({"metrics": metrics} if metrics else {}),
+    }
+    if collection_name:
+        data["collections"][collection_name] = profile.name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def load_profiles(path: Optional[str] = None) -> Dict[str, str]:
+    """
+    프로파일 파일 로드 → 프로파일 등록 + 컬렉션 지정 (env 의 collection_profiles 가 우선)
+    반환: 이번에 지정된 컬렉션 → 프로파일 이름
+    """
+    path = Path(path or vector_setting.tuned_profiles_file)
+    data = _read_profiles_file(path)
+    for name, values in data["profiles"].items():
+        values = {k: v for k, v in values.items() if k != "metrics"}
+        register_profile(CollectionProfile(**{**values, "name": name}))
+    assigned = {}
+    for collection_name, name in data["collections"].items():
+        if collection_name in vector_setting.collection_profiles:
+            continue
+        vector_setting.collection_profiles[collection_name] = name
+        assigned[collection_name] = name
+    if data["profiles"]:
+        logger.info(f"튜닝 프로파일 로드: {list(data['profiles'])} → {assigned}")
+    return assigned
+
+
+def estimate_memory(
+    n: int, dim: int, profile: CollectionProfile, payload_bytes: int = 0
+) -> Dict[str, float]:
+    """프로파일별 RAM / 디스크 사용량 추정(MB)"""
+    raw = n * dim * 4
+    # level-0 링크 (m*2 개, u32) — 멀티테넌트는 테넌트별 그래프 합계
+    graph = n * max(profile.m, profile.payload_m or 0) * 2 * 4
+    quantized = {
+        None: 0,
+        "scalar": n * dim,
+        "binary": n * dim / 8,
+        "product": raw / int(profile.pq_compression.lstrip("x")),
+    }[profile.quantization]
+    payload = n * payload_bytes
+
+    ram = disk = 0.0
+    for size, on_disk in [
+        (raw, profile.on_disk),
+        (graph, profile.hnsw_on_disk),
+        (quantized, not profile.always_ram),
+        (payload, profile.on_disk_payload),
+    ]:
+        if on_disk:
+            disk += size
+        else:
+            ram += size
+    return {"ram_mb": round(ram / 2**20, 2), "disk_mb": round(disk / 2**20, 2)}
+
+
+async def bench(
+    location: Optional[str] = None,
+    n: int = 20_000,
+    dim: int = 384,
+    queries: int = 200,
+    limit: int = 10,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    합성 코퍼스로 프로파일별 메모리 추정치 / 검색 지연시간 비교
+    location: None 이면 vector_db_url 서버, ":memory:" 는 로컬 모드
+    ※ 로컬 모드는 HNSW/양자화를 적용하지 않는 brute-force 라 지연시간 차이가 나타나지 않음
+    """
+    import time
+    import numpy as np
+    from core.vector_db import create_async_client
+    from repositories.bulk_upsert import bulk_upsert
+    from repositories.vector_codec import ArrayBatch
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    query_vectors = rng.standard_normal((queries, dim), dtype=np.float32)
+
+    client = create_async_client(location)
+    result = {}
+    try:
+        for name, profile in PROFILES.items():
+            collection_name = f"profile_bench_{name}"
+            if await client.collection_exists(collection_name):
+                await client.delete_collection(collection_name)
+            await client.create_collection(
+                collection_name,
+                vectors_config=profile.vector_params(dim),
+                **profile.collection_kwargs(),
+            )
+            await bulk_upsert(
+                client, collection_name, ArrayBatch.of(np.arange(n), vectors), wait=True
+            )
+
+            latencies = []
+            for query in query_vectors:
+                started = time.perf_counter()
+                await client.query_points(
+                    collection_name,
+                    query=query.tolist(),
+                    limit=limit,
+                    search_params=profile.search_params(),
+                )
+                latencies.append(time.perf_counter() - started)
+            await client.delete_collection(collection_name)
+
+            latencies = np.asarray(latencies) * 1000
+            result[name] = {
+                **estimate_memory(n, dim, profile),
+                "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+                "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+            }
+    finally:
+        await client.close()
+    return result
+
+
+if __name__ == "__main__":
+    # python -m repositories.collection_profile [location]
+    import asyncio
+    import sys
+    from pprint import pprint
+
+    pprint(asyncio.run(bench(sys.argv[1] if len(sys.argv) > 1 else None)))
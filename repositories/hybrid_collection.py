@@ -0,0 +1,254 @@
+# repositories/hybrid_collection.py
+"""
+Dense + sparse(BM25) 하이브리드 컬렉션 구성
+- sparse 신호를 dense VectorParams(size=1000, DOT)로 저장하지 않고 sparse_vectors_config(IDF)로 선언
+  (포인트당 4KB dense 배열 + 0 이 대부분인 내적 brute-force → 0 이 아닌 항목만 역색인)
+- dense 차원은 업로드 전에 스키마(VectorSettings.vector_dim)와 대조
+- 기존 dense 인코딩 sparse 데이터는 스키마 관리자의 재색인(transform)으로 변환
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+import numpy as np
+from qdrant_client import models
+from core.settings import vector_setting
+from repositories.collection_profile import CollectionProfile
+from repositories.schema_manager import (
+    CollectionSchema,
+    PointTransform,
+    SchemaApplyResult,
+    SchemaManager,
+    schema_manager,
+)
+from repositories.vector_codec import ArrayBatch
+from repositories.bulk_upsert import BulkUpsertStats
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HybridCollection:
+    """named dense 벡터 1개 + IDF sparse 벡터 1개 컬렉션"""
+
+    name: str
+    dense_dim: Optional[int] = None
+    dense_name: str = "dense"
+    sparse_name: str = "bm25"
+    distance: models.Distance = models.Distance.COSINE
+    profile: Union[str, CollectionProfile, None] = None
+    manager: SchemaManager = schema_manager
+
+    def __post_init__(self):
+        self.dense_dim = self.dense_dim or vector_setting.vector_dim
+
+    def schema(self) -> CollectionSchema:
+        return CollectionSchema(
+            name=self.name,
+            vectors={
+                self.dense_name: models.VectorParams(
+                    size=self.dense_dim, distance=self.distance
+                )
+            },
+            sparse_vectors={
+                self.sparse_name: models.SparseVectorParams(
+                    modifier=models.Modifier.IDF
+                )
+            },
+            profile=self.profile,
+        )
+
+    async def ensure(
+        self, transform: Optional[PointTransform] = None
+    ) -> SchemaApplyResult:
+        """컬렉션 생성/스키마 적용 (기존 데이터 유지)"""
+        return await self.manager.apply(self.schema(), transform=transform)
+
+    def validate(self, batch: ArrayBatch) -> None:
+        """업로드 전 벡터 구성/차원 검사 (서버 오류 전에 빠르게 실패)"""
+        unknown = set(batch.dense) - {self.dense_name}
+        if unknown:
+            raise ValueError(
+                f"[{self.name}] 선언되지 않은 dense 벡터: {sorted(unknown)} "
+                f"(sparse 신호는 sparse={{'{self.sparse_name}': ...}} 로 전달)"
+            )
+        dense = batch.dense.get(self.dense_name)
+        if dense is not None and dense.shape[1] != self.dense_dim:
+            raise ValueError(
+                f"[{self.name}] dense 차원 불일치: 선언 {self.dense_dim}, "
+                f"입력 {dense.shape[1]} (VectorSettings.vector_dim 확인)"
+            )
+        unknown = set(batch.sparse) - {self.sparse_name}
+        if unknown:
+            raise ValueError(
+                f"[{self.name}] 선언되지 않은 sparse 벡터: {sorted(unknown)}"
+            )
+
+    async def upsert(self, batch: ArrayBatch, **kwargs) -> BulkUpsertStats:
+        self.validate(batch)
+        return await self.manager.repository.bulk_upsert(self.name, batch, **kwargs)
+
+    async def migrate_dense_sparse(
+        self, legacy_sparse_name: str = "sparse"
+    ) -> SchemaApplyResult:
+        """dense 로 인코딩된 sparse 벡터 → sparse_vectors 로 변환하여 재색인"""
+        return await self.ensure(
+            transform=dense_to_sparse_transform(
+                legacy_sparse_name, self.sparse_name, self.dense_name, self.dense_dim
+            )
+        )
+
+
+def dense_to_sparse(values: Any) -> models.SparseVector:
+    """0 이 대부분인 dense 배열 → SparseVector (0 이 아닌 항목만)"""
+    array = np.asarray(values, dtype=np.float32)
+    indices = np.flatnonzero(array)
+    return models.SparseVector(indices=indices.tolist(), values=array[indices].tolist())
+
+
+def dense_to_sparse_transform(
+    legacy_sparse_name: str = "sparse",
+    sparse_name: str = "bm25",
+    dense_name: str = "dense",
+    dense_dim: Optional[int] = None,
+) -> PointTransform:
+    """
+    재색인용 포인트 변환: vector[legacy] (dense) → vector[sparse_name] (sparse)
+    이름없는 단일 벡터(list) 컬렉션은 그 벡터를 vector[dense_name] 으로 옮김 (차원이 다르면 ValueError)
+    """
+
+    def transform(record: models.Record) -> models.PointStruct:
+        vector = record.vector
+        if vector is None:
+            vectors: Dict[str, Any] = {}
+        elif isinstance(vector, dict):
+            vectors = dict(vector)
+        elif isinstance(vector, list):
+            vectors = {dense_name: vector}
+        else:
+            raise TypeError(
+                f"point {record.id}: 변환할 수 없는 벡터 형식 {type(vector).__name__}"
+            )
+        legacy = vectors.pop(legacy_sparse_name, None)
+        if legacy is not None and not isinstance(legacy, models.SparseVector):
+            vectors[sparse_name] = dense_to_sparse(legacy)
+        dense = vectors.get(dense_name)
+        if dense_dim and dense is not None and len(dense) != dense_dim:
+            raise ValueError(
+                f"point {record.id}: dense 차원 {len(dense)} ≠ 선언 {dense_dim}"
+            )
+        return models.PointStruct(id=record.id, vector=vectors, payload=record.payload)
+
+    return transform
+
+
+async def bench(
+    location: Optional[str] = ":memory:",
+    n: int = 5_000,
+    dense_dim: int = 384,
+    vocab: int = 1_000,
+    nnz: int = 20,
+    queries: int = 100,
+) -> Dict[str, Dict[str, float]]:
+    """
+    dense 인코딩 sparse(size=vocab, DOT) → sparse_vectors(IDF) 변환 전/후 비교
+    location: ":memory:" 로컬 모드, None 이면 vector_db_url 서버
+    ※ 로컬 모드는 sparse 역색인 없이 파이썬으로 점수를 계산하므로 지연시간은 서버에서 비교한다
+    - bytes_per_point: sparse 신호 저장 크기 (dense vocab*4 vs nnz*(4+4))
+    - p50/p95_ms: sparse 신호 단독 질의 지연시간
+    """
+    import time
+    from core.vector_db import create_async_client
+    from repositories.search_cache import SearchCache
+    from repositories.vector_repository import VectorRepository
+
+    rng = np.random.default_rng(0)
+    dense = rng.standard_normal((n, dense_dim), dtype=np.float32)
+    term_ids = np.stack(
+        [rng.choice(vocab, size=nnz, replace=False) for _ in range(n)]
+    ).astype(np.int64)
+    weights = rng.random((n, nnz), dtype=np.float32)
+    legacy = np.zeros((n, vocab), dtype=np.float32)
+    np.put_along_axis(legacy, term_ids, weights, axis=1)
+    query_terms = [rng.choice(vocab, size=4, replace=False) for _ in range(queries)]
+
+    client = create_async_client(location)
+    repository = VectorRepository(client, cache=SearchCache(maxsize=0))
+    collection = HybridCollection(
+        "hybrid_bench", dense_dim=dense_dim, manager=SchemaManager(repository)
+    )
+
+    async def measure(using: str, to_query) -> Dict[str, float]:
+        latencies = []
+        for terms in query_terms:
+            started = time.perf_counter()
+            await client.query_points(
+                collection.name, query=to_query(terms), using=using, limit=10
+            )
+            latencies.append(time.perf_counter() - started)
+        latencies = np.asarray(latencies) * 1000
+        return {
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        }
+
+    def legacy_query(terms):
+        query = np.zeros(vocab, dtype=np.float32)
+        query[terms] = 1.0
+        return query.tolist()
+
+    result = {}
+    try:
+        # 변환 전: create_hybrid_db 와 같은 dense 인코딩 구성
+        await collection.manager.apply(
+            CollectionSchema(
+                collection.name,
+                vectors={
+                    "dense": models.VectorParams(
+                        size=dense_dim, distance=models.Distance.COSINE
+                    ),
+                    "sparse": models.VectorParams(
+                        size=vocab, distance=models.Distance.DOT
+                    ),
+                },
+            )
+        )
+        await repository.bulk_upsert(
+            collection.name,
+            ArrayBatch.of(np.arange(n), {"dense": dense, "sparse": legacy}),
+            wait=True,
+        )
+        result["dense_encoded"] = {
+            "bytes_per_point": vocab * 4,
+            **await measure("sparse", legacy_query),
+        }
+
+        started = time.perf_counter()
+        migrated = await collection.migrate_dense_sparse("sparse")
+        migration_seconds = time.perf_counter() - started
+
+        result["sparse_native"] = {
+            "bytes_per_point": nnz * 8,
+            **await measure(
+                "bm25",
+                lambda terms: models.SparseVector(
+                    indices=terms.tolist(), values=[1.0] * len(terms)
+                ),
+            ),
+            "migration_seconds": round(migration_seconds, 3),
+            "migrated_points": migrated.copy_stats.points,
+        }
+    finally:
+        for collection_name in await collection.manager.versions(collection.name):
+            await client.delete_collection(collection_name)
+        await client.close()
+    return result
+
+
+if __name__ == "__main__":
+    # python -m repositories.hybrid_collection [server]
+    import asyncio
+    import sys
+    from pprint import pprint
+
+    pprint(asyncio.run(bench(None if sys.argv[1:] == ["server"] else ":memory:")))
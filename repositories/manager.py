@@ -2,7 +2,7 @@
 from typing import Dict, Type, Any
 from sqlalchemy.orm import Session
 from repositories.user_repository import UserRepository
-from repositories.vector_repository import VectorRepository
+from repositories.vector_repository import VectorRepository, vector_repository
 
 
 class DatabaseManager:
@@ -12,7 +12,8 @@ class DatabaseManager:
 
     def _initialize_repositories(self):
         self._repositories["user"] = UserRepository()
-        self._repositories["vector"] = VectorRepository()
+        # 공유 AsyncQdrantClient를 쓰는 싱글톤 인스턴스
+        self._repositories["vector"] = vector_repository
 
     def get_repository(self, name: str):
         return self._repositories.get(name)
@@ -0,0 +1,269 @@
+# repositories/payload_index.py
+"""
+페이로드 인덱스 관리
+- 검색 필터에 등장한 payload key / 조건 종류를 기록 (FieldCondition 값으로 인덱스 타입 추정)
+- 선언적 설정(VectorSettings.payload_indexes)으로 인덱스 생성, 또는
+  기록된 사용량 기반 advise 보고서(미생성/타입 불일치)로 누락 인덱스 확인/생성
+- 인덱스가 없으면 Qdrant 는 필터 검색마다 payload 를 스캔하므로 컬렉션이 커질수록 느려진다
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Union
+from qdrant_client import AsyncQdrantClient, models
+from core.settings import vector_setting
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 타입 이름/enum 또는 세부 설정(KeywordIndexParams(is_tenant=True) 등)
+SchemaType = Union[str, models.PayloadSchemaType, models.PayloadSchemaParams]
+
+# 세부 설정 중 인덱스 일치 여부 비교에 쓰는 플래그
+_INDEX_FLAGS = ("is_tenant", "is_principal")
+
+
+def schema_type(schema: SchemaType) -> str:
+    """인덱스 선언 → 타입 이름 (keyword, integer, ...)"""
+    if isinstance(schema, str):
+        return models.PayloadSchemaType(schema).value
+    if isinstance(schema, models.PayloadSchemaType):
+        return schema.value
+    return getattr(schema.type, "value", str(schema.type))
+
+
+def same_schema(existing: SchemaType, desired: SchemaType) -> bool:
+    """타입이 같고, desired 에 지정된 플래그(is_tenant 등)가 같으면 일치"""
+    if schema_type(existing) != schema_type(desired):
+        return False
+    for flag in _INDEX_FLAGS:
+        value = getattr(desired, flag, None)
+        if value is not None and bool(getattr(existing, flag, None)) != value:
+            return False
+    return True
+
+
+def _value_schema(value: Any) -> Optional[models.PayloadSchemaType]:
+    if isinstance(value, bool):
+        return models.PayloadSchemaType.BOOL
+    if isinstance(value, int):
+        return models.PayloadSchemaType.INTEGER
+    if isinstance(value, float):
+        return models.PayloadSchemaType.FLOAT
+    if isinstance(value, (datetime, date)):
+        return models.PayloadSchemaType.DATETIME
+    if isinstance(value, str):
+        return models.PayloadSchemaType.KEYWORD
+    return None
+
+
+def _condition_schema(
+    condition: models.FieldCondition,
+) -> Optional[models.PayloadSchemaType]:
+    """FieldCondition → 필요한 인덱스 타입"""
+    match = condition.match
+    if isinstance(match, models.MatchValue):
+        return _value_schema(match.value)
+    if isinstance(match, (models.MatchAny, models.MatchExcept)):
+        values = match.any if isinstance(match, models.MatchAny) else match.except_
+        return _value_schema(values[0]) if values else None
+    if isinstance(match, models.MatchText):
+        return models.PayloadSchemaType.TEXT
+    if isinstance(condition.range, models.DatetimeRange):
+        return models.PayloadSchemaType.DATETIME
+    if isinstance(condition.range, models.Range):
+        # Range 경계값은 모델 검증에서 float 로 바뀌어 정수 범위인지 알 수 없음 → float 인덱스
+        return models.PayloadSchemaType.FLOAT
+    if (
+        condition.geo_bounding_box is not None
+        or condition.geo_radius is not None
+        or condition.geo_polygon is not None
+    ):
+        return models.PayloadSchemaType.GEO
+    return None
+
+
+def filter_fields(
+    query_filter: Optional[models.Filter], prefix: str = ""
+) -> Iterable[tuple]:
+    """Filter 안의 (key, 인덱스 타입) 목록 (중첩 Filter / NestedCondition 포함)"""
+    if query_filter is None:
+        return
+    for clause in (
+        query_filter.must,
+        query_filter.should,
+        query_filter.must_not,
+        query_filter.min_should.conditions if query_filter.min_should else None,
+    ):
+        if clause is None:
+            continue
+        conditions = clause if isinstance(clause, list) else [clause]
+        for condition in conditions:
+            if isinstance(condition, models.Filter):
+                yield from filter_fields(condition, prefix)
+            elif isinstance(condition, models.NestedCondition):
+                yield from filter_fields(
+                    condition.nested.filter, f"{prefix}{condition.nested.key}[]."
+                )
+            elif isinstance(condition, models.FieldCondition):
+                schema = _condition_schema(condition)
+                if schema is not None:
+                    yield f"{prefix}{condition.key}", schema
+
+
+def _describe(schema: SchemaType) -> str:
+    flags = [f for f in _INDEX_FLAGS if getattr(schema, f, None)]
+    return "+".join([schema_type(schema), *flags])
+
+
+@dataclass
+class IndexAdvice:
+    key: str
+    schema: str
+    uses: int
+    status: str  # missing | exists | type_mismatch
+    existing: Optional[str] = None
+
+
+class PayloadIndexManager:
+    """필터 사용량 기록 + 페이로드 인덱스 생성"""
+
+    def __init__(self):
+        # 컬렉션 → key → 인덱스 타입별 사용 횟수
+        self._usage: Dict[str, Dict[str, Counter]] = defaultdict(
+            lambda: defaultdict(Counter)
+        )
+
+    def record(self, collection_name: str, query_filter: Optional[models.Filter]):
+        for key, schema in filter_fields(query_filter):
+            self._usage[collection_name][key][schema.value] += 1
+
+    def usage(self, collection_name: Optional[str] = None) -> Dict[str, Any]:
+        names = [collection_name] if collection_name else list(self._usage)
+        return {
+            name: {key: dict(counts) for key, counts in self._usage[name].items()}
+            for name in names
+            if name in self._usage
+        }
+
+    @staticmethod
+    async def existing(
+        client: AsyncQdrantClient, collection_name: str
+    ) -> Dict[str, str]:
+        """key → 생성된 인덱스 타입"""
+        info = await client.get_collection(collection_name=collection_name)
+        return {
+            key: (
+                schema.data_type.value
+                if hasattr(schema.data_type, "value")
+                else str(schema.data_type)
+            )
+            for key, schema in (info.payload_schema or {}).items()
+        }
+
+    @staticmethod
+    async def existing_schemas(
+        client: AsyncQdrantClient, collection_name: str
+    ) -> Dict[str, SchemaType]:
+        """key → 생성된 인덱스 선언 (세부 설정이 있으면 params, 없으면 타입)"""
+        info = await client.get_collection(collection_name=collection_name)
+        return {
+            key: schema.params
+            or models.PayloadSchemaType(schema_type(schema.data_type))
+            for key, schema in (info.payload_schema or {}).items()
+        }
+
+    async def advise(
+        self, client: AsyncQdrantClient, collection_name: str, min_uses: int = 1
+    ) -> List[IndexAdvice]:
+        """기록된 필터 사용량 ↔ 실제 인덱스 비교 (사용 횟수 내림차순)"""
+        existing = await self.existing(client, collection_name)
+        advice = []
+        for key, counts in self._usage.get(collection_name, {}).items():
+            schema, _ = counts.most_common(1)[0]
+            uses = sum(counts.values())
+            if uses < min_uses:
+                continue
+            if key not in existing:
+                status = "missing"
+            elif existing[key] != schema:
+                status = "type_mismatch"
+            else:
+                status = "exists"
+            advice.append(IndexAdvice(key, schema, uses, status, existing.get(key)))
+        return sorted(advice, key=lambda a: -a.uses)
+
+    async def ensure(
+        self,
+        client: AsyncQdrantClient,
+        collection_name: str,
+        indexes: Dict[str, SchemaType],
+        wait: bool = True,
+        rebuild: bool = False,
+    ) -> List[str]:
+        """
+        선언한 인덱스 중 없는 것만 생성 → 생성한 key 목록
+        타입/플래그가 다른 기존 인덱스는 경고만 남기고 유지 (rebuild=True 면 삭제 후 다시 생성)
+        """
+        existing = await self.existing_schemas(client, collection_name)
+        created = []
+        for key, schema in indexes.items():
+            if isinstance(schema, str):
+                schema = models.PayloadSchemaType(schema)
+            if key in existing and same_schema(existing[key], schema):
+                continue
+            if key in existing and not rebuild:
+                logger.warning(
+                    f"[{collection_name}] payload index '{key}' 불일치: "
+                    f"{_describe(existing[key])} ≠ 선언 {_describe(schema)} "
+                    f"(다시 생성하려면 rebuild=True 로 명시 호출)"
+                )
+                continue
+            if key in existing:
+                logger.warning(
+                    f"[{collection_name}] payload index '{key}' "
+                    f"{_describe(existing[key])} → {_describe(schema)} 로 다시 생성합니다."
+                )
+                await client.delete_payload_index(
+                    collection_name=collection_name, field_name=key, wait=wait
+                )
+            await client.create_payload_index(
+                collection_name=collection_name,
+                field_name=key,
+                field_schema=schema,
+                wait=wait,
+            )
+            created.append(key)
+            logger.info(
+                f"[{collection_name}] payload index 생성: {key} ({_describe(schema)})"
+            )
+        return created
+
+    async def apply_advice(
+        self, client: AsyncQdrantClient, collection_name: str, min_uses: int = 1
+    ) -> List[str]:
+        """advise 결과 중 missing 인덱스 생성 (타입 불일치는 보고만)"""
+        advice = await self.advise(client, collection_name, min_uses)
+        return await self.ensure(
+            client,
+            collection_name,
+            {a.key: a.schema for a in advice if a.status == "missing"},
+        )
+
+    async def ensure_configured(
+        self, client: AsyncQdrantClient, rebuild: bool = False
+    ) -> Dict[str, List[str]]:
+        """
+        VectorSettings.payload_indexes 선언 적용 (존재하는 컬렉션만)
+        앱 시작시에는 누락 인덱스만 생성하고 불일치는 로그로 보고 (재생성은 rebuild=True 명시 호출)
+        """
+        created = {}
+        for collection_name, indexes in vector_setting.payload_indexes.items():
+            if not await client.collection_exists(collection_name=collection_name):
+                logger.warning(f"[{collection_name}] payload index 대상 컬렉션 없음")
+                continue
+            created[collection_name] = await self.ensure(
+                client, collection_name, indexes, rebuild=rebuild
+            )
+        return created
@@ -0,0 +1,161 @@
+# repositories/query_planner.py
+"""
+필터 선택도 기반 검색 계획
+- 필터에 걸리는 포인트 수를 count 로 추정 (컬렉션 generation + TTL 캐시)
+- 후보가 적으면 exact=True (payload 인덱스로 후보만 전수 비교, HNSW 그래프 탐색 생략)
+- 선택도가 낮으면(좁은 필터) hnsw_ef 를 올려 필터로 끊긴 그래프에서도 top-k 확보
+- 넓은 필터 / 필터 없음은 프로파일 기본 HNSW 파라미터 유지
+- 결정과 실제 지연시간을 전략별로 기록 → stats() 로 tail latency 비교
+"""
+
+import asyncio
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+import numpy as np
+from qdrant_client import AsyncQdrantClient, models
+from core.settings import vector_setting
+from repositories.collection_profile import CollectionProfile
+from repositories.search_cache import SearchCache
+from repositories.single_flight import SingleFlight
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXACT, HNSW, HNSW_BOOST = "exact", "hnsw", "hnsw_boost"
+
+
+@dataclass
+class QueryPlan:
+    strategy: str
+    cardinality: int  # 필터 통과 포인트 수 (추정)
+    total: int
+    search_params: Optional[models.SearchParams]
+    cached: bool = False  # count 캐시 적중 여부
+
+    @property
+    def selectivity(self) -> float:
+        return self.cardinality / self.total if self.total else 1.0
+
+
+class QueryPlanner:
+    """filter cardinality → exact / hnsw / hnsw_boost 선택"""
+
+    def __init__(
+        self,
+        exact_max_points: Optional[int] = None,
+        boost_selectivity: Optional[float] = None,
+        boost_ef: Optional[int] = None,
+        count_ttl: Optional[float] = None,
+        count_exact: bool = False,
+        history: int = 1_000,
+    ):
+        self.exact_max_points = (
+            vector_setting.planner_exact_max_points
+            if exact_max_points is None
+            else exact_max_points
+        )
+        self.boost_selectivity = (
+            vector_setting.planner_boost_selectivity
+            if boost_selectivity is None
+            else boost_selectivity
+        )
+        self.boost_ef = boost_ef or vector_setting.planner_boost_ef
+        # count(exact=False) 는 payload 인덱스 기반 추정치 (전수 집계보다 저렴)
+        self.count_exact = count_exact
+        self._counts = SearchCache(
+            maxsize=4096,
+            ttl=vector_setting.planner_count_ttl if count_ttl is None else count_ttl,
+        )
+        # 동시에 계획되는 질의(query_batch 등)의 같은 count 는 요청 1회로 합침
+        self._count_flights = SingleFlight("planner_count")
+        # 전략별 최근 지연시간(초)
+        self._latencies: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=history)
+        )
+
+    def invalidate(self, collection_name: str) -> None:
+        """쓰기 후 count 캐시 무효화"""
+        self._counts.invalidate(collection_name)
+
+    async def count(
+        self,
+        client: AsyncQdrantClient,
+        collection_name: str,
+        count_filter: Optional[models.Filter],
+    ) -> Tuple[int, bool]:
+        """(포인트 수, 캐시 적중 여부)"""
+        key = self._counts.make_key(collection_name, "count", count_filter, 0, False)
+        cached = self._counts.get(collection_name, key)
+        if cached is not None:
+            return cached, True
+        generation = self._counts.generation(collection_name)
+        result = await self._count_flights.do(
+            (id(client), generation, key),
+            client.count,
+            collection_name=collection_name,
+            count_filter=count_filter,
+            exact=self.count_exact,
+        )
+        self._counts.set(collection_name, key, result.count, generation)
+        return result.count, False
+
+    async def plan(
+        self,
+        client: AsyncQdrantClient,
+        collection_name: str,
+        query_filter: Optional[models.Filter],
+        profile: CollectionProfile,
+        limit: int = 10,
+    ) -> QueryPlan:
+        default = profile.search_params()
+        if query_filter is None:
+            return QueryPlan(HNSW, 0, 0, default)
+
+        # 필터 / 전체 count 를 동시에 요청 (캐시 미스 시 왕복 1회 시간)
+        (cardinality, hit), (total, _) = await asyncio.gather(
+            self.count(client, collection_name, query_filter),
+            self.count(client, collection_name, None),
+        )
+        if cardinality <= max(self.exact_max_points, limit):
+            strategy = EXACT
+            # 양자화 컬렉션은 원본 벡터로 rescore 하던 설정 유지
+            search_params = models.SearchParams(
+                exact=True, quantization=default.quantization if default else None
+            )
+        elif total and cardinality / total < self.boost_selectivity:
+            strategy = HNSW_BOOST
+            search_params = profile.search_params(
+                hnsw_ef=max(profile.hnsw_ef or 0, self.boost_ef, limit)
+            )
+        else:
+            strategy = HNSW
+            search_params = default
+        plan = QueryPlan(strategy, cardinality, total, search_params, hit)
+        # 새 필터(count 캐시 미스)의 결정만 info, 이후 반복은 debug
+        (logger.debug if hit else logger.info)(
+            f"[planner] {collection_name} strategy={strategy} "
+            f"cardinality={cardinality}/{total} ({plan.selectivity:.4f}) "
+            f"count_cached={hit}"
+        )
+        return plan
+
+    def observe(self, plan: QueryPlan, seconds: float) -> None:
+        """검색 지연시간 기록"""
+        self._latencies[plan.strategy].append(seconds)
+        logger.debug(f"[planner] strategy={plan.strategy} {seconds * 1000:.2f}ms")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """전략별 호출 수 / p50·p95·p99 지연시간(ms)"""
+        result = {}
+        for strategy, latencies in self._latencies.items():
+            if not latencies:
+                continue
+            ms = np.asarray(latencies) * 1000
+            result[strategy] = {
+                "count": len(ms),
+                "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                "p95_ms": round(float(np.percentile(ms, 95)), 3),
+                "p99_ms": round(float(np.percentile(ms, 99)), 3),
+            }
+        return result
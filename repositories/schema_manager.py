@@ -0,0 +1,443 @@
+# repositories/schema_manager.py
+"""
+비파괴 컬렉션 스키마 관리 (recreate_collection 대체)
+- 선언한 스키마(named dense/sparse 벡터 + 컬렉션 프로파일)와 실제 컬렉션 설정을 비교
+- HNSW / 양자화 / on_disk / sparse modifier 변경은 update_collection 으로 제자리 적용
+- 벡터 구성(이름, 차원, distance) 변경은 새 버전 컬렉션({name}_v{n})을 만들어 포인트를 옮긴 뒤
+  alias 를 한 번의 요청으로 교체 → 읽기 요청은 빈/반쯤 만든 인덱스를 보지 않는다
+- 검색/적재는 항상 alias 이름(name)으로 한다
+※ 복사 중 alias 로 들어온 쓰기는 이전 컬렉션에 남으므로, 재색인 중에는 쓰기를 멈추거나 재적재한다
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Union,
+)
+from qdrant_client import AsyncQdrantClient, models
+from repositories.collection_profile import CollectionProfile, get_profile, profile_for
+from repositories.bulk_upsert import BulkUpsertStats
+from repositories.payload_index import PayloadIndexManager, SchemaType, same_schema
+from repositories.vector_repository import VectorRepository, vector_repository
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 기존 포인트 → 새 컬렉션 포인트 변환 (None 이면 제외)
+PointTransform = Callable[[models.Record], Optional[models.PointStruct]]
+
+
+@dataclass
+class CollectionSchema:
+    """선언적 컬렉션 스키마 (name 은 검색/적재에 쓰는 alias 이름)"""
+
+    name: str
+    vectors: Union[models.VectorParams, Dict[str, models.VectorParams]]
+    sparse_vectors: Dict[str, models.SparseVectorParams] = field(default_factory=dict)
+    profile: Union[str, CollectionProfile, None] = None
+    # payload key → 인덱스 타입 (keyword, integer, float, datetime ...)
+    payload_indexes: Dict[str, SchemaType] = field(default_factory=dict)
+
+    def resolve_profile(self) -> CollectionProfile:
+        if isinstance(self.profile, CollectionProfile):
+            return self.profile
+        return get_profile(self.profile) if self.profile else profile_for(self.name)
+
+    def dense(self) -> Dict[str, models.VectorParams]:
+        """이름없는 단일 벡터는 "" 키 (프로파일 on_disk 적용 후)"""
+        vectors = self.resolve_profile().apply_vectors_config(self.vectors)
+        return vectors if isinstance(vectors, dict) else {"": vectors}
+
+
+@dataclass
+class SchemaDiff:
+    action: str  # create | noop | update | rebuild
+    collection_name: Optional[str] = None  # 현재 실제 컬렉션
+    changes: List[str] = field(default_factory=list)
+    update: Dict[str, Any] = field(default_factory=dict)  # update_collection 인자
+    # 생성할 인덱스
+    payload_indexes: Dict[str, SchemaType] = field(default_factory=dict)
+
+
+@dataclass
+class SchemaApplyResult:
+    action: str
+    collection_name: str  # 적용 후 alias 가 가리키는 컬렉션
+    previous: Optional[str] = None
+    changes: List[str] = field(default_factory=list)
+    copy_stats: Optional[BulkUpsertStats] = None
+    elapsed: float = 0.0
+
+
+def _dump(value: Any) -> Any:
+    return value.model_dump(exclude_none=True) if value is not None else None
+
+
+def _vector_key(params: models.VectorParams) -> tuple:
+    """재생성이 필요한 벡터 속성 (차원, distance, 자료형, multivector)"""
+    return (
+        params.size,
+        params.distance,
+        params.datatype,
+        _dump(params.multivector_config),
+    )
+
+
+class SchemaManager:
+    """alias 기반 비파괴 스키마 적용"""
+
+    def __init__(
+        self,
+        repository: VectorRepository = vector_repository,
+        copy_batch_size: int = 256,
+    ):
+        self.repository = repository
+        self.copy_batch_size = copy_batch_size
+
+    @property
+    def client(self) -> AsyncQdrantClient:
+        return self.repository.client
+
+    async def aliases(self) -> Dict[str, str]:
+        """alias 이름 → 실제 컬렉션"""
+        response = await self.client.get_aliases()
+        return {a.alias_name: a.collection_name for a in response.aliases}
+
+    async def resolve(self, name: str) -> Optional[str]:
+        """alias/컬렉션 이름 → 실제 컬렉션 이름 (없으면 None)"""
+        aliases = await self.aliases()
+        if name in aliases:
+            return aliases[name]
+        if await self.client.collection_exists(collection_name=name):
+            return name
+        return None
+
+    async def versions(self, name: str) -> List[str]:
+        """{name}_v{n} 컬렉션 목록 (버전 오름차순)"""
+        pattern = re.compile(rf"^{re.escape(name)}_v(\d+)$")
+        response = await self.client.get_collections()
+        found = [
+            (int(m.group(1)), c.name)
+            for c in response.collections
+            if (m := pattern.match(c.name))
+        ]
+        return [collection for _, collection in sorted(found)]
+
+    async def _next_version(self, name: str) -> str:
+        versions = await self.versions(name)
+        last = int(versions[-1].rsplit("_v", 1)[1]) if versions else 0
+        return f"{name}_v{last + 1}"
+
+    async def diff(self, schema: CollectionSchema) -> SchemaDiff:
+        """선언 스키마 ↔ 실제 컬렉션 비교"""
+        current = await self.resolve(schema.name)
+        if current is None:
+            return SchemaDiff("create", changes=["컬렉션 없음"])
+
+        info = await self.client.get_collection(collection_name=current)
+        params = info.config.params
+        existing = (
+            params.vectors
+            if isinstance(params.vectors, dict)
+            else {"": params.vectors} if params.vectors is not None else {}
+        )
+        existing_sparse = params.sparse_vectors or {}
+        desired = schema.dense()
+        profile = schema.resolve_profile()
+        changes: List[str] = []
+        rebuild = False
+
+        # 1) 벡터 구성: 제자리 변경 불가 → 재생성
+        if set(existing) != set(desired):
+            rebuild = True
+            changes.append(f"dense 벡터 {sorted(existing)} → {sorted(desired)}")
+        else:
+            for name, params_ in desired.items():
+                if _vector_key(existing[name]) != _vector_key(params_):
+                    rebuild = True
+                    changes.append(
+                        f"dense[{name!r}] size/distance {existing[name].size}/"
+                        f"{existing[name].distance} → {params_.size}/{params_.distance}"
+                    )
+        if set(existing_sparse) != set(schema.sparse_vectors):
+            rebuild = True
+            changes.append(
+                f"sparse 벡터 {sorted(existing_sparse)} → {sorted(schema.sparse_vectors)}"
+            )
+        if rebuild:
+            return SchemaDiff("rebuild", current, changes)
+
+        # 2) 제자리 변경 가능 항목
+        update: Dict[str, Any] = {}
+        vectors_diff = {
+            name: models.VectorParamsDiff(on_disk=params_.on_disk)
+            for name, params_ in desired.items()
+            if bool(existing[name].on_disk) != bool(params_.on_disk)
+        }
+        if vectors_diff:
+            update["vectors_config"] = vectors_diff
+            changes.append(f"on_disk 벡터 변경 {sorted(vectors_diff)}")
+
+        hnsw = profile.hnsw_config()
+        current_hnsw = info.config.hnsw_config.model_dump()
+        if any(current_hnsw.get(k) != v for k, v in _dump(hnsw).items()):
+            update["hnsw_config"] = hnsw
+            changes.append(f"hnsw {current_hnsw} → {_dump(hnsw)}")
+
+        quantization = profile.quantization_config()
+        if _dump(info.config.quantization_config) != _dump(quantization):
+            update["quantization_config"] = quantization or models.Disabled.DISABLED
+            changes.append(f"quantization → {profile.quantization or 'disabled'}")
+
+        if bool(params.on_disk_payload) != profile.on_disk_payload:
+            update["collection_params"] = models.CollectionParamsDiff(
+                on_disk_payload=profile.on_disk_payload
+            )
+            changes.append(f"on_disk_payload → {profile.on_disk_payload}")
+
+        sparse_diff = {
+            name: sparse
+            for name, sparse in schema.sparse_vectors.items()
+            if _dump(existing_sparse[name]) != _dump(sparse)
+        }
+        if sparse_diff:
+            update["sparse_vectors_config"] = sparse_diff
+            changes.append(f"sparse 설정 변경 {sorted(sparse_diff)}")
+
+        existing_indexes = await PayloadIndexManager.existing_schemas(
+            self.client, current
+        )
+        payload_indexes = {
+            key: schema_type
+            for key, schema_type in schema.payload_indexes.items()
+            if key not in existing_indexes
+            or not same_schema(existing_indexes[key], schema_type)
+        }
+        if payload_indexes:
+            changes.append(f"payload index 생성 {payload_indexes}")
+
+        return SchemaDiff(
+            "update" if update or payload_indexes else "noop",
+            current,
+            changes,
+            update,
+            payload_indexes,
+        )
+
+    async def _create(self, collection_name: str, schema: CollectionSchema) -> None:
+        profile = schema.resolve_profile()
+        await self.client.create_collection(
+            collection_name=collection_name,
+            vectors_config=profile.apply_vectors_config(schema.vectors),
+            sparse_vectors_config=schema.sparse_vectors or None,
+            **profile.collection_kwargs(),
+        )
+
+    async def _records(
+        self, collection_name: str, transform: Optional[PointTransform]
+    ) -> AsyncIterator[models.PointStruct]:
+        """scroll 페이지 단위로 읽어 포인트 스트림으로 변환 (컬렉션 전체를 올리지 않음)"""
+        offset = None
+        while True:
+            records, offset = await self.client.scroll(
+                collection_name=collection_name,
+                limit=self.copy_batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            for record in records:
+                point = (
+                    transform(record)
+                    if transform
+                    else models.PointStruct(
+                        id=record.id, vector=record.vector or {}, payload=record.payload
+                    )
+                )
+                if point is not None:
+                    yield point
+            if offset is None:
+                break
+
+    async def _swap_alias(self, alias: str, collection_name: str) -> None:
+        """alias 삭제 + 생성을 한 요청으로 (원자적 교체)"""
+        operations = []
+        if alias in await self.aliases():
+            operations.append(
+                models.DeleteAliasOperation(
+                    delete_alias=models.DeleteAlias(alias_name=alias)
+                )
+            )
+        operations.append(
+            models.CreateAliasOperation(
+                create_alias=models.CreateAlias(
+                    collection_name=collection_name, alias_name=alias
+                )
+            )
+        )
+        await self.client.update_collection_aliases(
+            change_aliases_operations=operations
+        )
+
+    async def _adopt_legacy(self, name: str) -> str:
+        """
+        alias 도입 이전의 실제 컬렉션 → 같은 설정의 {name}_v{n} 으로 그대로 복사한 뒤 alias 로 전환
+        원본을 지우기 전에 복사본 건수를 확인하고, alias 생성이 실패해도 데이터는 복사본에 남는다
+        (원본 삭제 ~ alias 생성 사이의 짧은 구간에는 이 이름으로의 읽기가 실패할 수 있음)
+        """
+        info = await self.client.get_collection(collection_name=name)
+        params = info.config.params
+        backup = await self._next_version(name)
+        await self.client.create_collection(
+            collection_name=backup,
+            vectors_config=params.vectors,
+            sparse_vectors_config=params.sparse_vectors,
+            on_disk_payload=params.on_disk_payload,
+            hnsw_config=models.HnswConfigDiff(**info.config.hnsw_config.model_dump()),
+            quantization_config=info.config.quantization_config,
+        )
+        payload_indexes = self.repository.payload_indexes
+        await payload_indexes.ensure(
+            self.client,
+            backup,
+            await payload_indexes.existing_schemas(self.client, name),
+        )
+        try:
+            await self.repository.bulk_upsert(
+                backup,
+                self._records(name, None),
+                batch_size=self.copy_batch_size,
+                wait=True,
+            )
+            expected = (await self.client.count(name, exact=True)).count
+            copied = (await self.client.count(backup, exact=True)).count
+            if copied != expected:
+                raise RuntimeError(
+                    f"[schema:{name}] 복사 건수 불일치: {copied}/{expected}"
+                )
+        except Exception:
+            await self.client.delete_collection(collection_name=backup)
+            raise
+
+        logger.warning(
+            f"[schema:{name}] alias 없는 기존 컬렉션을 {backup} 로 복사하고 alias 로 전환합니다."
+        )
+        await self.client.delete_collection(collection_name=name)
+        try:
+            await self._swap_alias(name, backup)
+        except Exception:
+            logger.error(
+                f"[schema:{name}] alias 생성 실패 — 원본 데이터는 {backup} 에 보존되어 있습니다."
+            )
+            raise
+        finally:
+            self.repository.invalidate(name)
+        return backup
+
+    async def apply(
+        self,
+        schema: CollectionSchema,
+        transform: Optional[PointTransform] = None,
+        dry_run: bool = False,
+        drop_previous: bool = False,
+    ) -> SchemaApplyResult:
+        """
+        스키마 적용
+        - create: {name}_v1 생성 후 alias 연결
+        - update: 실제 컬렉션에 update_collection
+        - rebuild: 새 버전 생성 → 포인트 복사(transform 적용) → alias 교체
+        drop_previous=False 면 이전 버전을 남겨 alias 만 되돌려 롤백할 수 있다
+        """
+        started = time.perf_counter()
+        diff = await self.diff(schema)
+        for change in diff.changes:
+            logger.info(f"[schema:{schema.name}] {diff.action}: {change}")
+        result = SchemaApplyResult(
+            diff.action, diff.collection_name or schema.name, changes=diff.changes
+        )
+        if dry_run or diff.action == "noop":
+            return result
+        if diff.action == "rebuild" and diff.collection_name == schema.name:
+            # 원본을 보존한 채 alias 구조로 먼저 전환 → 이후는 일반 rebuild (롤백 가능)
+            diff.collection_name = await self._adopt_legacy(schema.name)
+
+        payload_indexes = self.repository.payload_indexes
+        if diff.action == "update":
+            if diff.update:
+                await self.client.update_collection(
+                    collection_name=diff.collection_name, **diff.update
+                )
+            # 명시적 스키마 적용 → 타입/플래그가 다른 인덱스는 다시 생성
+            await payload_indexes.ensure(
+                self.client, diff.collection_name, diff.payload_indexes, rebuild=True
+            )
+        else:
+            target = await self._next_version(schema.name)
+            await self._create(target, schema)
+            result.collection_name = target
+            result.previous = diff.collection_name
+
+            # 기존 인덱스 + 선언 인덱스를 복사 전에 생성 (적재하면서 색인)
+            indexes = dict(schema.payload_indexes)
+            if diff.collection_name is not None:
+                existing = await payload_indexes.existing_schemas(
+                    self.client, diff.collection_name
+                )
+                indexes = {**existing, **indexes}
+            await payload_indexes.ensure(self.client, target, indexes)
+
+            if diff.action == "rebuild":
+                try:
+                    # repository 경유 → 새 버전 컬렉션의 캐시도 무효화
+                    result.copy_stats = await self.repository.bulk_upsert(
+                        target,
+                        self._records(diff.collection_name, transform),
+                        batch_size=self.copy_batch_size,
+                        wait=True,
+                    )
+                except Exception:
+                    # alias 는 그대로 → 기존 컬렉션으로 계속 서비스
+                    await self.client.delete_collection(collection_name=target)
+                    raise
+
+            await self._swap_alias(schema.name, target)
+            if drop_previous and result.previous:
+                await self.client.delete_collection(collection_name=result.previous)
+
+        self.repository.invalidate(schema.name)
+        result.elapsed = time.perf_counter() - started
+        logger.info(
+            f"[schema:{schema.name}] {result.action} 완료 → {result.collection_name} "
+            f"({result.elapsed:.2f}s)"
+        )
+        return result
+
+    async def rollback(self, name: str) -> Optional[str]:
+        """alias 를 직전 버전으로 되돌림"""
+        current = await self.resolve(name)
+        versions = await self.versions(name)
+        if current not in versions or versions.index(current) == 0:
+            return None
+        previous = versions[versions.index(current) - 1]
+        await self._swap_alias(name, previous)
+        self.repository.invalidate(name)
+        return previous
+
+    async def cleanup(self, name: str, keep: int = 1) -> List[str]:
+        """alias 가 가리키지 않는 이전 버전 삭제 (최근 keep 개는 보존)"""
+        current = await self.resolve(name)
+        stale = [v for v in await self.versions(name) if v != current]
+        removed = stale[: max(len(stale) - keep, 0)]
+        for collection_name in removed:
+            await self.client.delete_collection(collection_name=collection_name)
+        return removed
+
+
+schema_manager = SchemaManager()
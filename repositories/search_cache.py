@@ -0,0 +1,156 @@
+# repositories/search_cache.py
+"""
+벡터 검색결과 캐시 (프로세스 내 LRU + TTL)
+- 키: 컬렉션, 양자화된 질의벡터, 필터, limit, payload 프로젝션 (+ 기타 검색 옵션)
+- 컬렉션별 generation 카운터: upsert/delete 시 증가시키면 이전 generation 항목은 조회시 폐기
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Hashable, Optional, Tuple
+import numpy as np
+from pydantic import BaseModel
+from qdrant_client import models
+
+
+@dataclass
+class SearchCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _quantize(values: Any, decimals: int) -> bytes:
+    """부동소수 오차로 키가 달라지지 않도록 소수점 decimals 자리로 양자화"""
+    array = np.asarray(values, dtype=np.float64)
+    return np.round(array * (10**decimals)).astype(np.int64).tobytes()
+
+
+def _freeze(value: Any, decimals: int) -> Hashable:
+    """질의/필터 등 임의 값을 해시 가능한 키로 변환"""
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    if isinstance(value, float):
+        return round(value, decimals)
+    if isinstance(value, np.ndarray):
+        return ("nd", value.shape, _quantize(value, decimals))
+    if isinstance(value, models.SparseVector):
+        return (
+            "sparse",
+            tuple(value.indices),
+            _quantize(value.values, decimals),
+        )
+    if isinstance(value, BaseModel):
+        return (type(value).__name__, value.model_dump_json(exclude_none=True))
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v, decimals)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(v, float) for v in value):
+            return ("vec", _quantize(value, decimals))
+        return tuple(_freeze(v, decimals) for v in value)
+    return repr(value)
+
+
+class SearchCache:
+    """LRU + TTL 검색 캐시 (컬렉션 generation 기반 무효화)"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, decimals: int = 4):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.decimals = decimals
+        self._entries: "OrderedDict[bytes, Tuple[int, float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._stats = SearchCacheStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def generation(self, collection_name: str) -> int:
+        return self._generations.get(collection_name, 0)
+
+    def make_key(
+        self,
+        collection_name: str,
+        query: Any,
+        query_filter: Optional[models.Filter],
+        limit: int,
+        with_payload: Any,
+        **options,
+    ) -> bytes:
+        frozen = (
+            collection_name,
+            _freeze(query, self.decimals),
+            _freeze(query_filter, self.decimals),
+            limit,
+            _freeze(with_payload, self.decimals),
+            _freeze(options, self.decimals),
+        )
+        return hashlib.blake2b(repr(frozen).encode(), digest_size=16).digest()
+
+    def get(self, collection_name: str, key: bytes) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+
+        generation, expires_at, value = entry
+        if generation != self.generation(collection_name):
+            # 쓰기 이후의 오래된 항목
+            del self._entries[key]
+            self._stats.invalidations += 1
+            self._stats.misses += 1
+            return None
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self._stats.expirations += 1
+            self._stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return value
+
+    def set(
+        self,
+        collection_name: str,
+        key: bytes,
+        value: Any,
+        generation: Optional[int] = None,
+    ) -> None:
+        """generation: 검색 시작 시점의 값 (검색 중 쓰기가 있었으면 저장 즉시 무효)"""
+        if not self.enabled:
+            return
+        self._entries[key] = (
+            self.generation(collection_name) if generation is None else generation,
+            time.monotonic() + self.ttl,
+            value,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    def invalidate(self, collection_name: str) -> None:
+        """컬렉션 쓰기 발생 → generation 증가 (기존 항목은 조회시 폐기)"""
+        self._generations[collection_name] = self.generation(collection_name) + 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **asdict(self._stats),
+            "hit_rate": round(self._stats.hit_rate, 4),
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,154 @@
+# repositories/single_flight.py
+"""
+동일 요청 single-flight (진행 중 호출 공유)
+- 같은 키의 호출이 진행 중이면 새로 실행하지 않고 그 결과(또는 예외)를 함께 받는다
+- 결과 캐시와 달리 완료 즉시 키를 제거 → 오래된 결과를 돌려줄 일이 없음 (캐시 미스 폭주 방지용)
+- 그룹(embedding / search / llm)별로 호출 수, 실제 실행 수, 합쳐진(collapsed) 호출 수 기록
+- 호출자 1명이 취소돼도 실행은 계속되어 나머지 대기자에게 결과 전달 (asyncio.shield)
+  대기자가 모두 취소되면(fan-out deadline 등) 실행도 취소해 작업을 남기지 않음
+"""
+
+import asyncio
+import functools
+import hashlib
+import re
+import unicodedata
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text: str, casefold: bool = False) -> str:
+    """키 정규화: NFKC + 공백 정리 (casefold=True 면 대소문자 무시)"""
+    text = _SPACES.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+    return text.casefold() if casefold else text
+
+
+def text_key(*parts: Any) -> bytes:
+    """임의 값 목록 → 고정 길이 키"""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).digest()
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0  # do() 호출 수
+    executions: int = 0  # 실제 실행 수 (leader)
+    collapsed: int = 0  # 진행 중 호출에 합쳐진 수
+    errors: int = 0  # 실패한 실행 수
+    max_waiters: int = 0  # 한 실행을 함께 기다린 최대 호출 수
+    cancelled: int = 0  # 대기자가 모두 취소되어 중단한 실행 수
+
+    @property
+    def collapse_rate(self) -> float:
+        return self.collapsed / self.calls if self.calls else 0.0
+
+
+class SingleFlight:
+    """키별 진행 중 Task 공유"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self._stats = SingleFlightStats()
+
+    async def do(
+        self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Any:
+        """key 로 진행 중인 fn 이 있으면 그 결과를 기다리고, 없으면 실행"""
+        self._stats.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self._stats.executions += 1
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._in_flight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(functools.partial(self._done, key))
+        else:
+            self._stats.collapsed += 1
+        self._waiters[key] += 1
+        self._stats.max_waiters = max(self._stats.max_waiters, self._waiters[key])
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            self._leave(key, task)
+            raise
+
+    def _leave(self, key: Hashable, task: asyncio.Task) -> None:
+        """취소된 대기자 제외, 남은 대기자가 없으면 실행 취소"""
+        if self._in_flight.get(key) is not task or task.done():
+            return
+        self._waiters[key] -= 1
+        if self._waiters[key] > 0:
+            return
+        # 취소 중인 Task 에 새 호출이 합쳐지지 않도록 키를 먼저 제거
+        del self._in_flight[key]
+        del self._waiters[key]
+        self._stats.cancelled += 1
+        task.cancel()
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            waiters = self._waiters.pop(key, 0)
+            if waiters > 1:
+                logger.debug(f"[single-flight] {self.name}: {waiters}건 호출 공유")
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self._stats.errors += 1
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **asdict(self._stats),
+            "collapse_rate": round(self._stats.collapse_rate, 4),
+            "in_flight": self.in_flight,
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def flight_group(name: str) -> SingleFlight:
+    """이름별 공유 그룹 (embedding / search / llm)"""
+    group = _groups.get(name)
+    if group is None:
+        group = _groups[name] = SingleFlight(name)
+    return group
+
+
+def flight_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: group.stats() for name, group in _groups.items()}
+
+
+def single_flight(
+    name: str, key: Optional[Callable[..., Hashable]] = None
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """
+    async 함수 데코레이터: 같은 인자(또는 key(*args, **kwargs))의 동시 호출을 1회로 합침
+    """
+
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        group = flight_group(name)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            flight_key = (
+                key(*args, **kwargs)
+                if key
+                else text_key(fn.__qualname__, args, sorted(kwargs.items()))
+            )
+            return await group.do(flight_key, fn, *args, **kwargs)
+
+        wrapper.flight = group
+        return wrapper
+
+    return decorator
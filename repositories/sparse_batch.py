@@ -0,0 +1,216 @@
+# repositories/sparse_batch.py
+"""
+BM25 등 sparse 벡터 배치의 CSR 표현
+- 행마다 SparseEmbedding/SparseVector(파이썬 리스트) 객체를 들고 있지 않고
+  indptr(int64) / indices(uint32) / values(float32) 세 배열로 보관
+- SparseTextEmbedding.embed 제너레이터 출력에서 바로 생성 (chunk_rows 단위로 압축)
+- 업로드 배치 분할은 indptr 슬라이스(view, 복사 없음), 직렬화는 배치 단위로 한 번에 처리
+"""
+
+from dataclasses import dataclass
+from typing import Any, Iterable, List, NamedTuple, Optional
+import numpy as np
+from qdrant_client import models
+
+
+class SparseRowView(NamedTuple):
+    """CSR 한 행 (fastembed SparseEmbedding 과 같은 indices/values 속성)"""
+
+    indices: np.ndarray
+    values: np.ndarray
+
+
+@dataclass
+class SparseBatch:
+    """
+    CSR sparse 벡터 배치
+    indptr 는 indices/values 의 절대 위치 (슬라이스 시 재계산 없이 공유)
+    """
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    values: np.ndarray
+
+    def __post_init__(self):
+        if self.indptr.ndim != 1 or self.indptr.size == 0:
+            raise ValueError("indptr 는 길이 1 이상의 1-D 배열이어야 합니다.")
+        if self.indices.shape != self.values.shape:
+            raise ValueError(
+                f"indices {self.indices.shape} / values {self.values.shape} 길이가 다릅니다."
+            )
+
+    @classmethod
+    def from_embeddings(
+        cls, embeddings: Iterable[Any], chunk_rows: int = 4096
+    ) -> "SparseBatch":
+        """SparseEmbedding(또는 SparseVector) iterable → CSR (전체 리스트를 만들지 않음)"""
+        lengths: List[int] = []
+        chunk_indices: List[np.ndarray] = []
+        chunk_values: List[np.ndarray] = []
+        row_indices: List[np.ndarray] = []
+        row_values: List[np.ndarray] = []
+
+        def compact():
+            if row_indices:
+                chunk_indices.append(np.concatenate(row_indices).astype(np.uint32))
+                chunk_values.append(np.concatenate(row_values).astype(np.float32))
+                row_indices.clear()
+                row_values.clear()
+
+        for embedding in embeddings:
+            indices = np.asarray(embedding.indices)
+            lengths.append(indices.size)
+            row_indices.append(indices)
+            row_values.append(np.asarray(embedding.values))
+            if len(row_indices) >= chunk_rows:
+                compact()
+        compact()
+
+        indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        return cls(
+            indptr=indptr,
+            indices=(
+                np.concatenate(chunk_indices)
+                if chunk_indices
+                else np.empty(0, np.uint32)
+            ),
+            values=(
+                np.concatenate(chunk_values)
+                if chunk_values
+                else np.empty(0, np.float32)
+            ),
+        )
+
+    def __len__(self) -> int:
+        return self.indptr.size - 1
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indptr[-1] - self.indptr[0])
+
+    @property
+    def nbytes(self) -> int:
+        start, stop = self.indptr[0], self.indptr[-1]
+        return (
+            self.indptr.nbytes
+            + self.indices[start:stop].nbytes
+            + self.values[start:stop].nbytes
+        )
+
+    def row(self, i: int) -> SparseRowView:
+        if i < 0:
+            i += len(self)
+        start, stop = self.indptr[i], self.indptr[i + 1]
+        return SparseRowView(self.indices[start:stop], self.values[start:stop])
+
+    def slice(self, start: int, stop: Optional[int] = None) -> "SparseBatch":
+        """행 범위 슬라이스 (indptr/indices/values 모두 view)"""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        return SparseBatch(self.indptr[start : stop + 1], self.indices, self.values)
+
+    def __getitem__(self, item):
+        # ArrayBatch.slice 에서 rows[start:stop] 으로 호출
+        if isinstance(item, slice):
+            if item.step not in (None, 1):
+                raise ValueError("SparseBatch 는 step 슬라이스를 지원하지 않습니다.")
+            return self.slice(item.start or 0, item.stop)
+        return self.row(item)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def to_models(self) -> List[models.SparseVector]:
+        """배치 단위 직렬화: 배열 전체를 한 번 tolist 한 뒤 행 경계로 나눔"""
+        start = int(self.indptr[0])
+        stop = int(self.indptr[-1])
+        indices = self.indices[start:stop].tolist()
+        values = self.values[start:stop].tolist()
+        offsets = (self.indptr - start).tolist()
+        # 값은 이미 uint32/float32 로 정규화되어 있으므로 pydantic 검증 생략
+        return [
+            models.SparseVector.model_construct(
+                indices=indices[a:b], values=values[a:b]
+            )
+            for a, b in zip(offsets[:-1], offsets[1:])
+        ]
+
+
+def bench(
+    n: int = 50_000, avg_nnz: int = 40, vocab: int = 1 << 20, batch_size: int = 256
+) -> dict:
+    """
+    BM25 형태 sparse 적재 비용 비교 (시간, 최대 메모리)
+    - list: 임베딩 목록을 전부 보관하고 행마다 SparseVector(indices.tolist(), ...) 생성
+    - csr: embed 제너레이터를 바로 SparseBatch 로 압축, 업로드 배치 단위로 직렬화
+    """
+    import time
+    import tracemalloc
+
+    rng = np.random.default_rng(0)
+    lengths = rng.poisson(avg_nnz, size=n).clip(1)
+
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    all_indices = rng.integers(0, vocab, size=offsets[-1], dtype=np.int64)
+    all_values = rng.random(offsets[-1])
+
+    def embed():
+        # fastembed SparseTextEmbedding.embed 출력 흉내 (행마다 새 ndarray)
+        for a, b in zip(offsets[:-1], offsets[1:]):
+            yield SparseRowView(all_indices[a:b].copy(), all_values[a:b].copy())
+
+    def list_path():
+        embeddings = list(embed())
+        for start in range(0, n, batch_size):
+            vectors = [
+                models.SparseVector(
+                    indices=e.indices.tolist(), values=e.values.tolist()
+                )
+                for e in embeddings[start : start + batch_size]
+            ]
+            models.PointsBatch(
+                batch=models.Batch(
+                    ids=list(range(start, start + len(vectors))),
+                    vectors={"bm25": vectors},
+                )
+            ).model_dump_json()
+        return embeddings
+
+    def csr_path():
+        batch = SparseBatch.from_embeddings(embed())
+        for start in range(0, n, batch_size):
+            vectors = batch.slice(start, start + batch_size).to_models()
+            models.PointsBatch(
+                batch=models.Batch.model_construct(
+                    ids=list(range(start, start + len(vectors))),
+                    vectors={"bm25": vectors},
+                )
+            ).model_dump_json()
+        return batch
+
+    result = {}
+    for name, fn in [("list", list_path), ("csr", csr_path)]:
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        held = fn()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del held
+        result[name] = {
+            "seconds": round(elapsed, 3),
+            "peak_mb": round(peak / 2**20, 2),
+            "resident_mb": round(current / 2**20, 2),  # 적재 후 보관 중인 sparse 데이터
+        }
+    return result
+
+
+if __name__ == "__main__":
+    # python -m repositories.sparse_batch
+    from pprint import pprint
+
+    pprint(bench())
@@ -0,0 +1,373 @@
+# repositories/tenant_repository.py
+"""
+멀티테넌트 벡터 저장 (데이터 유형별 컬렉션 1개 + 테넌트 payload 키)
+- 테넌트마다 컬렉션을 만들면 수백 개 이상에서 컬렉션/세그먼트 관리 비용이 커진다
+- 테넌트 키에 is_tenant=True keyword 인덱스 → 같은 테넌트 포인트를 세그먼트 안에서 모아 저장
+- multitenant 프로파일(m=0, payload_m=16): 전역 그래프 대신 테넌트별 HNSW 그래프만 구성
+- TenantRepository 는 모든 검색/조회/삭제에 테넌트 필터를, 쓰기에 테넌트 payload 를 자동으로 넣는다
+- 포인트 id 는 컬렉션 전체에서 유일해야 하므로 TenantRepository 가 호출자 id 를 tenant_point_id() 로
+  (테넌트, id) 기반 uuid5 로 바꿔 저장 → 다른 테넌트가 같은 id 로 써도 서로 덮어쓰지 않음
+  (호출자 id 는 payload[POINT_KEY] 에 보존, id 삭제도 같은 변환 적용)
+"""
+
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from qdrant_client import models
+from core.settings import vector_setting
+from repositories.bulk_upsert import BulkUpsertStats, PointSource
+from repositories.schema_manager import (
+    CollectionSchema,
+    SchemaApplyResult,
+    SchemaManager,
+)
+from repositories.vector_codec import ArrayBatch
+from repositories.vector_repository import VectorRepository, vector_repository
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 테넌트 컬렉션 payload 에 보존하는 호출자 포인트 id
+POINT_KEY = "point_key"
+
+
+def tenant_index(on_disk: bool = False) -> models.KeywordIndexParams:
+    """테넌트 키 payload 인덱스 (is_tenant=True)"""
+    return models.KeywordIndexParams(
+        type=models.KeywordIndexType.KEYWORD, is_tenant=True, on_disk=on_disk or None
+    )
+
+
+def tenant_point_id(tenant_id: str, key: Any) -> str:
+    """테넌트 내 키 → 컬렉션 전체에서 유일한 포인트 id"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{tenant_id}/{key}"))
+
+
+async def ensure_tenant_collection(
+    collection_name: str,
+    vectors: Union[models.VectorParams, Dict[str, models.VectorParams], None] = None,
+    sparse_vectors: Optional[Dict[str, models.SparseVectorParams]] = None,
+    tenant_key: Optional[str] = None,
+    payload_indexes: Optional[Dict[str, Any]] = None,
+    profile: str = "multitenant",
+    manager: Optional[SchemaManager] = None,
+) -> SchemaApplyResult:
+    """테넌트 공유 컬렉션 생성/스키마 적용 (테넌트 인덱스를 적재 전에 생성)"""
+    tenant_key = tenant_key or vector_setting.tenant_collections.get(
+        collection_name, vector_setting.tenant_key
+    )
+    manager = manager or SchemaManager()
+    return await manager.apply(
+        CollectionSchema(
+            name=collection_name,
+            vectors=vectors,
+            sparse_vectors=sparse_vectors or {},
+            profile=profile,
+            payload_indexes={tenant_key: tenant_index(), **(payload_indexes or {})},
+        )
+    )
+
+
+class TenantRepository(VectorRepository):
+    """
+    테넌트 1개에 묶인 VectorRepository (클라이언트/캐시/planner/single-flight 는 base 와 공유)
+    collections 에 포함된 컬렉션만 테넌트 필터/payload 를 적용하고 나머지는 그대로 전달
+    HybridSearchService / FanoutSearchService 의 repository 로 그대로 사용할 수 있다
+    """
+
+    def __init__(
+        self,
+        tenant_id: str,
+        collections: Optional[Dict[str, str]] = None,
+        base: VectorRepository = vector_repository,
+    ):
+        # 캐시 / 인덱스 기록 / planner / single-flight 는 base 와 공유
+        super().__init__(
+            base._client,
+            cache=base.cache,
+            payload_indexes=base.payload_indexes,
+            planner=base.planner,
+            flights=base.flights,
+        )
+        self.tenant_id = tenant_id
+        # 컬렉션 → 테넌트 payload 키
+        self.collections = (
+            collections
+            if collections is not None
+            else vector_setting.tenant_collections
+        )
+
+    def is_tenant_collection(self, collection_name: str) -> bool:
+        return collection_name in self.collections
+
+    def tenant_condition(self, collection_name: str) -> models.FieldCondition:
+        return models.FieldCondition(
+            key=self.collections[collection_name],
+            match=models.MatchValue(value=self.tenant_id),
+        )
+
+    def scope_filter(
+        self, collection_name: str, query_filter: Optional[models.Filter]
+    ) -> Optional[models.Filter]:
+        """query_filter AND 테넌트 조건"""
+        if not self.is_tenant_collection(collection_name):
+            return query_filter
+        must: List[Any] = [self.tenant_condition(collection_name)]
+        if query_filter is not None:
+            must.append(query_filter)
+        return models.Filter(must=must)
+
+    def _scope_prefetch(self, collection_name: str, prefetch: Any) -> Any:
+        """prefetch 분기(중첩 포함) 마다 테넌트 조건 적용"""
+        if prefetch is None or not self.is_tenant_collection(collection_name):
+            return prefetch
+        if isinstance(prefetch, list):
+            return [self._scope_prefetch(collection_name, p) for p in prefetch]
+        return prefetch.model_copy(
+            update={
+                "filter": self.scope_filter(collection_name, prefetch.filter),
+                "prefetch": self._scope_prefetch(collection_name, prefetch.prefetch),
+            }
+        )
+
+    def point_id(self, key: Any) -> str:
+        """호출자 id → 테넌트 컬렉션에 저장되는 포인트 id"""
+        if isinstance(key, np.generic):
+            key = key.item()
+        return tenant_point_id(self.tenant_id, key)
+
+    def _stamp(self, collection_name: str, payload: Optional[dict], key: Any) -> dict:
+        tenant_key = self.collections[collection_name]
+        payload = dict(payload or {})
+        current = payload.setdefault(tenant_key, self.tenant_id)
+        if current != self.tenant_id:
+            raise ValueError(
+                f"[{collection_name}] 다른 테넌트({current}) 포인트는 쓸 수 없습니다."
+            )
+        payload.setdefault(
+            POINT_KEY, key.item() if isinstance(key, np.generic) else key
+        )
+        return payload
+
+    def _stamp_points(self, collection_name: str, points: Any) -> Any:
+        """쓰기 포인트에 테넌트 payload 추가 + id 를 테넌트 id 로 변환"""
+        if not self.is_tenant_collection(collection_name):
+            return points
+        if isinstance(points, ArrayBatch):
+            payloads = points.payloads or [None] * len(points)
+            return ArrayBatch(
+                ids=[self.point_id(i) for i in points.ids],
+                dense=points.dense,
+                sparse=points.sparse,
+                payloads=[
+                    self._stamp(collection_name, p, i)
+                    for p, i in zip(payloads, points.ids)
+                ],
+            )
+        if isinstance(points, models.Batch):
+            payloads = points.payloads or [None] * len(points.ids)
+            return points.model_copy(
+                update={
+                    "ids": [self.point_id(i) for i in points.ids],
+                    "payloads": [
+                        self._stamp(collection_name, p, i)
+                        for p, i in zip(payloads, points.ids)
+                    ],
+                }
+            )
+        if hasattr(points, "__aiter__"):
+
+            async def stamped():
+                async for point in points:
+                    yield self._stamp_point(collection_name, point)
+
+            return stamped()
+        return (self._stamp_point(collection_name, p) for p in points)
+
+    def _stamp_point(
+        self, collection_name: str, point: models.PointStruct
+    ) -> models.PointStruct:
+        return point.model_copy(
+            update={
+                "id": self.point_id(point.id),
+                "payload": self._stamp(collection_name, point.payload, point.id),
+            }
+        )
+
+    async def upsert(
+        self,
+        collection_name: str,
+        points: Union[List[models.PointStruct], models.Batch, ArrayBatch],
+        wait: bool = True,
+    ) -> models.UpdateResult:
+        points = self._stamp_points(collection_name, points)
+        if not isinstance(points, (models.Batch, ArrayBatch)):
+            points = list(points)
+        return await super().upsert(collection_name, points, wait)
+
+    async def bulk_upsert(
+        self, collection_name: str, points: Union[PointSource, ArrayBatch], **kwargs
+    ) -> BulkUpsertStats:
+        return await super().bulk_upsert(
+            collection_name, self._stamp_points(collection_name, points), **kwargs
+        )
+
+    async def query(
+        self,
+        collection_name: str,
+        query: Any = None,
+        query_filter: Optional[models.Filter] = None,
+        limit: int = 10,
+        with_payload: Union[bool, Sequence[str]] = True,
+        with_vectors: Union[bool, Sequence[str]] = False,
+        use_cache: bool = True,
+        **kwargs,
+    ) -> List[models.ScoredPoint]:
+        if "prefetch" in kwargs:
+            kwargs["prefetch"] = self._scope_prefetch(
+                collection_name, kwargs["prefetch"]
+            )
+        return await super().query(
+            collection_name,
+            query,
+            self.scope_filter(collection_name, query_filter),
+            limit,
+            with_payload,
+            with_vectors,
+            use_cache,
+            **kwargs,
+        )
+
+    async def query_groups(
+        self,
+        collection_name: str,
+        group_by: str,
+        query: Any = None,
+        query_filter: Optional[models.Filter] = None,
+        **kwargs,
+    ) -> List[models.PointGroup]:
+        """
+        with_lookup 이 테넌트 컬렉션이면 서버 lookup(id 조회, 필터 없음) 대신
+        그룹 id → 테넌트 포인트 id 로 바꿔 테넌트 조건과 함께 직접 조회
+        """
+        if "prefetch" in kwargs:
+            kwargs["prefetch"] = self._scope_prefetch(
+                collection_name, kwargs["prefetch"]
+            )
+        lookup = kwargs.get("with_lookup")
+        if isinstance(lookup, str):
+            lookup = models.WithLookup(
+                collection=lookup, with_payload=True, with_vectors=False
+            )
+        if lookup is not None and self.is_tenant_collection(lookup.collection):
+            kwargs["with_lookup"] = None
+        else:
+            lookup = None
+        groups = await super().query_groups(
+            collection_name,
+            group_by,
+            query,
+            self.scope_filter(collection_name, query_filter),
+            **kwargs,
+        )
+        if lookup is None or not groups:
+            return groups
+        return await self._tenant_lookup(lookup, groups)
+
+    async def _tenant_lookup(
+        self, lookup: models.WithLookup, groups: List[models.PointGroup]
+    ) -> List[models.PointGroup]:
+        ids = {self.point_id(group.id): group for group in groups}
+        records, _ = await self.scroll(
+            lookup.collection,
+            models.Filter(must=[models.HasIdCondition(has_id=list(ids))]),
+            limit=len(ids),
+            with_payload=True if lookup.with_payload is None else lookup.with_payload,
+            with_vectors=lookup.with_vectors or False,
+        )
+        found = {str(record.id): record for record in records}
+        return [
+            group.model_copy(update={"lookup": found.get(point_id)})
+            for point_id, group in ids.items()
+        ]
+
+    async def query_batch(
+        self, collection_name: str, requests: Sequence[models.QueryRequest]
+    ) -> List[List[models.ScoredPoint]]:
+        return await super().query_batch(
+            collection_name,
+            [
+                request.model_copy(
+                    update={
+                        "filter": self.scope_filter(collection_name, request.filter),
+                        "prefetch": self._scope_prefetch(
+                            collection_name, request.prefetch
+                        ),
+                    }
+                )
+                for request in requests
+            ],
+        )
+
+    async def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[models.Filter] = None,
+        limit: int = 100,
+        offset: Optional[models.ExtendedPointId] = None,
+        with_payload: Union[bool, Sequence[str]] = True,
+        with_vectors: Union[bool, Sequence[str]] = False,
+    ) -> Tuple[List[models.Record], Optional[models.ExtendedPointId]]:
+        return await super().scroll(
+            collection_name,
+            self.scope_filter(collection_name, scroll_filter),
+            limit,
+            offset,
+            with_payload,
+            with_vectors,
+        )
+
+    async def count(
+        self, collection_name: str, count_filter: Optional[models.Filter] = None
+    ) -> int:
+        result = await self.client.count(
+            collection_name=collection_name,
+            count_filter=self.scope_filter(collection_name, count_filter),
+            exact=True,
+        )
+        return result.count
+
+    async def delete(
+        self,
+        collection_name: str,
+        points_selector: Union[
+            List[models.ExtendedPointId], models.Filter, models.PointsSelector
+        ],
+        wait: bool = True,
+    ) -> models.UpdateResult:
+        """
+        id 삭제도 테넌트 조건과 함께 필터 삭제로 변환 (다른 테넌트 포인트 보호)
+        id 는 쓰기와 같이 호출자 id → 테넌트 포인트 id 로 변환
+        """
+        if self.is_tenant_collection(collection_name):
+            if isinstance(points_selector, models.PointIdsList):
+                points_selector = points_selector.points
+            if isinstance(points_selector, models.FilterSelector):
+                points_selector = points_selector.filter
+            if isinstance(points_selector, list):
+                points_selector = models.Filter(
+                    must=[
+                        models.HasIdCondition(
+                            has_id=[self.point_id(i) for i in points_selector]
+                        )
+                    ]
+                )
+            points_selector = self.scope_filter(collection_name, points_selector)
+        return await super().delete(collection_name, points_selector, wait)
+
+
+def for_tenant(
+    tenant_id: str, base: VectorRepository = vector_repository
+) -> TenantRepository:
+    """VectorSettings.tenant_collections 기준 테넌트 repository"""
+    return TenantRepository(tenant_id, base=base)
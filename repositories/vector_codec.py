@@ -0,0 +1,201 @@
+# repositories/vector_codec.py
+"""
+NumPy 배열 → Qdrant 요청 변환
+- 포인트마다 PointStruct + vectors[i].tolist() 를 만들지 않고, 2-D ndarray 배치를 그대로 들고 다닌다.
+- 배치 분할은 ndarray 슬라이스(view, 복사 없음)로 하고,
+  업로드 직전에 배치 단위로 한 번만 models.Batch 로 변환한다(행렬 전체 tolist 는 C 레벨에서 처리).
+- fastembed SparseEmbedding(indices/values ndarray)도 그대로 받는다.
+  (ArrayBatch.of 에서 CSR 배열인 SparseBatch 로 압축)
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Union
+import numpy as np
+from qdrant_client import models
+from repositories.sparse_batch import SparseBatch
+
+DenseArray = np.ndarray  # shape (n, dim)
+VectorsInput = Union[DenseArray, Dict[str, DenseArray]]
+
+
+def as_float32(array: Any) -> np.ndarray:
+    """float32 연속 배열로 변환 (이미 float32 C-order면 복사 없음)"""
+    return np.ascontiguousarray(array, dtype=np.float32)
+
+
+def is_sparse_embedding(value: Any) -> bool:
+    """fastembed SparseEmbedding 류(indices/values ndarray) 판별"""
+    return isinstance(getattr(value, "indices", None), np.ndarray) and isinstance(
+        getattr(value, "values", None), np.ndarray
+    )
+
+
+def to_sparse_vector(value: Any) -> models.SparseVector:
+    """SparseEmbedding → SparseVector"""
+    if isinstance(value, models.SparseVector):
+        return value
+    return models.SparseVector(
+        indices=value.indices.astype(np.uint32, copy=False).tolist(),
+        values=value.values.astype(np.float32, copy=False).tolist(),
+    )
+
+
+def to_query(query: Any) -> Any:
+    """검색 질의 변환: 1-D ndarray → list, SparseEmbedding → SparseVector"""
+    if isinstance(query, np.ndarray):
+        if query.ndim != 1:
+            raise ValueError(f"query 벡터는 1-D 이어야 합니다. shape={query.shape}")
+        return as_float32(query).tolist()
+    if is_sparse_embedding(query):
+        return to_sparse_vector(query)
+    return query
+
+
+@dataclass
+class ArrayBatch:
+    """ndarray 기반 포인트 배치 (dense: 2-D 배열, sparse: SparseBatch 또는 SparseEmbedding 목록)"""
+
+    ids: Union[np.ndarray, Sequence[models.ExtendedPointId]]
+    dense: Dict[str, DenseArray] = field(default_factory=dict)
+    sparse: Dict[str, Sequence[Any]] = field(default_factory=dict)
+    payloads: Optional[Sequence[Optional[Dict[str, Any]]]] = None
+
+    def __post_init__(self):
+        n = len(self.ids)
+        for name, array in self.dense.items():
+            if array.ndim != 2 or array.shape[0] != n:
+                raise ValueError(
+                    f"dense[{name!r}] shape {array.shape} 이 ids 수({n})와 맞지 않습니다."
+                )
+        for name, rows in self.sparse.items():
+            if len(rows) != n:
+                raise ValueError(
+                    f"sparse[{name!r}] 길이({len(rows)})가 ids 수({n})와 맞지 않습니다."
+                )
+        if self.payloads is not None and len(self.payloads) != n:
+            raise ValueError("payloads 길이가 ids 수와 맞지 않습니다.")
+
+    @classmethod
+    def of(
+        cls,
+        ids: Union[np.ndarray, Sequence[models.ExtendedPointId]],
+        vectors: Optional[VectorsInput] = None,
+        sparse: Optional[Dict[str, Sequence[Any]]] = None,
+        payloads: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    ) -> "ArrayBatch":
+        """
+        vectors 가 단일 배열이면 이름없는(default) 벡터로 취급
+        sparse 는 SparseEmbedding iterable(embed 제너레이터 포함) → SparseBatch 로 변환
+        """
+        if vectors is None:
+            dense = {}
+        elif isinstance(vectors, np.ndarray):
+            dense = {"": vectors}
+        else:
+            dense = dict(vectors)
+        sparse = {
+            name: (
+                rows
+                if isinstance(rows, SparseBatch)
+                else SparseBatch.from_embeddings(rows)
+            )
+            for name, rows in (sparse or {}).items()
+        }
+        return cls(ids=ids, dense=dense, sparse=sparse, payloads=payloads)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def slice(self, start: int, stop: int) -> "ArrayBatch":
+        """행 범위 슬라이스 (ndarray 는 view, 복사 없음)"""
+        return ArrayBatch(
+            ids=self.ids[start:stop],
+            dense={name: array[start:stop] for name, array in self.dense.items()},
+            sparse={name: rows[start:stop] for name, rows in self.sparse.items()},
+            payloads=None if self.payloads is None else self.payloads[start:stop],
+        )
+
+    def to_models(self) -> models.Batch:
+        """업로드 직전 직렬화: 배치 단위 벡터화 변환"""
+        ids = self.ids.tolist() if isinstance(self.ids, np.ndarray) else list(self.ids)
+
+        vectors: Dict[str, list] = {
+            name: as_float32(array).tolist() for name, array in self.dense.items()
+        }
+        for name, rows in self.sparse.items():
+            if isinstance(rows, SparseBatch):
+                vectors[name] = rows.to_models()
+            else:
+                vectors[name] = [to_sparse_vector(row) for row in rows]
+
+        # 이름없는 단일 dense 벡터는 리스트로 전달
+        if list(vectors) == [""]:
+            batch_vectors = vectors[""]
+        else:
+            batch_vectors = vectors
+
+        # 값은 위에서 이미 정규화했으므로 pydantic 검증(리스트 재복사)을 생략
+        return models.Batch.model_construct(
+            ids=ids,
+            vectors=batch_vectors,
+            payloads=None if self.payloads is None else list(self.payloads),
+        )
+
+
+def bench(
+    n: int = 10_000, dim: int = 384, batch_size: int = 256
+) -> Dict[str, Dict[str, float]]:
+    """
+    10k 포인트 적재 요청 생성 비용 비교 (시간, 최대 메모리)
+    - point_struct: 기존 방식, 행마다 vectors[i].tolist() + PointStruct 를 전부 만든 뒤 업로드
+    - array_batch: ndarray view 슬라이스를 업로드 직전에 배치 단위로 변환
+    """
+    import time
+    import tracemalloc
+
+    rng = np.random.default_rng(0)
+    vectors = rng.random((n, dim), dtype=np.float32)
+    payloads = [{"no": i} for i in range(n)]
+
+    def point_struct_path():
+        points = [
+            models.PointStruct(id=i, vector=vectors[i].tolist(), payload=payloads[i])
+            for i in range(n)
+        ]
+        for start in range(0, n, batch_size):
+            models.PointsList(
+                points=points[start : start + batch_size]
+            ).model_dump_json()
+
+    def array_batch_path():
+        batch = ArrayBatch.of(np.arange(n), vectors, payloads=payloads)
+        for start in range(0, n, batch_size):
+            models.PointsBatch(
+                batch=batch.slice(start, start + batch_size).to_models()
+            ).model_dump_json()
+
+    result = {}
+    for name, fn in [
+        ("point_struct", point_struct_path),
+        ("array_batch", array_batch_path),
+    ]:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result[name] = {
+            "seconds": round(elapsed, 4),
+            "peak_mb": round(peak / 2**20, 2),
+        }
+    return result
+
+
+if __name__ == "__main__":
+    # python -m repositories.vector_codec
+    from pprint import pprint
+
+    pprint(bench())
@@ -1,42 +1,472 @@
-# services/user_service.py
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from schemas.user_schema import UserCreate, UserUpdate, User
-from repositories.manager import db_manager
-
-
-class UserService:
-    def __init__(self):
-        self.repository = db_manager.user
-
-    def get_user(self, db: Session, user_id: int) -> Optional[User]:
-        return self.repository.get(db, user_id)
-
-    def get_users(
-        self, db: Session, skip: int = 0, limit: int = 100, active_only: bool = False
-    ) -> List[User]:
-        filters = {"is_active": True} if active_only else None
-        return self.repository.get_multi(db, skip=skip, limit=limit, filters=filters)
-
-    def create_user(self, db: Session, user_in: UserCreate) -> User:
-        # 비즈니스 로직 처리
-        user_data = user_in.dict()
-        user_data["hashed_password"] = get_password_hash(user_data.pop("password"))
-
-        # 이메일 중복 확인
-        existing_user = self.repository.get_by_email(db, email=user_data["email"])
-        if existing_user:
-            raise ValueError("Email already registered")
-
-        return self.repository.create(db, obj_in=UserCreate(**user_data))
-
-    def authenticate_user(
-        self, db: Session, email: str, password: str
-    ) -> Optional[User]:
-        user = self.repository.get_by_email(db, email=email)
-        if not user or not verify_password(password, user.hashed_password):
+# repositories/vector_repository.py
+import asyncio
+import time
+from typing import (
+    Optional,
+    List,
+    Dict,
+    Any,
+    Awaitable,
+    Callable,
+    Sequence,
+    Tuple,
+    Union,
+)
+from qdrant_client import AsyncQdrantClient, models
+from core.settings import vector_setting
+from core.vector_db import get_vector_client
+from repositories.bulk_upsert import BulkUpsertStats, PointSource, bulk_upsert
+from repositories.vector_codec import ArrayBatch, to_query
+from repositories.search_cache import SearchCache
+from repositories.collection_profile import CollectionProfile, get_profile, profile_for
+from repositories.payload_index import IndexAdvice, PayloadIndexManager
+from repositories.query_planner import QueryPlan, QueryPlanner
+from repositories.single_flight import SingleFlight, flight_group
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _detach(result: Sequence[Any]) -> List[Any]:
+    """캐시 / single-flight 로 공유되는 결과의 호출자별 사본 (호출자가 수정해도 캐시는 그대로)"""
+    return [item.model_copy(deep=True) for item in result]
+
+
+class VectorRepository:
+    """Qdrant 접근 레포지토리 (공유 AsyncQdrantClient 사용)"""
+
+    def __init__(
+        self,
+        client: Optional[AsyncQdrantClient] = None,
+        cache: Optional[SearchCache] = None,
+        payload_indexes: Optional[PayloadIndexManager] = None,
+        planner: Optional[QueryPlanner] = None,
+        flights: Optional[SingleFlight] = None,
+    ):
+        # client 미지정시 lifespan에서 생성된 공유 클라이언트를 사용
+        self._client = client
+        self.cache = cache or SearchCache(
+            maxsize=vector_setting.search_cache_size,
+            ttl=vector_setting.search_cache_ttl,
+        )
+        # 필터 사용량 기록 → payload 인덱스 advise/생성
+        self.payload_indexes = payload_indexes or PayloadIndexManager()
+        # 필터 검색의 exact / HNSW / hnsw_ef 상향 선택 (planner_enabled=False 면 미사용)
+        self.planner = planner or (
+            QueryPlanner() if vector_setting.planner_enabled else None
+        )
+        # 캐시 미스된 동일 검색의 동시 호출은 query_points 1회로 합침
+        self.flights = flights or (
+            flight_group("search") if vector_setting.single_flight_enabled else None
+        )
+
+    @property
+    def client(self) -> AsyncQdrantClient:
+        return self._client or get_vector_client()
+
+    def invalidate(self, collection_name: str) -> None:
+        """
+        쓰기 후 검색결과 / planner count 캐시 무효화
+        repository 를 거치지 않는 쓰기(스키마 교체, 별도 프로세스 적재 등) 후에도 호출
+        """
+        self.cache.invalidate(collection_name)
+        if self.planner is not None:
+            self.planner.invalidate(collection_name)
+
+    async def collection_exists(self, collection_name: str) -> bool:
+        return await self.client.collection_exists(collection_name=collection_name)
+
+    async def create_collection(
+        self,
+        collection_name: str,
+        vectors_config: Union[
+            models.VectorParams, Dict[str, models.VectorParams], None
+        ] = None,
+        profile: Union[str, CollectionProfile, None] = None,
+        **kwargs,
+    ) -> bool:
+        """
+        컬렉션 생성 (이미 존재하면 생략)
+        profile 의 HNSW/양자화/on_disk 설정을 적용 (kwargs 로 직접 넘긴 값이 우선)
+        vectors_config 미지정시 vector_dim 크기의 Cosine 단일 벡터
+        """
+        if await self.collection_exists(collection_name):
+            return False
+        if not isinstance(profile, CollectionProfile):
+            profile = get_profile(profile) if profile else profile_for(collection_name)
+        logger.info(f"[{collection_name}] 컬렉션 생성 (profile={profile.name})")
+        return await self.client.create_collection(
+            collection_name=collection_name,
+            vectors_config=profile.apply_vectors_config(vectors_config),
+            **{**profile.collection_kwargs(), **kwargs},
+        )
+
+    async def upsert(
+        self,
+        collection_name: str,
+        points: Union[List[models.PointStruct], models.Batch, ArrayBatch],
+        wait: bool = True,
+    ) -> models.UpdateResult:
+        if isinstance(points, ArrayBatch):
+            points = points.to_models()
+        try:
+            return await self.client.upsert(
+                collection_name=collection_name, points=points, wait=wait
+            )
+        finally:
+            self.invalidate(collection_name)
+
+    async def bulk_upsert(
+        self, collection_name: str, points: Union[PointSource, ArrayBatch], **kwargs
+    ) -> BulkUpsertStats:
+        """대용량 적재: 배치 분할 + 병렬 업로드 + 재시도 (BulkUpserter 옵션 전달)"""
+        self.invalidate(collection_name)
+        try:
+            return await bulk_upsert(self.client, collection_name, points, **kwargs)
+        finally:
+            self.invalidate(collection_name)
+
+    async def _plan(
+        self,
+        collection_name: str,
+        query_filter: Optional[models.Filter],
+        limit: int,
+        prefetch: Any = None,
+    ) -> Tuple[Optional[QueryPlan], Optional[models.SearchParams]]:
+        """프로파일 검색 파라미터 (필터 검색은 planner 가 exact / hnsw_ef 결정)"""
+        profile = profile_for(collection_name)
+        if self.planner is not None and query_filter is not None and not prefetch:
+            plan = await self.planner.plan(
+                self.client, collection_name, query_filter, profile, limit
+            )
+            return plan, plan.search_params
+        return None, profile.search_params()
+
+    async def _plan_prefetch(self, collection_name: str, prefetch: Any) -> Any:
+        """
+        params 미지정 dense prefetch 분기의 검색 파라미터 (필터 분기는 planner 가 exact / hnsw_ef 결정)
+        execute 안에서만 호출 → 캐시 적중시 count 요청 없음. sparse 분기는 HNSW 파라미터 불필요
+        """
+        if prefetch is None:
+            return None
+        profile = profile_for(collection_name)
+
+        async def plan(branch: Any) -> Any:
+            # dense 질의(벡터 리스트)만 대상
+            if (
+                not isinstance(branch, models.Prefetch)
+                or branch.params is not None
+                or not isinstance(branch.query, list)
+            ):
+                return branch
+            if self.planner is not None and branch.filter is not None:
+                params = (
+                    await self.planner.plan(
+                        self.client,
+                        collection_name,
+                        branch.filter,
+                        profile,
+                        branch.limit or 10,
+                    )
+                ).search_params
+            else:
+                params = profile.search_params()
+            return branch.model_copy(update={"params": params})
+
+        if not isinstance(prefetch, list):
+            return await plan(prefetch)
+        return list(await asyncio.gather(*(plan(branch) for branch in prefetch)))
+
+    async def _cached(
+        self,
+        collection_name: str,
+        key: Optional[bytes],
+        execute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """결과 캐시 → single-flight → execute 순서로 조회 (key=None 이면 바로 실행)"""
+        if key is None:
+            return await execute()
+        if self.cache.enabled:
+            cached = self.cache.get(collection_name, key)
+            if cached is not None:
+                return _detach(cached)
+        generation = self.cache.generation(collection_name)
+        if self.flights is not None:
+            # generation 포함 → 쓰기 이후 호출은 쓰기 이전 검색에 합쳐지지 않음
+            # (그룹은 repository 간 공유 → 클라이언트도 키에 포함)
+            result = await self.flights.do(
+                (id(self.client), collection_name, generation, key), execute
+            )
+        else:
+            result = await execute()
+        self.cache.set(collection_name, key, result, generation)
+        return _detach(result)
+
+    def _result_key(self, use_cache: bool, *args, **options) -> Optional[bytes]:
+        if not use_cache or not (self.cache.enabled or self.flights is not None):
             return None
-        return user
+        return self.cache.make_key(*args, **options)
+
+    async def query(
+        self,
+        collection_name: str,
+        query: Any = None,
+        query_filter: Optional[models.Filter] = None,
+        limit: int = 10,
+        with_payload: Union[bool, Sequence[str]] = True,
+        with_vectors: Union[bool, Sequence[str]] = False,
+        use_cache: bool = True,
+        **kwargs,
+    ) -> List[models.ScoredPoint]:
+        """
+        query_points 검색결과(points) 반환 (ndarray/SparseEmbedding 질의 허용)
+        search_params / dense prefetch params 미지정시 컬렉션 프로파일의 검색 파라미터 적용
+        (필터 검색은 planner 가 필터 선택도에 따라 exact / hnsw_ef 결정, 캐시 미스일 때만)
+        use_cache=False 면 결과 캐시와 single-flight 를 모두 건너뜀
+        """
+        query = to_query(query)
+        self._record_filters(collection_name, query_filter, kwargs.get("prefetch"))
+
+        async def execute() -> List[models.ScoredPoint]:
+            plan, options = None, kwargs
+            if "search_params" not in kwargs:
+                plan, params = await self._plan(
+                    collection_name, query_filter, limit, kwargs.get("prefetch")
+                )
+                options = {**kwargs, "search_params": params}
+            if kwargs.get("prefetch") is not None:
+                options = {
+                    **options,
+                    "prefetch": await self._plan_prefetch(
+                        collection_name, kwargs["prefetch"]
+                    ),
+                }
+            started = time.perf_counter()
+            response = await self.client.query_points(
+                collection_name=collection_name,
+                query=query,
+                query_filter=query_filter,
+                limit=limit,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
+                **options,
+            )
+            if plan is not None:
+                self.planner.observe(plan, time.perf_counter() - started)
+            return response.points
+
+        key = self._result_key(
+            use_cache,
+            collection_name,
+            query,
+            query_filter,
+            limit,
+            with_payload,
+            with_vectors=with_vectors,
+            **kwargs,
+        )
+        return await self._cached(collection_name, key, execute)
+
+    async def query_groups(
+        self,
+        collection_name: str,
+        group_by: str,
+        query: Any = None,
+        query_filter: Optional[models.Filter] = None,
+        limit: int = 10,
+        group_size: int = 3,
+        with_lookup: Union[str, models.WithLookup, None] = None,
+        with_payload: Union[bool, Sequence[str]] = True,
+        with_vectors: Union[bool, Sequence[str]] = False,
+        use_cache: bool = True,
+        **kwargs,
+    ) -> List[models.PointGroup]:
+        """
+        query_points_groups: group_by payload 값(문서 id 등)이 서로 다른 그룹 limit 개,
+        그룹마다 점수 상위 group_size 건 (청크 over-fetch 후 중복 제거 대신 요청 1회)
+        with_lookup: 그룹 id 를 포인트 id 로 다른 컬렉션(문서 단위)에서 함께 조회
+        (컬렉션명 또는 WithLookup). 검색 파라미터 / 캐시 / single-flight 는 query() 와 동일
+        """
+        query = to_query(query)
+        if isinstance(with_lookup, str):
+            # 컬렉션명만 주면 문서 payload 포함 (벡터 제외)
+            with_lookup = models.WithLookup(
+                collection=with_lookup, with_payload=True, with_vectors=False
+            )
+        self._record_filters(collection_name, query_filter, kwargs.get("prefetch"))
+
+        async def execute() -> List[models.PointGroup]:
+            plan, options = None, kwargs
+            if "search_params" not in kwargs:
+                plan, params = await self._plan(
+                    collection_name,
+                    query_filter,
+                    limit * group_size,
+                    kwargs.get("prefetch"),
+                )
+                options = {**kwargs, "search_params": params}
+            if kwargs.get("prefetch") is not None:
+                options = {
+                    **options,
+                    "prefetch": await self._plan_prefetch(
+                        collection_name, kwargs["prefetch"]
+                    ),
+                }
+            started = time.perf_counter()
+            response = await self.client.query_points_groups(
+                collection_name=collection_name,
+                group_by=group_by,
+                query=query,
+                query_filter=query_filter,
+                limit=limit,
+                group_size=group_size,
+                with_lookup=with_lookup,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
+                **options,
+            )
+            if plan is not None:
+                self.planner.observe(plan, time.perf_counter() - started)
+            return response.groups
+
+        key = self._result_key(
+            use_cache,
+            collection_name,
+            query,
+            query_filter,
+            limit,
+            with_payload,
+            groups=(group_by, group_size),
+            with_lookup=with_lookup,
+            with_vectors=with_vectors,
+            **kwargs,
+        )
+        return await self._cached(collection_name, key, execute)
+
+    async def query_batch(
+        self, collection_name: str, requests: Sequence[models.QueryRequest]
+    ) -> List[List[models.ScoredPoint]]:
+        """
+        query_batch_points 1회로 여러 질의 실행 → 요청 순서대로 결과 목록
+        params 미지정 요청은 query() 와 같이 프로파일/planner 검색 파라미터 적용 (결과 캐시는 사용 안 함)
+        """
+        if not requests:
+            return []
+        # 같은 (필터, limit, prefetch 유무) 는 한 번만 계획하고, 서로 다른 계획의 count 는 동시에 요청
+        plans: Dict[bytes, Any] = {}
+        keys = []
+        for request in requests:
+            self._record_filters(collection_name, request.filter, request.prefetch)
+            key = None
+            if request.params is None:
+                limit = request.limit or 10
+                key = self.cache.make_key(
+                    collection_name,
+                    None,
+                    request.filter,
+                    limit,
+                    None,
+                    prefetch=bool(request.prefetch),
+                )
+                if key not in plans:
+                    plans[key] = self._plan(
+                        collection_name, request.filter, limit, request.prefetch
+                    )
+            keys.append(key)
+        planned = dict(zip(plans, await asyncio.gather(*plans.values())))
+        prepared = [
+            (
+                request
+                if key is None
+                else request.model_copy(update={"params": planned[key][1]})
+            )
+            for request, key in zip(requests, keys)
+        ]
+        responses = await self.client.query_batch_points(
+            collection_name=collection_name, requests=prepared
+        )
+        return [list(response.points) for response in responses]
+
+    def scope_filter(
+        self, collection_name: str, query_filter: Optional[models.Filter]
+    ) -> Optional[models.Filter]:
+        """실제 적용될 필터 (TenantRepository 는 테넌트 조건 추가)"""
+        return query_filter
+
+    def _record_filters(
+        self,
+        collection_name: str,
+        query_filter: Optional[models.Filter],
+        prefetch: Any = None,
+    ) -> None:
+        self.payload_indexes.record(collection_name, query_filter)
+        for branch in prefetch if isinstance(prefetch, list) else [prefetch]:
+            if isinstance(branch, models.Prefetch):
+                self._record_filters(collection_name, branch.filter, branch.prefetch)
+
+    async def ensure_payload_indexes(
+        self, collection_name: str, indexes: Dict[str, Any], rebuild: bool = False
+    ) -> List[str]:
+        """payload 인덱스 선언 적용 (없는 것만 생성, rebuild=True 면 불일치 인덱스 재생성)"""
+        return await self.payload_indexes.ensure(
+            self.client, collection_name, indexes, rebuild=rebuild
+        )
+
+    async def payload_index_advice(
+        self, collection_name: str, min_uses: int = 1
+    ) -> List[IndexAdvice]:
+        """기록된 필터 사용량 기반 인덱스 점검 (조회 전용)"""
+        return await self.payload_indexes.advise(self.client, collection_name, min_uses)
+
+    async def apply_payload_index_advice(
+        self, collection_name: str, min_uses: int = 1
+    ) -> List[str]:
+        """점검 결과 중 누락 인덱스 생성 → 생성한 key 목록"""
+        return await self.payload_indexes.apply_advice(
+            self.client, collection_name, min_uses
+        )
+
+    async def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[models.Filter] = None,
+        limit: int = 100,
+        offset: Optional[models.ExtendedPointId] = None,
+        with_payload: Union[bool, Sequence[str]] = True,
+        with_vectors: Union[bool, Sequence[str]] = False,
+    ) -> Tuple[List[models.Record], Optional[models.ExtendedPointId]]:
+        """(records, next_page_offset) 반환"""
+        return await self.client.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            limit=limit,
+            offset=offset,
+            with_payload=with_payload,
+            with_vectors=with_vectors,
+        )
+
+    async def delete(
+        self,
+        collection_name: str,
+        points_selector: Union[
+            List[models.ExtendedPointId], models.Filter, models.PointsSelector
+        ],
+        wait: bool = True,
+    ) -> models.UpdateResult:
+        """id 목록 또는 필터 조건으로 삭제"""
+        if isinstance(points_selector, list):
+            points_selector = models.PointIdsList(points=points_selector)
+        elif isinstance(points_selector, models.Filter):
+            points_selector = models.FilterSelector(filter=points_selector)
+
+        try:
+            return await self.client.delete(
+                collection_name=collection_name,
+                points_selector=points_selector,
+                wait=wait,
+            )
+        finally:
+            self.invalidate(collection_name)
 
 
-user_service = UserService()
+vector_repository = VectorRepository()
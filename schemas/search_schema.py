@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, Optional, Union
+from pydantic import BaseModel, Field, model_validator
+from qdrant_client import models
+
+
+class SparseQuery(BaseModel):
+    indices: List[int]
+    values: List[float]
+
+
+class SearchQuery(BaseModel):
+    """배치 검색의 질의 1건 (vector / text / sparse 중 하나)"""
+
+    vector: Optional[List[float]] = None
+    text: Optional[str] = None  # dense 임베딩 후 검색
+    sparse: Optional[SparseQuery] = None
+    # Qdrant Filter JSON (예: {"must": [{"key": "city", "match": {"value": "London"}}]})
+    filter: Optional[models.Filter] = None
+    using: Optional[str] = None  # 미지정시 요청의 using
+    limit: int = Field(10, ge=1, le=1000)
+    score_threshold: Optional[float] = None
+
+    @model_validator(mode="after")
+    def check_query(self):
+        given = [v for v in (self.vector, self.text, self.sparse) if v is not None]
+        if len(given) != 1:
+            raise ValueError("vector / text / sparse 중 하나만 지정해야 합니다.")
+        return self
+
+
+class BatchSearchRequest(BaseModel):
+    collection_name: str
+    queries: List[SearchQuery] = Field(..., min_length=1, max_length=256)
+    using: Optional[str] = None  # named vector (질의별 지정이 우선)
+    with_payload: Union[bool, List[str]] = True
+
+
+class ScoredPointOut(BaseModel):
+    id: Union[int, str]
+    score: float
+    payload: Optional[Dict[str, Any]] = None
+
+
+class BatchSearchResponse(BaseModel):
+    results: List[List[ScoredPointOut]]  # queries 와 같은 순서
+    took_ms: float
+
+
+class GroupSearchRequest(BaseModel):
+    """문서 단위 검색: query.limit = 그룹(문서) 수"""
+
+    collection_name: str
+    query: SearchQuery
+    group_by: str  # 그룹 기준 payload key (예: doc_id)
+    group_size: int = Field(3, ge=1, le=100)  # 그룹별 청크 수
+    with_lookup: Optional[str] = None  # 그룹 id 로 조회할 문서 컬렉션
+    lookup_payload: Union[bool, List[str]] = True
+    with_payload: Union[bool, List[str]] = True
+
+
+class GroupOut(BaseModel):
+    id: Union[int, str]
+    hits: List[ScoredPointOut]
+    lookup: Optional[Dict[str, Any]] = None  # 문서 컬렉션 포인트 payload
+
+
+class GroupSearchResponse(BaseModel):
+    groups: List[GroupOut]
+    took_ms: float
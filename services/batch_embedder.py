@@ -0,0 +1,218 @@
+"""
+질의 임베딩 마이크로 배치
+- 동시에 들어온 단건 임베딩 요청을 max_delay 동안(또는 max_batch_size 건까지) 모아 한 번에 호출
+- 호출자마다 자기 결과를 future 로 돌려받는다 (순서/중복 본문 처리 포함)
+- batch_fn 은 동기/비동기 모두 가능 (동기 함수는 스레드에서 실행)
+- 같은 본문(정규화 기준)의 요청이 이미 진행 중이면 새로 넣지 않고 그 결과를 공유 (single-flight)
+  → 배치 대기시간(max_delay) 이후 API 호출 중에 들어온 같은 질의도 재호출 없음
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+from core.settings import vector_setting
+from repositories.single_flight import SingleFlight, flight_group, normalize_text
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchEmbedderStats:
+    requests: int = 0  # 단건 요청 수
+    batches: int = 0  # 실제 batch_fn 호출 수
+    items: int = 0  # batch_fn 에 전달된 본문 수 (배치 내 중복 제거 후)
+    errors: int = 0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+
+class MicroBatchEmbedder:
+    """
+    await embedder(text) → 임베딩 1건 (HybridSearchService 의 Embedder 로 그대로 사용)
+    batch_fn: List[str] → 같은 순서의 임베딩 목록
+    model_key: single-flight 키의 모델 식별자 (기본: batch_fn) — 같은 모델의 임베더끼리만 결과 공유
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[str]], Any],
+        max_batch_size: Optional[int] = None,
+        max_delay: Optional[float] = None,
+        max_in_flight: int = 4,
+        flights: Optional[SingleFlight] = None,
+        model_key: Optional[Hashable] = None,
+    ):
+        self.batch_fn = batch_fn
+        # id(self) 는 임베더가 GC 된 뒤 재사용될 수 있으므로 모델/batch_fn 자체를 키로 사용
+        self.model_key = model_key if model_key is not None else batch_fn
+        self.max_batch_size = max_batch_size or vector_setting.embed_batch_size
+        self.max_delay = (
+            max_delay if max_delay is not None else vector_setting.embed_batch_delay
+        )
+        self.max_in_flight = max_in_flight
+        self._is_async = inspect.iscoroutinefunction(batch_fn)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stats = BatchEmbedderStats()
+        # 임베더 간 공유 그룹 (키에 model_key 포함)
+        self.flights = flights or (
+            flight_group("embedding") if vector_setting.single_flight_enabled else None
+        )
+
+    async def __call__(self, text: str) -> Any:
+        return await self.embed(text)
+
+    async def embed(self, text: str) -> Any:
+        if self.flights is None:
+            return await self._enqueue(text)
+        return await self.flights.do(
+            (self.model_key, normalize_text(text)), self._enqueue, text
+        )
+
+    async def _enqueue(self, text: str) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self._stats.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    async def embed_many(self, texts: Sequence[str]) -> List[Any]:
+        return list(await asyncio.gather(*(self.embed(t) for t in texts)))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _call_batch_fn(self, texts: List[str]) -> List[Any]:
+        if self._is_async:
+            result = await self.batch_fn(texts)
+        else:
+            result = await asyncio.to_thread(lambda: list(self.batch_fn(texts)))
+        return list(result)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        # 대기 중 취소된 요청은 제외, 같은 본문은 한 번만 계산
+        positions: Dict[str, List[asyncio.Future]] = {}
+        for text, future in batch:
+            if not future.done():
+                positions.setdefault(text, []).append(future)
+        if not positions:
+            return
+        texts = list(positions)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        started = time.perf_counter()
+        try:
+            async with self._semaphore:
+                results = await self._call_batch_fn(texts)
+            if len(results) != len(texts):
+                raise RuntimeError(
+                    f"batch_fn 결과 수({len(results)})가 요청 수({len(texts)})와 다릅니다."
+                )
+        except Exception as e:
+            self._stats.errors += 1
+            logger.warning(f"[batch embedder] {len(texts)}건 배치 실패: {e}")
+            for futures in positions.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        self._stats.batches += 1
+        self._stats.items += len(texts)
+        logger.debug(
+            f"[batch embedder] {len(batch)}건 요청 → {len(texts)}건 배치 "
+            f"{(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        for text, result in zip(texts, results):
+            for future in positions[text]:
+                if not future.done():
+                    future.set_result(result)
+
+    async def aclose(self) -> None:
+        """대기 중인 요청을 즉시 보내고 진행 중 배치가 끝날 때까지 대기"""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **asdict(self._stats),
+            "avg_batch_size": round(self._stats.avg_batch_size, 2),
+            "pending": len(self._pending),
+        }
+
+
+def openai_batch_fn(model: str = "text-embedding-3-small") -> Callable:
+    """OpenAI 임베딩 배치 호출 (input 에 여러 본문을 한 번에 전달)"""
+    import openai
+
+    def embed(texts: List[str]) -> List[List[float]]:
+        response = openai.embeddings.create(input=texts, model=model)
+        return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+
+    return embed
+
+
+def bm25_batch_fn(model: Any = "Qdrant/bm25") -> Callable:
+    """fastembed BM25 질의 임베딩 배치 호출 (model: 모델명 또는 SparseTextEmbedding 인스턴스)"""
+    if isinstance(model, str):
+        from fastembed import SparseTextEmbedding
+
+        model = SparseTextEmbedding(model_name=model)
+
+    def embed(texts: List[str]):
+        return list(model.query_embed(texts))
+
+    return embed
+
+
+async def _demo(concurrency: int = 200) -> dict:
+    """가짜 임베더로 동시 요청 묶음 확인"""
+    import numpy as np
+
+    calls = []
+
+    async def fake_batch_fn(texts: List[str]):
+        calls.append(len(texts))
+        await asyncio.sleep(0.01)  # API 왕복 지연 흉내
+        return [np.full(4, len(t), dtype=np.float32) for t in texts]
+
+    embedder = MicroBatchEmbedder(fake_batch_fn, max_batch_size=64, max_delay=0.005)
+    texts = [f"query {i % 150}" for i in range(concurrency)]
+    started = time.perf_counter()
+    results = await embedder.embed_many(texts)
+    elapsed = time.perf_counter() - started
+    await embedder.aclose()
+
+    assert all(r[0] == len(t) for r, t in zip(results, texts))
+    return {
+        **embedder.stats(),
+        "batch_calls": calls,
+        "elapsed_ms": round(elapsed * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    # python -m services.batch_embedder
+    print(asyncio.run(_demo()))
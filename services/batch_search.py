@@ -0,0 +1,93 @@
+"""
+배치 검색
+- 여러 질의(벡터 / 텍스트 / sparse, 질의별 필터)를 받아 텍스트는 한 번의 배치로 임베딩
+- query_batch_points 1회로 실행, 결과는 요청 순서대로 반환 (HTTP 요청 N회 + Qdrant 왕복 N회 → 1회)
+"""
+
+import time
+from typing import Any, Callable, Optional
+from qdrant_client import models
+from repositories.vector_codec import to_query
+from repositories.vector_repository import VectorRepository, vector_repository
+from schemas.search_schema import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    ScoredPointOut,
+    SearchQuery,
+)
+from services.batch_embedder import MicroBatchEmbedder
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BatchSearchService:
+    def __init__(
+        self,
+        repository: VectorRepository = vector_repository,
+        dense_embedder: Optional[MicroBatchEmbedder] = None,
+        embedder_factory: Optional[Callable[[], MicroBatchEmbedder]] = None,
+    ):
+        self.repository = repository
+        self._dense_embedder = dense_embedder
+        # 텍스트 질의가 처음 들어올 때 임베더 생성 (openai import 지연)
+        self._embedder_factory = embedder_factory
+
+    @property
+    def dense_embedder(self) -> MicroBatchEmbedder:
+        if self._dense_embedder is None:
+            if self._embedder_factory is None:
+                from services.hybrid_search import openai_dense_embedder
+
+                self._embedder_factory = openai_dense_embedder
+            self._dense_embedder = self._embedder_factory()
+        return self._dense_embedder
+
+    def _to_request(
+        self, query: SearchQuery, vector: Any, request: BatchSearchRequest
+    ) -> models.QueryRequest:
+        if query.sparse is not None:
+            vector = models.SparseVector(
+                indices=query.sparse.indices, values=query.sparse.values
+            )
+        return models.QueryRequest(
+            query=to_query(vector),
+            using=query.using or request.using,
+            filter=query.filter,
+            limit=query.limit,
+            score_threshold=query.score_threshold,
+            with_payload=request.with_payload,
+        )
+
+    async def search(self, request: BatchSearchRequest) -> BatchSearchResponse:
+        started = time.perf_counter()
+        texts = [q.text for q in request.queries if q.text is not None]
+        # 텍스트 질의는 한 번에 임베딩 (동시 요청과도 마이크로 배치로 묶임)
+        embedded = iter(await self.dense_embedder.embed_many(texts) if texts else [])
+        requests = [
+            self._to_request(
+                query,
+                next(embedded) if query.text is not None else query.vector,
+                request,
+            )
+            for query in request.queries
+        ]
+        results = await self.repository.query_batch(request.collection_name, requests)
+        took_ms = round((time.perf_counter() - started) * 1000, 3)
+        logger.info(
+            f"[batch search] {request.collection_name} {len(requests)}건 "
+            f"(text {len(texts)}) {took_ms}ms"
+        )
+        return BatchSearchResponse(
+            results=[
+                [
+                    ScoredPointOut(id=p.id, score=p.score, payload=p.payload)
+                    for p in points
+                ]
+                for points in results
+            ],
+            took_ms=took_ms,
+        )
+
+
+batch_search_service = BatchSearchService()
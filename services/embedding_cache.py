@@ -0,0 +1,343 @@
+"""
+임베딩 캐시 (키: 모델명 + 본문 해시)
+- dense: 고정폭 float32/float16 행을 파일 끝에 추가하고 np.memmap 으로 읽음
+- sparse: indices(uint32)/values(float32) 를 이어붙인 파일 + 행별 (offset, length) 목록
+- 메모리에는 최근 사용 행만 LRU 로 유지 (hot tier)
+- 같은 코퍼스를 다시 적재하면 임베딩 API 호출 없이 디스크에서 읽는다
+
+저장 구조: {root}/{모델명}/{dense|sparse}/
+  keys.bin   : 행 순서대로 16바이트 본문 해시
+  meta.json  : dim, dtype (dense)
+  vectors.bin: dense 행 (rows x dim)
+  indices.bin, values.bin, rows.bin: sparse 행
+※ 단일 프로세스 writer 기준. 데이터 파일을 먼저 쓰고 keys.bin 을 나중에 기록하므로
+  중간에 중단되어도 keys.bin 에 있는 행은 항상 완전하다.
+"""
+
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+KEY_SIZE = 16
+
+
+class SparseRow(NamedTuple):
+    """fastembed SparseEmbedding 과 같은 형태(indices/values ndarray)"""
+
+    indices: np.ndarray
+    values: np.ndarray
+
+
+def content_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=KEY_SIZE).digest()
+
+
+def _read_keys(path: Path, rows: int) -> Dict[bytes, int]:
+    if not path.exists():
+        return {}
+    data = path.read_bytes()[: rows * KEY_SIZE]
+    view = memoryview(data)
+    return {
+        bytes(view[i * KEY_SIZE : (i + 1) * KEY_SIZE]): i
+        for i in range(len(data) // KEY_SIZE)
+    }
+
+
+class _LRU:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[bytes, Any]" = OrderedDict()
+
+    def get(self, key: bytes) -> Optional[Any]:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: bytes, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+
+class DenseStore:
+    """고정폭 dense 행 저장소 (memmap)"""
+
+    def __init__(self, path: Path, dim: Optional[int] = None, dtype: str = "float32"):
+        self.path = path
+        path.mkdir(parents=True, exist_ok=True)
+        meta_path = path / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if dim is not None and dim != meta["dim"]:
+                raise ValueError(f"차원 불일치: 저장소 {meta['dim']}, 요청 {dim}")
+            self.dim, self.dtype = meta["dim"], np.dtype(meta["dtype"])
+        else:
+            self.dim, self.dtype = dim, np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"지원하지 않는 dtype: {self.dtype}")
+
+        self._vectors_path = path / "vectors.bin"
+        self._keys_path = path / "keys.bin"
+        rows = 0
+        if self.dim is not None and self._vectors_path.exists():
+            rows = self._vectors_path.stat().st_size // (self.dim * self.dtype.itemsize)
+        self.keys = _read_keys(self._keys_path, rows)
+        self._mm: Optional[np.memmap] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _matrix(self) -> np.memmap:
+        if self._mm is None or self._mm.shape[0] < len(self.keys):
+            self._mm = np.memmap(
+                self._vectors_path,
+                dtype=self.dtype,
+                mode="r",
+                shape=(len(self.keys), self.dim),
+            )
+        return self._mm
+
+    def get(self, rows: Sequence[int]) -> np.ndarray:
+        """행 번호 목록 → float32 (n, dim) (해당 행만 복사)"""
+        return np.asarray(self._matrix()[np.asarray(rows, dtype=np.int64)], np.float32)
+
+    def append(self, keys: List[bytes], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors)
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            (self.path / "meta.json").write_text(
+                json.dumps({"dim": self.dim, "dtype": self.dtype.name})
+            )
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"shape {vectors.shape} 이 dim {self.dim} 과 맞지 않습니다."
+            )
+
+        # 행 데이터를 먼저 기록한 뒤 키를 기록
+        truncate_to = len(self.keys) * self.dim * self.dtype.itemsize
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(truncate_to)
+            f.write(np.ascontiguousarray(vectors, dtype=self.dtype).tobytes())
+        with open(self._keys_path, "ab") as f:
+            f.truncate(len(self.keys) * KEY_SIZE)
+            f.write(b"".join(keys))
+
+        start = len(self.keys)
+        for i, key in enumerate(keys):
+            self.keys[key] = start + i
+
+
+class SparseStore:
+    """가변길이 sparse 행 저장소 (indices/values 연속 파일 + 행 오프셋)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.mkdir(parents=True, exist_ok=True)
+        self._indices_path = path / "indices.bin"
+        self._values_path = path / "values.bin"
+        self._rows_path = path / "rows.bin"  # int64 (offset, length)
+        self._keys_path = path / "keys.bin"
+
+        rows = self._rows_path.stat().st_size // 16 if self._rows_path.exists() else 0
+        self.keys = _read_keys(self._keys_path, rows)
+        self._load_rows()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _load_rows(self) -> None:
+        if self.keys:
+            self._rows = np.fromfile(self._rows_path, dtype=np.int64)[
+                : len(self.keys) * 2
+            ].reshape(-1, 2)
+        else:
+            self._rows = np.zeros((0, 2), dtype=np.int64)
+        self._indices: Optional[np.memmap] = None
+        self._values: Optional[np.memmap] = None
+
+    def _nnz(self) -> int:
+        if not len(self._rows):
+            return 0
+        return int(self._rows[-1, 0] + self._rows[-1, 1])
+
+    def _arrays(self):
+        if self._indices is None:
+            nnz = self._nnz()
+            self._indices = np.memmap(
+                self._indices_path, dtype=np.uint32, mode="r", shape=(nnz,)
+            )
+            self._values = np.memmap(
+                self._values_path, dtype=np.float32, mode="r", shape=(nnz,)
+            )
+        return self._indices, self._values
+
+    def get(self, rows: Sequence[int]) -> List[SparseRow]:
+        if self._nnz() == 0:
+            return [
+                SparseRow(np.empty(0, np.uint32), np.empty(0, np.float32)) for _ in rows
+            ]
+        indices, values = self._arrays()
+        result = []
+        for row in rows:
+            offset, length = self._rows[row]
+            result.append(
+                SparseRow(
+                    np.array(indices[offset : offset + length]),
+                    np.array(values[offset : offset + length]),
+                )
+            )
+        return result
+
+    def append(self, keys: List[bytes], embeddings: Sequence[Any]) -> None:
+        nnz = self._nnz()
+        lengths = np.fromiter(
+            (len(e.indices) for e in embeddings), dtype=np.int64, count=len(embeddings)
+        )
+        offsets = nnz + np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        new_rows = np.stack([offsets, lengths], axis=1).astype(np.int64)
+
+        with open(self._indices_path, "ab") as f:
+            f.truncate(nnz * 4)
+            for e in embeddings:
+                f.write(np.asarray(e.indices, dtype=np.uint32).tobytes())
+        with open(self._values_path, "ab") as f:
+            f.truncate(nnz * 4)
+            for e in embeddings:
+                f.write(np.asarray(e.values, dtype=np.float32).tobytes())
+        with open(self._rows_path, "ab") as f:
+            f.truncate(len(self.keys) * 16)
+            f.write(new_rows.tobytes())
+        with open(self._keys_path, "ab") as f:
+            f.truncate(len(self.keys) * KEY_SIZE)
+            f.write(b"".join(keys))
+
+        start = len(self.keys)
+        for i, key in enumerate(keys):
+            self.keys[key] = start + i
+        self._rows = np.concatenate([self._rows, new_rows])
+        self._indices = self._values = None
+
+
+def _safe_name(model_name: str) -> str:
+    return re.sub(r"[^0-9A-Za-z._-]+", "_", model_name)
+
+
+class EmbeddingCache:
+    """모델별 임베딩 캐시 (LRU hot tier + 디스크 저장소)"""
+
+    def __init__(
+        self,
+        root: str,
+        model_name: str,
+        kind: str = "dense",
+        dim: Optional[int] = None,
+        dtype: str = "float32",
+        hot_size: int = 10_000,
+    ):
+        if kind not in ("dense", "sparse"):
+            raise ValueError(f"kind 는 dense | sparse: {kind}")
+        self.model_name = model_name
+        self.kind = kind
+        path = Path(root) / _safe_name(model_name) / kind
+        self.store = (
+            DenseStore(path, dim, dtype) if kind == "dense" else SparseStore(path)
+        )
+        self.hot = _LRU(hot_size)
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, texts: Sequence[str]) -> Dict[int, Any]:
+        """texts 위치 → 캐시된 임베딩 (없는 위치는 제외)"""
+        found: Dict[int, Any] = {}
+        disk_pos, disk_rows = [], []
+        for pos, text in enumerate(texts):
+            key = content_hash(text)
+            value = self.hot.get(key)
+            if value is not None:
+                found[pos] = value
+                continue
+            row = self.store.keys.get(key)
+            if row is not None:
+                disk_pos.append(pos)
+                disk_rows.append(row)
+
+        if disk_rows:
+            values = self.store.get(disk_rows)
+            for pos, value in zip(disk_pos, values):
+                found[pos] = value
+                self.hot.put(content_hash(texts[pos]), value)
+
+        self.hits += len(found)
+        self.misses += len(texts) - len(found)
+        return found
+
+    def put_many(self, texts: Sequence[str], embeddings: Sequence[Any]) -> None:
+        keys, rows = [], []
+        seen = set()
+        for text, embedding in zip(texts, embeddings):
+            key = content_hash(text)
+            self.hot.put(key, embedding)
+            if key in self.store.keys or key in seen:
+                continue
+            seen.add(key)
+            keys.append(key)
+            rows.append(embedding)
+        if not keys:
+            return
+        if self.kind == "dense":
+            self.store.append(keys, np.asarray(rows))
+        else:
+            self.store.append(keys, rows)
+
+
+class CachedEmbedder:
+    """
+    캐시 우선 임베딩: 미스난 본문만 embed_fn 으로 한 번에 계산
+    embed_fn: List[str] → dense (n, dim) 배열 또는 SparseEmbedding 목록
+    """
+
+    def __init__(self, cache: EmbeddingCache, embed_fn: Callable[[List[str]], Any]):
+        self.cache = cache
+        self.embed_fn = embed_fn
+
+    def embed(self, texts: Sequence[str]) -> Any:
+        if not texts:
+            # 차원을 아직 모르면(빈 저장소) (0, 0)
+            if self.cache.kind == "dense":
+                return np.empty((0, self.cache.store.dim or 0), dtype=np.float32)
+            return []
+        found = self.cache.get_many(texts)
+
+        # 배치 내 중복 본문은 한 번만 계산
+        missing: Dict[str, List[int]] = {}
+        for pos, text in enumerate(texts):
+            if pos not in found:
+                missing.setdefault(text, []).append(pos)
+
+        if missing:
+            new_texts = list(missing)
+            computed = list(self.embed_fn(new_texts))
+            self.cache.put_many(new_texts, computed)
+            for text, embedding in zip(new_texts, computed):
+                for pos in missing[text]:
+                    found[pos] = embedding
+            logger.info(
+                f"[embedding cache] {self.cache.model_name}: "
+                f"{len(texts) - len(new_texts)}/{len(texts)} 캐시 사용, {len(new_texts)}건 계산"
+            )
+
+        ordered = [found[pos] for pos in range(len(texts))]
+        if self.cache.kind == "dense":
+            return np.asarray(ordered, dtype=np.float32).reshape(len(texts), -1)
+        return ordered
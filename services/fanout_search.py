@@ -0,0 +1,307 @@
+"""
+다중 컬렉션 scatter-gather 검색
+- 문서 유형 / 테넌트별 컬렉션에 같은 질의를 동시에 보내고(query_points) 하나의 deadline 안에서 수집
+- deadline 을 넘긴 컬렉션 검색은 취소, 실패한 컬렉션은 건너뛰고 나머지 결과로 응답 (partial)
+- 결과는 services.fusion 의 rrf(기본) / weighted / dbsf 또는 점수(score)로 병합
+  score: 모든 컬렉션이 같은 유사도(cosine / dot)면 원점수 비교, 거리(euclid / manhattan)이거나
+  척도가 섞이면 컬렉션별로 "클수록 가까움" 으로 바꿔 min-max 정규화 후 비교
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from qdrant_client import models
+from core.settings import vector_setting
+from repositories.vector_repository import VectorRepository, vector_repository
+from services import fusion
+import logging
+
+logger = logging.getLogger(__name__)
+
+OK, TIMEOUT, ERROR = "ok", "timeout", "error"
+
+# 점수가 클수록 가까운 거리 척도 (나머지는 작을수록 가까움)
+_SIMILARITIES = (models.Distance.COSINE, models.Distance.DOT)
+
+
+@dataclass
+class CollectionTarget:
+    collection_name: str
+    using: Optional[str] = None
+    query_filter: Optional[models.Filter] = None
+    limit: Optional[int] = None  # 미지정시 전체 limit
+    weight: float = 1.0
+
+
+@dataclass
+class ShardStatus:
+    collection_name: str
+    status: str  # ok | timeout | error
+    took_ms: float
+    hits: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class FanoutHit:
+    collection_name: str
+    point: models.ScoredPoint
+    score: float  # 병합 점수 (score 병합이면 weight * 원점수 또는 정규화 점수)
+
+
+@dataclass
+class FanoutResult:
+    hits: List[FanoutHit]
+    statuses: List[ShardStatus]
+    took_ms: float
+    partial: bool = field(init=False)
+
+    def __post_init__(self):
+        self.partial = any(s.status != OK for s in self.statuses)
+
+
+class FanoutSearchService:
+    """컬렉션별 query_points 동시 실행 + deadline + 부분 결과"""
+
+    def __init__(
+        self,
+        repository: VectorRepository = vector_repository,
+        deadline: Optional[float] = None,
+        merge: str = "rrf",
+    ):
+        self.repository = repository
+        self.deadline = deadline or vector_setting.fanout_deadline
+        self.merge = merge
+        # (컬렉션, using) → 거리 척도 (score 병합용)
+        self._distances: Dict[Tuple[str, Optional[str]], models.Distance] = {}
+
+    async def _distance(self, target: CollectionTarget) -> models.Distance:
+        key = (target.collection_name, target.using)
+        if key not in self._distances:
+            info = await self.repository.client.get_collection(
+                collection_name=target.collection_name
+            )
+            params = info.config.params.vectors
+            if isinstance(params, dict):
+                params = params[target.using or ""]
+            self._distances[key] = params.distance
+        return self._distances[key]
+
+    async def _query_one(
+        self,
+        target: CollectionTarget,
+        query: Any,
+        limit: int,
+        with_payload: Union[bool, Sequence[str]],
+    ) -> List[models.ScoredPoint]:
+        return await self.repository.query(
+            collection_name=target.collection_name,
+            query=query,
+            using=target.using,
+            query_filter=target.query_filter,
+            limit=target.limit or limit,
+            with_payload=with_payload,
+        )
+
+    @staticmethod
+    def _comparable_scores(
+        results: Dict[int, List[models.ScoredPoint]],
+        targets: Sequence[CollectionTarget],
+        distances: Dict[int, models.Distance],
+    ) -> np.ndarray:
+        """컬렉션 간 비교 가능한 weight 적용 점수 (results 순서대로 이어붙임)"""
+        order = sorted(results)
+        raw = [np.fromiter((p.score for p in results[i]), np.float64) for i in order]
+        weights = [targets[i].weight for i in order]
+        if len({distances[i] for i in order}) == 1 and distances[order[0]] in (
+            _SIMILARITIES
+        ):
+            return np.concatenate([w * r for w, r in zip(weights, raw)])
+        normalized = []
+        for i, w, r in zip(order, weights, raw):
+            if distances[i] not in _SIMILARITIES:
+                r = -r
+            span = np.ptp(r) if r.size else 0.0
+            normalized.append(
+                w * ((r - r.min()) / span if span > 0 else np.ones_like(r))
+            )
+        return np.concatenate(normalized)
+
+    def _merge(
+        self,
+        results: Dict[int, List[models.ScoredPoint]],
+        targets: Sequence[CollectionTarget],
+        limit: int,
+        merge: str,
+        distances: Optional[Dict[int, models.Distance]] = None,
+    ) -> List[FanoutHit]:
+        order = sorted(results)
+        flat = [
+            (targets[i].collection_name, p, targets[i].weight)
+            for i in order
+            for p in results[i]
+        ]
+        if not flat:
+            return []
+        if merge == "score":
+            scores = self._comparable_scores(results, targets, distances or {})
+            top = np.argsort(-scores, kind="stable")[:limit]
+            return [FanoutHit(flat[i][0], flat[i][1], float(scores[i])) for i in top]
+
+        # 컬렉션 간 id 는 서로 다른 포인트 → 위치 번호를 id 로 써서 합쳐지지 않게 함
+        lists, offset = [], 0
+        for i in order:
+            ranked = fusion.from_points(results[i])
+            lists.append(
+                fusion.RankedList(
+                    np.arange(offset, offset + len(ranked.ids)), ranked.scores
+                )
+            )
+            offset += len(ranked.ids)
+        fused = fusion.fuse(
+            lists, merge, weights=[targets[i].weight for i in order], limit=limit
+        )
+        return [
+            FanoutHit(flat[pos][0], flat[pos][1], float(score))
+            for pos, score in zip(fused.ids, fused.scores)
+        ]
+
+    async def search(
+        self,
+        query: Any,
+        targets: Sequence[Union[str, CollectionTarget]],
+        limit: int = 10,
+        deadline: Optional[float] = None,
+        merge: Optional[str] = None,
+        with_payload: Union[bool, Sequence[str]] = True,
+    ) -> FanoutResult:
+        """
+        targets: 컬렉션 이름 또는 CollectionTarget (컬렉션별 using / 필터 / weight)
+        deadline: 전체 제한 시간(초) — 초과한 컬렉션은 취소하고 status=timeout
+        """
+        targets = [
+            t if isinstance(t, CollectionTarget) else CollectionTarget(t)
+            for t in targets
+        ]
+        started = time.perf_counter()
+        if not targets:
+            return FanoutResult(hits=[], statuses=[], took_ms=0.0)
+        deadline = deadline or self.deadline
+        merge = merge or self.merge
+        finished: Dict[int, float] = {}
+        # score 병합의 거리 척도 조회도 deadline 안에서 질의와 함께 실행
+        distances: Dict[int, models.Distance] = {}
+
+        async def run(i: int, target: CollectionTarget):
+            try:
+                search = self._query_one(target, query, limit, with_payload)
+                if merge != "score":
+                    return await search
+                points, distances[i] = await asyncio.gather(
+                    search, self._distance(target)
+                )
+                return points
+            finally:
+                finished[i] = time.perf_counter()
+
+        tasks = [
+            asyncio.create_task(run(i, target)) for i, target in enumerate(targets)
+        ]
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=deadline)
+        except asyncio.CancelledError:
+            # 호출자 취소 시 진행 중인 컬렉션 검색도 정리
+            for task in tasks:
+                task.cancel()
+            raise
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results: Dict[int, List[models.ScoredPoint]] = {}
+        statuses = []
+        for i, (target, task) in enumerate(zip(targets, tasks)):
+            took_ms = round((finished.get(i, time.perf_counter()) - started) * 1000, 3)
+            if task in pending:
+                statuses.append(ShardStatus(target.collection_name, TIMEOUT, took_ms))
+            elif task.exception() is not None:
+                statuses.append(
+                    ShardStatus(
+                        target.collection_name,
+                        ERROR,
+                        took_ms,
+                        error=repr(task.exception()),
+                    )
+                )
+            else:
+                results[i] = task.result()
+                statuses.append(
+                    ShardStatus(target.collection_name, OK, took_ms, len(results[i]))
+                )
+
+        result = FanoutResult(
+            hits=self._merge(results, targets, limit, merge, distances),
+            statuses=statuses,
+            took_ms=round((time.perf_counter() - started) * 1000, 3),
+        )
+        if result.partial:
+            logger.warning(
+                f"[fanout] 부분 결과 ({result.took_ms}ms): "
+                + ", ".join(
+                    f"{s.collection_name}={s.status}"
+                    for s in statuses
+                    if s.status != OK
+                )
+            )
+        return result
+
+
+fanout_search_service = FanoutSearchService()
+
+
+async def _demo(shards: int = 4, slow_delay: float = 0.5, deadline: float = 0.2):
+    """로컬 모드: 컬렉션 1개는 느리게, 1개는 오류 → 나머지로 부분 결과"""
+    from core.vector_db import create_async_client
+    from repositories.search_cache import SearchCache
+
+    client = create_async_client(":memory:")
+    repository = VectorRepository(client, cache=SearchCache(maxsize=0))
+    rng = np.random.default_rng(0)
+    names = [f"fanout_demo_{i}" for i in range(shards)]
+    for name in names:
+        await client.create_collection(
+            name,
+            vectors_config=models.VectorParams(size=8, distance=models.Distance.COSINE),
+        )
+        await repository.upsert(
+            name,
+            [
+                models.PointStruct(id=j, vector=rng.random(8).tolist())
+                for j in range(100)
+            ],
+        )
+
+    class SlowService(FanoutSearchService):
+        async def _query_one(self, target, *args):
+            if target.collection_name == names[0]:
+                await asyncio.sleep(slow_delay)
+            return await super()._query_one(target, *args)
+
+    service = SlowService(repository, deadline=deadline)
+    result = await service.search(
+        rng.random(8), names + ["fanout_demo_missing"], limit=5, merge="rrf"
+    )
+    for s in result.statuses:
+        print(s)
+    for hit in result.hits:
+        print(hit.collection_name, hit.point.id, round(hit.score, 4))
+    print(f"partial={result.partial} took={result.took_ms}ms")
+    await client.close()
+
+
+if __name__ == "__main__":
+    # python -m services.fanout_search
+    asyncio.run(_demo())
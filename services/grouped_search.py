@@ -0,0 +1,79 @@
+"""
+문서 단위(grouped) 검색
+- 청크마다 문서 id payload 가 있을 때 query_points_groups(group_by) 로 서로 다른 문서 k 개를 한 번에 조회
+  (top-k 청크를 넉넉히 가져와 Python 에서 문서 중복을 제거하던 방식 대체)
+- with_lookup 지정시 문서 단위 컬렉션(포인트 id = 문서 id)의 payload 를 그룹과 함께 반환
+"""
+
+import time
+from qdrant_client import models
+from schemas.search_schema import (
+    GroupOut,
+    GroupSearchRequest,
+    GroupSearchResponse,
+    ScoredPointOut,
+)
+from services.batch_search import BatchSearchService, batch_search_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class GroupedSearchService(BatchSearchService):
+    """질의 변환 / 텍스트 임베딩은 BatchSearchService 와 동일"""
+
+    async def search(self, request: GroupSearchRequest) -> GroupSearchResponse:
+        started = time.perf_counter()
+        query = request.query
+        vector = query.vector
+        if query.text is not None:
+            vector = await self.dense_embedder(query.text)
+        elif query.sparse is not None:
+            vector = models.SparseVector(
+                indices=query.sparse.indices, values=query.sparse.values
+            )
+        groups = await self.repository.query_groups(
+            request.collection_name,
+            request.group_by,
+            vector,
+            query_filter=query.filter,
+            limit=query.limit,
+            group_size=request.group_size,
+            with_lookup=(
+                models.WithLookup(
+                    collection=request.with_lookup,
+                    with_payload=request.lookup_payload,
+                    with_vectors=False,
+                )
+                if request.with_lookup
+                else None
+            ),
+            with_payload=request.with_payload,
+            using=query.using,
+            score_threshold=query.score_threshold,
+        )
+        took_ms = round((time.perf_counter() - started) * 1000, 3)
+        logger.info(
+            f"[grouped search] {request.collection_name} group_by={request.group_by} "
+            f"{len(groups)}개 그룹 {took_ms}ms"
+        )
+        return GroupSearchResponse(
+            groups=[
+                GroupOut(
+                    id=group.id,
+                    hits=[
+                        ScoredPointOut(id=p.id, score=p.score, payload=p.payload)
+                        for p in group.hits
+                    ],
+                    lookup=group.lookup.payload if group.lookup else None,
+                )
+                for group in groups
+            ],
+            took_ms=took_ms,
+        )
+
+
+# 배치 검색과 같은 공유 임베더 사용 → 두 엔드포인트의 동시 질의가 같은 마이크로 배치로 묶임
+grouped_search_service = GroupedSearchService(
+    embedder_factory=lambda: batch_search_service.dense_embedder
+)
@@ -1,14 +1,18 @@
 # pip install qdrant-client fastembed
+import asyncio
+import numpy as np
 import openai
-from qdrant_client import QdrantClient
 from qdrant_client.http.models import (
     VectorParams,
     SparseVectorParams,
     Modifier,
-    PointStruct,
-    SparseVector,
 )
 from fastembed import SparseTextEmbedding
+from repositories.vector_repository import vector_repository
+from repositories.vector_codec import ArrayBatch
+from repositories.schema_manager import CollectionSchema, schema_manager
+from core.settings import vector_setting
+from services.embedding_cache import CachedEmbedder, EmbeddingCache
 
 # OpenAI API 키
 openai.api_key = "<YOUR_OPENAI_KEY>"
@@ -19,40 +23,68 @@ documents = [
     "BM25는 키워드 기반의 검색 알고리즘입니다.",
 ]
 
-# 1) Dense 벡터(OpenAI 임베딩)
 embedding_model = "text-embedding-3-small"
-resp = openai.embeddings.create(input=documents, model=embedding_model)
-dense_embeddings = [d.embedding for d in resp.data]
-
-# 2) Sparse 벡터(BM25)
-bm25_model = SparseTextEmbedding(model_name="Qdrant/bm25")
-bm25_embeddings = list(bm25_model.embed(documents))
-
-client = QdrantClient(host="localhost", port=6333)
-
-# collection 생성
-client.recreate_collection(
-    collection_name="hybrid_example",
-    # Dense vector
-    vectors_config={
-        "dense": VectorParams(size=len(dense_embeddings[0]), distance="Cosine")
-    },
-    # Sparse vector
-    sparse_vectors_config={"bm25": SparseVectorParams(modifier=Modifier.IDF)},
-)
 
-points = [
-    PointStruct(
-        id=i,
-        vector={"dense": dense_embeddings[i]},
-        sparse_vector={
-            "bm25": SparseVector(
-                indices=bm25_embeddings[i].indices.tolist(),
-                values=bm25_embeddings[i].values.tolist(),
-            )
-        },
-        payload={"content": documents[i]},
+
+async def main():
+    from core.vector_db import init_vector_client, close_vector_client
+
+    # 1) Dense 벡터(OpenAI 임베딩) - 이미 임베딩한 본문은 캐시에서 읽음
+    def openai_embed(texts):
+        resp = openai.embeddings.create(input=texts, model=embedding_model)
+        return [d.embedding for d in resp.data]
+
+    dense_embedder = CachedEmbedder(
+        EmbeddingCache(
+            vector_setting.embedding_cache_dir,
+            embedding_model,
+            hot_size=vector_setting.embedding_cache_hot_size,
+        ),
+        openai_embed,
     )
-    for i in range(len(documents))
-]
-client.upsert(collection_name="hybrid_example", points=points)
+    dense_embeddings = dense_embedder.embed(documents)
+
+    # 2) Sparse 벡터(BM25)
+    bm25_model = SparseTextEmbedding(model_name="Qdrant/bm25")
+    sparse_embedder = CachedEmbedder(
+        EmbeddingCache(
+            vector_setting.embedding_cache_dir,
+            "Qdrant/bm25",
+            kind="sparse",
+            hot_size=vector_setting.embedding_cache_hot_size,
+        ),
+        lambda texts: list(bm25_model.embed(texts)),
+    )
+    bm25_embeddings = sparse_embedder.embed(documents)
+
+    await init_vector_client()
+    try:
+        # collection 생성/스키마 적용 (기존 데이터 유지)
+        await schema_manager.apply(
+            CollectionSchema(
+                name="hybrid_example",
+                # Dense vector
+                vectors={
+                    "dense": VectorParams(
+                        size=dense_embeddings.shape[1], distance="Cosine"
+                    )
+                },
+                # Sparse vector
+                sparse_vectors={"bm25": SparseVectorParams(modifier=Modifier.IDF)},
+            )
+        )
+
+        # dense ndarray + SparseEmbedding 을 그대로 배치로 전달
+        points = ArrayBatch.of(
+            ids=np.arange(len(documents)),
+            vectors={"dense": dense_embeddings},
+            sparse={"bm25": bm25_embeddings},
+            payloads=[{"content": doc} for doc in documents],
+        )
+        await vector_repository.upsert(collection_name="hybrid_example", points=points)
+    finally:
+        await close_vector_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,92 +1,84 @@
-from qdrant_client.models import PointStruct, NamedVector, VectorParams, Distance
-from vdb_client_conn_test import qdrant_client as client
-
-# Qdrant에 연결
-# client = QdrantClient(host="localhost", port=6333)
-
-
-def create_hybrid_db() -> None:
-    # 1. Hybrid 인덱스는 보통 named vectors 사용 (예: dense/sparse)
-    collection_name = "test_collection"
-    # vectors_config = {
-    #     "dense": {"size": 384, "distance": "Cosine"},
-    #     "sparse": {"size": 1000, "distance": "Cosine"},  # 실제 모델 output에 맞게 조정
-    # }
-
-    vectors_config = {
-        "dense": VectorParams(size=768, distance=Distance.COSINE),
-        "sparse": VectorParams(size=1000, distance=Distance.DOT),  # 실제로는 항상 Dot
-    }
-
-    # 2. 컬랙션 생성(이미 존재한다면 생략)
-    client.recreate_collection(
-        collection_name=collection_name,
-        vectors_config=vectors_config,
-    )
-
-    # 3. 포인트 준비 (각 벡터는 이름 지정)
-    dense_vector = [0.1] * 384  # 예시 dense 벡터
-    sparse_vector = [
-        0.0
-    ] * 1000  # 예시 sparse(대부분 0), 실제 sparse 모델 output 사용해야 함
-
-    point = PointStruct(
-        id=1,
-        vector={
-            "dense": dense_vector,
-            "sparse": sparse_vector,
+import asyncio
+import numpy as np
+from qdrant_client import models
+from qdrant_client.models import VectorParams, Distance
+from repositories.vector_repository import vector_repository
+from repositories.vector_codec import ArrayBatch
+from repositories.schema_manager import CollectionSchema, schema_manager
+from repositories.hybrid_collection import HybridCollection
+
+
+async def create_hybrid_db() -> None:
+    # 1. Hybrid 컬렉션: named dense 벡터 + sparse 벡터(IDF)
+    #    sparse 신호는 dense VectorParams(size=1000) 가 아니라 sparse_vectors_config 로 저장
+    #    dense 차원은 VectorSettings.vector_dim
+    #    ※ "test_collection" 은 add_vector.py / query.py 의 4차원 이름없는 벡터 컬렉션 → 다른 이름 사용
+    collection = HybridCollection(name="hybrid_collection")
+
+    # 2. 컬랙션 생성/스키마 적용 (기존 데이터는 유지)
+    #    예전 dense 인코딩 "sparse" 벡터가 있으면 sparse 로 변환하여 새 버전으로 옮긴 뒤 alias 교체
+    await collection.migrate_dense_sparse(legacy_sparse_name="sparse")
+
+    # 3. 포인트 준비 (예시 dense 벡터 + 실제 sparse 모델 output 형태의 indices/values)
+    points = ArrayBatch.of(
+        ids=np.array([1]),
+        vectors={"dense": np.full((1, collection.dense_dim), 0.1, dtype=np.float32)},
+        sparse={
+            "bm25": [
+                models.SparseVector(indices=[17, 342, 901], values=[0.8, 0.5, 0.2])
+            ]
         },
-        payload={"doc": "이것은 하이브리드 검색 예제입니다!"},
+        payloads=[{"doc": "이것은 하이브리드 검색 예제입니다!"}],
     )
 
-    # 4. 벡터 insert
-    client.upsert(
-        collection_name=collection_name,
-        points=[point],
-        wait=True,
-    )
+    # 4. 벡터 insert (업로드 전 dense 차원 검사)
+    await collection.upsert(points, wait=True)
 
 
-def create_general_db() -> None:
-    import numpy as np
-
+async def create_general_db() -> None:
     # 2-1 일반 저장
     # dense 벡터 컬렉션 생성 (예: 임베딩 차원 1536, Cosine 유사도)
-    if not client.collection_exists(collection_name="my_dense_collection"):
-        client.recreate_collection(
-            collection_name="my_dense_collection",
-            vectors_config=VectorParams(
+    await schema_manager.apply(
+        CollectionSchema(
+            name="my_dense_collection",
+            vectors=VectorParams(
                 size=1536,  # 임베딩 벡터의 차원에 맞게 설정
                 distance=Distance.COSINE,  # 또는 Distance.DOT, Distance.EUCLID 참고
             ),
         )
+    )
 
     # 샘플 dense 벡터 생성 (예: 1536차원, 실제 임베딩 사용 권장)
-    def generate_fake_embedding():
-        return np.random.rand(1536).tolist()
-
-    # 포인트 데이터 생성
-    points = [
-        PointStruct(
-            id=1,
-            vector=generate_fake_embedding(),
-            payload={"text": "Qdrant는 고속 벡터 검색 엔진입니다."},
-        ),
-        PointStruct(
-            id=2,
-            vector=generate_fake_embedding(),
-            payload={"text": "파이썬을 사용하여 Qdrant에 데이터를 추가할 수 있습니다."},
-        ),
-        PointStruct(
-            id=3,
-            vector=generate_fake_embedding(),
-            payload={"text": "이 문장은 텍스트 임베딩을 사용한 예시 데이터입니다."},
-        ),
+    def generate_fake_embeddings(n: int) -> np.ndarray:
+        return np.random.rand(n, 1536).astype(np.float32)
+
+    # 포인트 데이터 생성 (ndarray 배치 그대로, 업로드 직전 배치 단위 변환)
+    texts = [
+        "Qdrant는 고속 벡터 검색 엔진입니다.",
+        "파이썬을 사용하여 Qdrant에 데이터를 추가할 수 있습니다.",
+        "이 문장은 텍스트 임베딩을 사용한 예시 데이터입니다.",
     ]
+    points = ArrayBatch.of(
+        ids=np.arange(1, len(texts) + 1),
+        vectors=generate_fake_embeddings(len(texts)),
+        payloads=[{"text": text} for text in texts],
+    )
+
+    # 벡터 upsert (insert or update) - 배치 분할/병렬 업로드
+    await vector_repository.bulk_upsert(
+        collection_name="my_dense_collection", points=points
+    )
+
+
+async def main():
+    from core.vector_db import init_vector_client, close_vector_client
 
-    # 벡터 upsert (insert or update)
-    client.upsert(collection_name="my_dense_collection", points=points)
+    await init_vector_client()
+    try:
+        await create_general_db()
+    finally:
+        await close_vector_client()
 
 
 if __name__ == "__main__":
-    create_general_db()
+    asyncio.run(main())
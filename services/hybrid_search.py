@@ -0,0 +1,182 @@
+"""
+Dense + BM25 하이브리드 검색
+- dense / sparse 질의를 prefetch 분기로 묶어 query_points 한 번에 전송
+- 서버측 FusionQuery(RRF / DBSF)로 결과를 합친다 (클라이언트 검색 2회 → 왕복 1회)
+- mmr_lambda 지정시 상위 mmr_candidates 건을 dense 벡터와 함께 받아 MMR 로 다양화한 뒤 limit 건 반환
+  (관련도: fusion 점수 min-max, 후보 간 유사도: dense 코사인)
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+from qdrant_client import models
+from core.settings import vector_setting
+from repositories.vector_repository import VectorRepository, vector_repository
+from repositories.vector_codec import to_query
+from services.batch_embedder import MicroBatchEmbedder, bm25_batch_fn, openai_batch_fn
+from services.mmr import mmr_points
+import logging
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[str], Awaitable[Any]]
+
+
+class HybridSearchService:
+    """prefetch(dense, sparse) + FusionQuery 하이브리드 검색"""
+
+    def __init__(
+        self,
+        collection_name: str,
+        repository: VectorRepository = vector_repository,
+        dense_using: str = "dense",
+        sparse_using: str = "bm25",
+        fusion: Union[str, models.Fusion, None] = None,
+        dense_limit: Optional[int] = None,
+        sparse_limit: Optional[int] = None,
+        score_threshold: Optional[float] = None,
+        dense_embedder: Optional[Embedder] = None,
+        sparse_embedder: Optional[Embedder] = None,
+        mmr_lambda: Optional[float] = None,
+        mmr_candidates: Optional[int] = None,
+    ):
+        self.collection_name = collection_name
+        self.repository = repository
+        self.dense_using = dense_using
+        self.sparse_using = sparse_using
+        self.fusion = models.Fusion(fusion or vector_setting.hybrid_fusion)
+        self.dense_limit = dense_limit or vector_setting.hybrid_prefetch_limit
+        self.sparse_limit = sparse_limit or vector_setting.hybrid_prefetch_limit
+        self.score_threshold = score_threshold
+        self.dense_embedder = dense_embedder
+        self.sparse_embedder = sparse_embedder
+        self.mmr_lambda = (
+            mmr_lambda if mmr_lambda is not None else vector_setting.mmr_lambda
+        )
+        if self.mmr_lambda is not None and not 0.0 <= self.mmr_lambda <= 1.0:
+            raise ValueError(f"mmr_lambda 는 0~1 사이여야 합니다: {self.mmr_lambda}")
+        self.mmr_candidates = mmr_candidates or vector_setting.mmr_candidates
+
+    def build_prefetch(
+        self,
+        dense_query: Any = None,
+        sparse_query: Any = None,
+        query_filter: Optional[models.Filter] = None,
+        dense_limit: Optional[int] = None,
+        sparse_limit: Optional[int] = None,
+        dense_params: Optional[models.SearchParams] = None,
+    ) -> List[models.Prefetch]:
+        """분기별 prefetch 구성 (필터는 각 분기 안에서 적용)"""
+        prefetch = []
+        if dense_query is not None:
+            prefetch.append(
+                models.Prefetch(
+                    query=to_query(dense_query),
+                    using=self.dense_using,
+                    filter=query_filter,
+                    limit=dense_limit or self.dense_limit,
+                    # dense 분기에만 HNSW/양자화 검색 파라미터 적용 (미지정시 repository 가
+                    # 캐시 미스일 때 프로파일 / planner(필터 선택도) 로 결정)
+                    params=dense_params,
+                )
+            )
+        if sparse_query is not None:
+            prefetch.append(
+                models.Prefetch(
+                    query=to_query(sparse_query),
+                    using=self.sparse_using,
+                    filter=query_filter,
+                    limit=sparse_limit or self.sparse_limit,
+                )
+            )
+        if not prefetch:
+            raise ValueError("dense_query / sparse_query 중 하나는 필요합니다.")
+        return prefetch
+
+    async def search(
+        self,
+        dense_query: Any = None,
+        sparse_query: Any = None,
+        limit: int = 10,
+        query_filter: Optional[models.Filter] = None,
+        fusion: Union[str, models.Fusion, None] = None,
+        dense_limit: Optional[int] = None,
+        sparse_limit: Optional[int] = None,
+        score_threshold: Optional[float] = None,
+        with_payload: Union[bool, List[str]] = True,
+        mmr_lambda: Optional[float] = None,
+        mmr_candidates: Optional[int] = None,
+    ) -> List[models.ScoredPoint]:
+        """
+        벡터(ndarray/list/SparseEmbedding)로 하이브리드 검색
+        mmr_lambda: MMR 다양화 λ (미지정시 서비스 기본값, None 이면 fusion 순위 그대로)
+        mmr_candidates: MMR 후보 수 N (fusion 상위 N 건 → limit 건 선택)
+        """
+        mmr_lambda = mmr_lambda if mmr_lambda is not None else self.mmr_lambda
+        candidates = limit
+        if mmr_lambda is not None:
+            # fusion 결과가 후보 N 건이 되도록 분기별 prefetch 도 N 건 이상
+            candidates = max(mmr_candidates or self.mmr_candidates, limit)
+            dense_limit = max(dense_limit or self.dense_limit, candidates)
+            sparse_limit = max(sparse_limit or self.sparse_limit, candidates)
+        prefetch = self.build_prefetch(
+            dense_query,
+            sparse_query,
+            query_filter,
+            dense_limit,
+            sparse_limit,
+        )
+        points = await self.repository.query(
+            collection_name=self.collection_name,
+            prefetch=prefetch,
+            query=models.FusionQuery(fusion=models.Fusion(fusion or self.fusion)),
+            limit=candidates,
+            with_payload=with_payload,
+            # MMR 유사도 계산용 dense 벡터만 함께 조회
+            with_vectors=[self.dense_using] if mmr_lambda is not None else False,
+            score_threshold=(
+                score_threshold if score_threshold is not None else self.score_threshold
+            ),
+        )
+        if mmr_lambda is None:
+            return points
+        # 관련도 = fusion 점수(min-max) → sparse 신호도 반영, dense 벡터는 후보 간 유사도에만 사용
+        return mmr_points(points, limit, mmr_lambda, using=self.dense_using)
+
+    async def search_text(self, text: str, **kwargs) -> List[models.ScoredPoint]:
+        """텍스트 질의: dense/sparse 임베딩을 동시에 구한 뒤 하이브리드 검색"""
+        if self.dense_embedder is None and self.sparse_embedder is None:
+            raise ValueError("dense_embedder / sparse_embedder 가 설정되지 않았습니다.")
+
+        async def _none():
+            return None
+
+        dense_query, sparse_query = await asyncio.gather(
+            self.dense_embedder(text) if self.dense_embedder else _none(),
+            self.sparse_embedder(text) if self.sparse_embedder else _none(),
+        )
+        return await self.search(dense_query, sparse_query, **kwargs)
+
+
+# 모델별 공유 임베더: 동시 요청이 같은 배치 큐를 쓰도록 프로세스에서 한 번만 생성
+_embedders: Dict[Any, MicroBatchEmbedder] = {}
+
+
+def _shared_embedder(key: Any, factory: Callable[[], Any]) -> MicroBatchEmbedder:
+    embedder = _embedders.get(key)
+    if embedder is None:
+        embedder = _embedders[key] = MicroBatchEmbedder(factory(), model_key=key)
+    return embedder
+
+
+def openai_dense_embedder(model: str = "text-embedding-3-small") -> Embedder:
+    """OpenAI 임베딩 (동시 질의는 마이크로 배치로 묶어 한 번에 호출, 모델별 공유 인스턴스)"""
+    return _shared_embedder(("openai", model), lambda: openai_batch_fn(model))
+
+
+def bm25_sparse_embedder(model: Any = "Qdrant/bm25") -> Embedder:
+    """
+    fastembed BM25 질의 임베딩 (model: 모델명 또는 SparseTextEmbedding 인스턴스)
+    모델명 / 인스턴스별 공유 인스턴스 → fastembed 모델도 한 번만 로드
+    """
+    key = ("bm25", model if isinstance(model, str) else id(model))
+    return _shared_embedder(key, lambda: bm25_batch_fn(model))
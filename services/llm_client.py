@@ -0,0 +1,58 @@
+"""
+LLM 호출 (OpenAI chat completions)
+- 모델 / 메시지(정규화) / 파라미터가 같은 동시 호출은 single-flight 로 1회만 실행 ("llm" 그룹)
+- temperature > 0 이어도 동시 호출은 같은 응답을 공유 → 응답마다 샘플이 달라야 하면 single_flight=False
+"""
+
+from typing import Any, Dict, List, Optional
+from core.settings import vector_setting
+from repositories.single_flight import flight_group, normalize_text, text_key
+import logging
+
+logger = logging.getLogger(__name__)
+
+Message = Dict[str, str]
+
+_client = None
+
+
+def _openai_client():
+    global _client
+    if _client is None:
+        import openai
+
+        _client = openai.AsyncOpenAI()
+    return _client
+
+
+def message_key(model: str, messages: List[Message], **options) -> bytes:
+    return text_key(
+        model,
+        [(m["role"], normalize_text(m["content"])) for m in messages],
+        sorted(options.items()),
+    )
+
+
+async def _complete(model: str, messages: List[Message], **options) -> str:
+    response = await _openai_client().chat.completions.create(
+        model=model, messages=messages, **options
+    )
+    return response.choices[0].message.content
+
+
+async def chat_completion(
+    messages: List[Message],
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.0,
+    single_flight: Optional[bool] = None,
+    **options: Any,
+) -> str:
+    """응답 본문 반환 (options: max_tokens, response_format 등 chat.completions 인자)"""
+    options["temperature"] = temperature
+    if single_flight is None:
+        single_flight = vector_setting.single_flight_enabled
+    if not single_flight:
+        return await _complete(model, messages, **options)
+    return await flight_group("llm").do(
+        message_key(model, messages, **options), _complete, model, messages, **options
+    )
@@ -0,0 +1,333 @@
+# services/profile_tuner.py
+"""
+HNSW / 양자화 자동 튜닝 → 컬렉션 프로파일 생성
+- 실제 컬렉션에서 표본(포인트 + payload)을 읽어 임시 컬렉션에 m / 양자화 조합별로 적재
+- 조합마다 hnsw_ef / oversampling 을 바꿔가며 recall@k 와 p95 지연시간 측정 (정답: NumPy 전수 계산,
+  필터 질의면 exact=True 검색, 원본 컬렉션의 payload 인덱스를 임시 컬렉션에도 생성)
+- 목표 recall 과 지연시간 예산을 만족하는 조합 중 가장 저렴한(추정 RAM → p95 순) 설정을 선택해
+  tuned_profiles_file 에 기록 → 앱 시작 시 load_profiles() 로 해당 컬렉션에 적용
+- ※ 로컬 모드는 HNSW/양자화 없이 전수 검색하므로 recall 이 항상 1.0 (서버에서 실행)
+"""
+
+import asyncio
+import itertools
+import time
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from qdrant_client import AsyncQdrantClient, models
+from repositories.bulk_upsert import bulk_upsert
+from repositories.collection_profile import (
+    CollectionProfile,
+    estimate_memory,
+    profile_for,
+    save_profile,
+)
+from repositories.payload_index import PayloadIndexManager
+from repositories.vector_codec import ArrayBatch, as_float32
+from services.recall_eval import RecallEvaluator, exact_topk
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TuningTarget:
+    k: int = 10
+    recall: float = 0.95  # 최소 recall@k
+    p95_ms: Optional[float] = None  # 지연시간 예산 (None 이면 제한 없음)
+
+
+@dataclass
+class TuningGrid:
+    m: Sequence[int] = (8, 16, 32)
+    quantization: Sequence[Optional[str]] = (None, "scalar", "binary")
+    hnsw_ef: Sequence[int] = (32, 64, 128, 256)
+    oversampling: Sequence[float] = (1.0, 2.0, 3.0)  # 양자화 조합에만 적용
+    ef_construct: int = 128
+
+
+@dataclass
+class Trial:
+    profile: CollectionProfile
+    recall: float
+    ndcg: float
+    p50_ms: float
+    p95_ms: float
+    ram_mb: float
+    disk_mb: float
+    meets: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **{k: v for k, v in asdict(self).items() if k != "profile"},
+            "m": self.profile.m,
+            "quantization": self.profile.quantization,
+            "hnsw_ef": self.profile.hnsw_ef,
+            "oversampling": self.profile.oversampling,
+        }
+
+
+@dataclass
+class TuningResult:
+    collection_name: str
+    target: TuningTarget
+    best: Optional[Trial]
+    trials: List[Trial] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "collection_name": self.collection_name,
+            "target": asdict(self.target),
+            "best": self.best.to_dict() if self.best else None,
+            "trials": [t.to_dict() for t in self.trials],
+        }
+
+
+class ProfileTuner:
+    """표본 기반 m / 양자화 / hnsw_ef / oversampling 탐색"""
+
+    def __init__(
+        self,
+        client: AsyncQdrantClient,
+        collection_name: str,
+        using: Optional[str] = None,
+        query_filter: Optional[models.Filter] = None,
+        sample_size: int = 10_000,
+        queries: int = 100,
+        grid: Optional[TuningGrid] = None,
+        index_timeout: float = 600.0,
+    ):
+        self.client = client
+        self.collection_name = collection_name
+        self.using = using
+        # services.query.search_by_city 처럼 필터 질의를 튜닝할 때 지정
+        self.query_filter = query_filter
+        self.sample_size = sample_size
+        self.queries = queries
+        self.grid = grid or TuningGrid()
+        self.index_timeout = index_timeout
+
+    async def sample(self) -> Tuple[np.ndarray, List[Any], np.ndarray]:
+        """(표본 벡터, 표본 payload, 질의 벡터) — 질의는 표본에서 떼어낸 포인트"""
+        rows, payloads, offset = [], [], None
+        while len(rows) < self.sample_size + self.queries:
+            records, offset = await self.client.scroll(
+                self.collection_name,
+                limit=min(1_000, self.sample_size + self.queries - len(rows)),
+                offset=offset,
+                with_payload=self.query_filter is not None,
+                with_vectors=[self.using] if self.using else True,
+            )
+            for record in records:
+                rows.append(record.vector[self.using] if self.using else record.vector)
+                payloads.append(record.payload)
+            if offset is None:
+                break
+        if len(rows) <= self.queries:
+            raise ValueError(
+                f"[{self.collection_name}] 표본이 부족합니다: {len(rows)}건"
+            )
+        vectors = as_float32(rows)
+        order = np.random.default_rng(0).permutation(len(vectors))
+        query_rows, corpus_rows = order[: self.queries], order[self.queries :]
+        return (
+            vectors[corpus_rows],
+            [payloads[i] for i in corpus_rows],
+            vectors[query_rows],
+        )
+
+    async def _distance(self) -> models.Distance:
+        info = await self.client.get_collection(self.collection_name)
+        params = info.config.params.vectors
+        if isinstance(params, dict):
+            params = params[self.using or ""]
+        return params.distance
+
+    async def _wait_indexed(self, collection_name: str) -> None:
+        """최적화(HNSW 구성) 완료까지 대기 → 미완료 세그먼트의 전수 검색이 측정을 왜곡하지 않도록"""
+        deadline = time.monotonic() + self.index_timeout
+        while time.monotonic() < deadline:
+            info = await self.client.get_collection(collection_name)
+            if info.status == models.CollectionStatus.GREEN:
+                return
+            await asyncio.sleep(1.0)
+        logger.warning(f"[{collection_name}] 인덱싱 대기 시간 초과")
+
+    def _search_variants(self, profile: CollectionProfile) -> List[CollectionProfile]:
+        oversampling = self.grid.oversampling if profile.quantization else (None,)
+        return [
+            replace(
+                profile,
+                hnsw_ef=ef,
+                oversampling=o,
+                rescore=True if profile.quantization else None,
+            )
+            for ef, o in itertools.product(self.grid.hnsw_ef, oversampling)
+        ]
+
+    async def run(self, target: Optional[TuningTarget] = None) -> TuningResult:
+        target = target or TuningTarget()
+        corpus, payloads, queries = await self.sample()
+        distance = await self._distance()
+        total = (await self.client.count(self.collection_name, exact=False)).count
+        dim = corpus.shape[1]
+        base = profile_for(self.collection_name)
+
+        # 필터 질의: 원본과 같은 payload 인덱스가 있어야 필터 + HNSW 경로가 운영과 같아짐
+        indexes = (
+            await PayloadIndexManager.existing_schemas(
+                self.client, self.collection_name
+            )
+            if self.query_filter is not None
+            else {}
+        )
+
+        truth = None
+        if self.query_filter is None:
+            rows, _ = exact_topk(corpus, queries, target.k, distance)
+            truth = rows.tolist()  # 임시 컬렉션 id = 표본 행 번호
+
+        trials: List[Trial] = []
+        tune_name = f"{self.collection_name}__tune"
+        try:
+            for m, quantization in itertools.product(
+                self.grid.m, self.grid.quantization
+            ):
+                profile = replace(
+                    base,
+                    name=f"tuned_{self.collection_name}",
+                    m=m,
+                    ef_construct=self.grid.ef_construct,
+                    quantization=quantization,
+                    # 양자화 시 원본은 디스크 (rescore 때만 읽음)
+                    on_disk=quantization is not None,
+                )
+                if await self.client.collection_exists(tune_name):
+                    await self.client.delete_collection(tune_name)
+                params = models.VectorParams(
+                    size=dim, distance=distance, on_disk=profile.on_disk
+                )
+                await self.client.create_collection(
+                    tune_name,
+                    vectors_config={self.using: params} if self.using else params,
+                    **profile.collection_kwargs(),
+                )
+                if indexes:
+                    await PayloadIndexManager().ensure(self.client, tune_name, indexes)
+                await bulk_upsert(
+                    self.client,
+                    tune_name,
+                    ArrayBatch.of(
+                        np.arange(len(corpus)),
+                        {self.using: corpus} if self.using else corpus,
+                        payloads=payloads if self.query_filter else None,
+                    ),
+                    wait=True,
+                )
+                await self._wait_indexed(tune_name)
+
+                evaluator = RecallEvaluator(
+                    self.client, tune_name, self.using, self.query_filter
+                )
+                if truth is None:
+                    truth = await evaluator.ground_truth(queries, target.k)
+                memory = estimate_memory(total, dim, profile)
+                for variant in self._search_variants(profile):
+                    report = await evaluator.evaluate(
+                        queries,
+                        truth,
+                        target.k,
+                        variant.search_params(),
+                        label=f"m={m} q={quantization} ef={variant.hnsw_ef} os={variant.oversampling}",
+                    )
+                    trial = Trial(
+                        variant,
+                        report.recall,
+                        report.ndcg,
+                        report.p50_ms,
+                        report.p95_ms,
+                        **memory,
+                    )
+                    trial.meets = trial.recall >= target.recall and (
+                        target.p95_ms is None or trial.p95_ms <= target.p95_ms
+                    )
+                    trials.append(trial)
+        finally:
+            if await self.client.collection_exists(tune_name):
+                await self.client.delete_collection(tune_name)
+
+        candidates = [t for t in trials if t.meets]
+        if candidates:
+            best = min(candidates, key=lambda t: (t.ram_mb, t.p95_ms))
+        else:
+            best = max(trials, key=lambda t: (t.recall, -t.p95_ms), default=None)
+            logger.warning(
+                f"[{self.collection_name}] 목표(recall≥{target.recall}, "
+                f"p95≤{target.p95_ms}ms)를 만족하는 조합 없음 → recall 최대 조합 선택"
+            )
+        logger.info(
+            f"[{self.collection_name}] 튜닝 결과: {best.to_dict() if best else None}"
+        )
+        return TuningResult(self.collection_name, target, best, trials)
+
+    def save(self, result: TuningResult, path: Optional[str] = None) -> None:
+        """선택된 프로파일을 tuned_profiles_file 에 기록하고 컬렉션에 연결"""
+        if result.best is None:
+            raise ValueError("저장할 튜닝 결과가 없습니다.")
+        written = save_profile(
+            result.best.profile,
+            result.collection_name,
+            path,
+            metrics={
+                k: v for k, v in result.best.to_dict().items() if k not in ("meets",)
+            },
+        )
+        logger.info(f"[{result.collection_name}] 프로파일 기록: {written}")
+
+
+if __name__ == "__main__":
+    # python -m services.profile_tuner <collection> [--recall 0.95] [--p95-ms 20] [--using dense]
+    #   [--filter '{"must": [{"key": "city", "match": {"value": "London"}}]}']
+    import argparse
+    import json
+    from core.vector_db import create_async_client
+
+    parser = argparse.ArgumentParser(description="HNSW/양자화 프로파일 튜닝")
+    parser.add_argument("collection_name")
+    parser.add_argument("--using", default=None)
+    parser.add_argument("--filter", default=None, help="질의 필터 (Qdrant Filter JSON)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--recall", type=float, default=0.95)
+    parser.add_argument("--p95-ms", type=float, default=None)
+    parser.add_argument("--sample", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--location", default=None, help='":memory:" 등 (기본: 서버)')
+    parser.add_argument("--output", default=None, help="프로파일 파일 (기본: 설정값)")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def main():
+        client = create_async_client(args.location)
+        try:
+            tuner = ProfileTuner(
+                client,
+                args.collection_name,
+                using=args.using,
+                query_filter=(
+                    models.Filter.model_validate(json.loads(args.filter))
+                    if args.filter
+                    else None
+                ),
+                sample_size=args.sample,
+                queries=args.queries,
+            )
+            result = await tuner.run(TuningTarget(args.k, args.recall, args.p95_ms))
+            print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+            if not args.dry_run:
+                tuner.save(result, args.output)
+        finally:
+            await client.close()
+
+    asyncio.run(main())
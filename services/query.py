@@ -1,56 +1,76 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import Filter, FieldCondition, MatchValue
+import asyncio
+from typing import List
+from qdrant_client.models import Filter, FieldCondition, MatchValue, ScoredPoint
 from pprint import pprint
-
-client = QdrantClient(url="http://localhost:6333")
-
-search_result = client.query_points(
-    collection_name="test_collection",
-    query=[0.2, 0.1, 0.9, 0.7],
-    query_filter=Filter(
-        must=[FieldCondition(key="city", match=MatchValue(value="London"))]
-    ),
-    with_payload=True,
-    limit=3,
-).points
-
-pprint(search_result)
+from repositories.vector_repository import vector_repository
+from services.hybrid_search import (
+    HybridSearchService,
+    openai_dense_embedder,
+    bm25_sparse_embedder,
+)
 
 # fastembed                 0.7.1
 from fastembed import SparseTextEmbedding
 
 bm25_model = SparseTextEmbedding(model_name="Qdrant/bm25")
+embedding_model = "text-embedding-3-small"
 
-# 1. 쿼리 문장 입력
-query = "키워드 검색"
-collection_name = "bm25_example"
 
-# 2. 쿼리용 BM25 임베딩 생성
-query_embedding = next(bm25_model.query_embed(query))
-# 검색 텍스트
-query = "키워드 검색"
+async def search_by_city(
+    query_vector: List[float],
+    city: str,
+    limit: int = 3,
+    collection_name: str = "test_collection",
+) -> List[ScoredPoint]:
+    """city 필터 검색"""
+    return await vector_repository.query(
+        collection_name=collection_name,
+        query=query_vector,
+        query_filter=Filter(
+            must=[FieldCondition(key="city", match=MatchValue(value=city))]
+        ),
+        with_payload=True,
+        limit=limit,
+    )
 
-import openai
 
-# Dense 쿼리 벡터
-q_dense = (
-    openai.embeddings.create(input=[query], model=embedding_model).data[0].embedding
-)
-# Sparse 쿼리 벡터
-q_sparse = next(bm25_model.query_embed(query))
-
-# Hybrid 검색
-results = client.search(
+# 요청마다 만들지 않고 공유 → 동시 질의가 같은 마이크로 배치 / single-flight 를 사용
+hybrid_service = HybridSearchService(
     collection_name="hybrid_example",
-    query_vector={"dense": q_dense},
-    query_sparse_vector={
-        "bm25": {
-            "indices": q_sparse.indices.tolist(),
-            "values": q_sparse.values.tolist(),
-        }
-    },
-    limit=3,
+    dense_embedder=openai_dense_embedder(embedding_model),
+    sparse_embedder=bm25_sparse_embedder(bm25_model),
 )
 
-for r in results:
-    print(r.payload["content"], r.score)
+
+async def hybrid_search(query: str, limit: int = 3) -> List[ScoredPoint]:
+    """dense + BM25 prefetch 후 서버측 RRF 결합 (query_points 1회)"""
+    return await hybrid_service.search_text(query, limit=limit)
+
+
+async def main():
+    from core.vector_db import init_vector_client, close_vector_client
+
+    await init_vector_client()
+    try:
+        # city 필터용 keyword 인덱스 (없으면 필터 검색마다 payload 스캔)
+        await vector_repository.ensure_payload_indexes(
+            "test_collection", {"city": "keyword"}
+        )
+        search_result = await search_by_city([0.2, 0.1, 0.9, 0.7], city="London")
+        pprint(search_result)
+
+        # 1. 쿼리 문장 입력
+        query = "키워드 검색"
+        # 2. 쿼리용 BM25 임베딩 생성
+        query_embedding = next(bm25_model.query_embed(query))
+        pprint(query_embedding)
+
+        results = await hybrid_search(query)
+        for r in results:
+            print(r.payload["content"], r.score)
+    finally:
+        await close_vector_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
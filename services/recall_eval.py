@@ -0,0 +1,321 @@
+# services/recall_eval.py
+"""
+검색 정확도(recall) 평가
+- 정답(ground truth): NumPy 로 정확한 top-k 계산 (cosine / dot / euclid / manhattan, 코퍼스를 chunk 단위로 나눠 메모리 제한)
+  또는 Qdrant SearchParams(exact=True) 전수 검색
+- 근사 검색(HNSW / 양자화 + 검색 파라미터) 결과와 비교해 recall@k, nDCG@k 를 지연시간과 함께 보고
+- HNSW ef / 양자화 rescore·oversampling 등 조정 시 속도-정확도 손실을 수치로 비교
+"""
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from qdrant_client import AsyncQdrantClient, models
+from repositories.vector_codec import as_float32
+import logging
+
+logger = logging.getLogger(__name__)
+
+DistanceType = Union[str, models.Distance]
+
+
+def _distance(distance: DistanceType) -> models.Distance:
+    if isinstance(distance, models.Distance):
+        return distance
+    return {d.value.lower(): d for d in models.Distance}[distance.lower()]
+
+
+# manhattan 임시 배열 최대 원소 수 (float32 16MB)
+_MANHATTAN_BLOCK = 1 << 22
+
+
+def _manhattan_scores(queries: np.ndarray, chunk: np.ndarray) -> np.ndarray:
+    """
+    −L1 거리 (질의 수 × chunk 행)
+    질의 × chunk × dim 브로드캐스트 대신 질의별 / 차원 구간별로 누적 → 임시 배열은 chunk × 구간 크기
+    """
+    step = max(_MANHATTAN_BLOCK // max(len(chunk), 1), 1)
+    scores = np.zeros((len(queries), len(chunk)), dtype=np.float32)
+    for i, query in enumerate(queries):
+        for d in range(0, chunk.shape[1], step):
+            scores[i] -= np.abs(chunk[:, d : d + step] - query[d : d + step]).sum(
+                axis=1
+            )
+    return scores
+
+
+def exact_topk(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    distance: DistanceType = models.Distance.COSINE,
+    chunk_size: int = 65_536,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    정확한 top-k (corpus 행 번호, 점수) — 가까운 순 정렬, 점수는 Qdrant 와 같은 값 (euclid/manhattan 은 거리)
+    corpus 를 chunk_size 행씩 나눠 (질의 수 × chunk_size) 점수 행렬만 메모리에 유지
+    """
+    distance = _distance(distance)
+    queries = as_float32(np.atleast_2d(queries))
+    k = min(k, len(corpus))
+    if distance == models.Distance.COSINE:
+        queries = queries / np.maximum(
+            np.linalg.norm(queries, axis=1, keepdims=True), 1e-12
+        )
+    euclid = distance == models.Distance.EUCLID
+    q_norm = (queries**2).sum(axis=1, keepdims=True)
+
+    best_idx = np.empty((len(queries), 0), dtype=np.int64)
+    best_val = np.empty((len(queries), 0), dtype=np.float32)
+    for start in range(0, len(corpus), chunk_size):
+        chunk = as_float32(corpus[start : start + chunk_size])
+        if distance == models.Distance.COSINE:
+            chunk = chunk / np.maximum(
+                np.linalg.norm(chunk, axis=1, keepdims=True), 1e-12
+            )
+        if distance == models.Distance.MANHATTAN:
+            scores = _manhattan_scores(queries, chunk)
+        elif euclid:
+            # 음수 거리^2 로 바꿔 "클수록 가까움" 으로 통일
+            scores = 2 * (queries @ chunk.T) - q_norm - (chunk**2).sum(axis=1)
+        else:
+            scores = queries @ chunk.T
+        # 이전 후보 + 이번 chunk 후보에서 top-k 유지
+        values = np.concatenate([best_val, scores], axis=1)
+        indices = np.concatenate(
+            [
+                best_idx,
+                np.broadcast_to(
+                    np.arange(start, start + len(chunk)), (len(queries), len(chunk))
+                ),
+            ],
+            axis=1,
+        )
+        if values.shape[1] > k:
+            take = np.argpartition(-values, k - 1, axis=1)[:, :k]
+            values = np.take_along_axis(values, take, axis=1)
+            indices = np.take_along_axis(indices, take, axis=1)
+        best_val, best_idx = values, indices
+
+    order = np.argsort(-best_val, axis=1, kind="stable")
+    best_idx = np.take_along_axis(best_idx, order, axis=1)
+    best_val = np.take_along_axis(best_val, order, axis=1)
+    if distance == models.Distance.MANHATTAN:
+        best_val = -best_val
+    elif euclid:
+        best_val = np.sqrt(np.maximum(-best_val, 0))
+    return best_idx, best_val
+
+
+def recall_at_k(
+    truth: Sequence[Sequence[Any]], found: Sequence[Sequence[Any]], k: int
+) -> float:
+    """질의별 |정답 top-k ∩ 결과 top-k| / k 평균"""
+    scores = [
+        len(set(t[:k]) & set(f[:k])) / max(min(k, len(t)), 1)
+        for t, f in zip(truth, found)
+    ]
+    return float(np.mean(scores)) if scores else 0.0
+
+
+def ndcg_at_k(
+    truth: Sequence[Sequence[Any]], found: Sequence[Sequence[Any]], k: int
+) -> float:
+    """정답 순위 기반 graded relevance (정답 1위 = k, k위 = 1) 의 nDCG@k 평균"""
+    discounts = 1 / np.log2(np.arange(2, k + 2))
+    scores = []
+    for t, f in zip(truth, found):
+        relevance = {point_id: k - rank for rank, point_id in enumerate(t[:k])}
+        ideal = float(
+            np.dot(
+                sorted(relevance.values(), reverse=True), discounts[: len(relevance)]
+            )
+        )
+        gains = [relevance.get(point_id, 0) for point_id in f[:k]]
+        dcg = float(np.dot(gains, discounts[: len(gains)]))
+        scores.append(dcg / ideal if ideal > 0 else 0.0)
+    return float(np.mean(scores)) if scores else 0.0
+
+
+@dataclass
+class RecallReport:
+    label: str
+    k: int
+    queries: int
+    recall: float
+    ndcg: float
+    p50_ms: float
+    p95_ms: float
+    mean_ms: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+async def load_vectors(
+    client: AsyncQdrantClient,
+    collection_name: str,
+    using: Optional[str] = None,
+    page_size: int = 1_000,
+) -> Tuple[List[models.ExtendedPointId], np.ndarray]:
+    """NumPy 정답 계산용: 컬렉션 전체 (id 목록, dense 행렬)"""
+    ids, rows, offset = [], [], None
+    while True:
+        records, offset = await client.scroll(
+            collection_name,
+            limit=page_size,
+            offset=offset,
+            with_payload=False,
+            with_vectors=[using] if using else True,
+        )
+        for record in records:
+            ids.append(record.id)
+            rows.append(record.vector[using] if using else record.vector)
+        if offset is None:
+            break
+    return ids, as_float32(rows)
+
+
+class RecallEvaluator:
+    """정답 대비 근사 query_points 결과의 recall@k / nDCG@k + 지연시간"""
+
+    def __init__(
+        self,
+        client: AsyncQdrantClient,
+        collection_name: str,
+        using: Optional[str] = None,
+        query_filter: Optional[models.Filter] = None,
+    ):
+        self.client = client
+        self.collection_name = collection_name
+        self.using = using
+        self.query_filter = query_filter
+
+    async def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        search_params: Optional[models.SearchParams] = None,
+    ) -> Tuple[List[List[models.ExtendedPointId]], List[float]]:
+        """질의별 (결과 id 목록, 지연시간 초) — 캐시를 거치지 않고 직접 호출"""
+        found, latencies = [], []
+        for query in as_float32(np.atleast_2d(queries)):
+            started = time.perf_counter()
+            response = await self.client.query_points(
+                self.collection_name,
+                query=query.tolist(),
+                using=self.using,
+                query_filter=self.query_filter,
+                search_params=search_params,
+                limit=k,
+                with_payload=False,
+            )
+            latencies.append(time.perf_counter() - started)
+            found.append([p.id for p in response.points])
+        return found, latencies
+
+    async def ground_truth(
+        self, queries: np.ndarray, k: int
+    ) -> List[List[models.ExtendedPointId]]:
+        """서버측 전수 검색 SearchParams(exact=True) 정답"""
+        found, _ = await self.search(queries, k, models.SearchParams(exact=True))
+        return found
+
+    async def evaluate(
+        self,
+        queries: np.ndarray,
+        truth: Sequence[Sequence[models.ExtendedPointId]],
+        k: int,
+        search_params: Optional[models.SearchParams] = None,
+        label: str = "default",
+    ) -> RecallReport:
+        found, latencies = await self.search(queries, k, search_params)
+        ms = np.asarray(latencies) * 1000
+        report = RecallReport(
+            label=label,
+            k=k,
+            queries=len(found),
+            recall=round(recall_at_k(truth, found, k), 4),
+            ndcg=round(ndcg_at_k(truth, found, k), 4),
+            p50_ms=round(float(np.percentile(ms, 50)), 3),
+            p95_ms=round(float(np.percentile(ms, 95)), 3),
+            mean_ms=round(float(ms.mean()), 3),
+        )
+        logger.info(f"[recall] {self.collection_name} {report}")
+        return report
+
+    async def compare(
+        self,
+        queries: np.ndarray,
+        truth: Sequence[Sequence[models.ExtendedPointId]],
+        k: int,
+        variants: Dict[str, Optional[models.SearchParams]],
+    ) -> List[RecallReport]:
+        """검색 파라미터 조합별 보고서 (label → SearchParams)"""
+        return [
+            await self.evaluate(queries, truth, k, params, label)
+            for label, params in variants.items()
+        ]
+
+
+async def _demo(
+    location: Optional[str] = ":memory:",
+    n: int = 5_000,
+    dim: int = 128,
+    queries: int = 50,
+    k: int = 10,
+):
+    """NumPy 정답 ↔ exact=True 정답 일치 확인 + hnsw_ef / 양자화 파라미터별 recall
+    ※ 로컬 모드는 항상 전수 검색이므로 recall=1.0, 차이는 서버(location=None)에서 확인"""
+    from core.vector_db import create_async_client
+
+    rng = np.random.default_rng(0)
+    corpus = rng.standard_normal((n, dim), dtype=np.float32)
+    query_set = rng.standard_normal((queries, dim), dtype=np.float32)
+    client = create_async_client(location)
+    collection_name = "recall_eval_demo"
+    try:
+        await client.create_collection(
+            collection_name,
+            vectors_config=models.VectorParams(
+                size=dim, distance=models.Distance.COSINE
+            ),
+        )
+        client.upload_collection(collection_name, corpus, ids=range(n), wait=True)
+
+        started = time.perf_counter()
+        rows, _ = exact_topk(corpus, query_set, k, "cosine", chunk_size=1_024)
+        print(f"numpy exact top-{k}: {(time.perf_counter() - started) * 1000:.1f} ms")
+        truth = rows.tolist()  # id = 행 번호 (load_vectors 사용시 ids[row] 로 변환)
+
+        evaluator = RecallEvaluator(client, collection_name)
+        server_truth = await evaluator.ground_truth(query_set, k)
+        print(f"numpy ↔ exact=True recall: {recall_at_k(truth, server_truth, k):.4f}")
+
+        reports = await evaluator.compare(
+            query_set,
+            truth,
+            k,
+            {
+                "exact": models.SearchParams(exact=True),
+                "ef=16": models.SearchParams(hnsw_ef=16),
+                "ef=128": models.SearchParams(hnsw_ef=128),
+                "quantized(no rescore)": models.SearchParams(
+                    quantization=models.QuantizationSearchParams(rescore=False)
+                ),
+            },
+        )
+        for report in reports:
+            print(report.to_dict())
+    finally:
+        await client.delete_collection(collection_name)
+        await client.close()
+
+
+if __name__ == "__main__":
+    # python -m services.recall_eval [server]
+    import sys
+
+    asyncio.run(_demo(None if sys.argv[1:] == ["server"] else ":memory:"))
@@ -0,0 +1,275 @@
+# services/search_bench.py
+"""
+벡터 검색 벤치마크 (로컬 모드 Qdrant)
+- 합성 코퍼스(포인트 수 / 차원 / payload 카디널리티 / sparse 어휘 크기 설정)를 시드해
+  실제 사용하는 질의 형태를 측정: dense, city 필터(query.py), dense+sparse 하이브리드, 배치 질의
+- 질의별 p50/p95/p99 지연시간과 처리량(qps)을 JSON 으로 출력 → 커밋 간 결과 비교
+- 로컬 모드(":memory:" / 디렉터리 경로)는 HNSW·payload 인덱스 없이 전수 계산하므로
+  절대값보다 같은 설정에서의 전/후 비교에 사용한다 (location=None 이면 vector_db_url 서버)
+"""
+
+import asyncio
+import json
+import platform
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import numpy as np
+from qdrant_client import models
+from repositories.hybrid_collection import HybridCollection
+from repositories.schema_manager import SchemaManager
+from repositories.search_cache import SearchCache
+from repositories.sparse_batch import SparseBatch
+from repositories.vector_codec import ArrayBatch
+from repositories.vector_repository import VectorRepository
+from services.hybrid_search import HybridSearchService
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCENARIOS = ("dense", "filtered", "hybrid", "batch")
+
+
+@dataclass
+class BenchConfig:
+    location: Optional[str] = ":memory:"  # ":memory:" | 디렉터리 경로 | None(서버)
+    collection_name: str = "search_bench"
+    points: int = 10_000
+    dim: int = 384
+    cities: int = 50  # payload city 카디널리티 (필터 선택도 ≈ 1/cities)
+    vocab: int = 5_000  # sparse 어휘 크기
+    nnz: int = 20  # 포인트당 sparse 항목 수
+    queries: int = 200
+    limit: int = 10
+    batch_size: int = 16  # batch 시나리오: query_batch_points 1회당 질의 수
+    concurrency: int = 1  # 동시에 실행하는 질의 수
+    warmup: int = 10
+    seed: int = 0
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(latencies: List[float], queries: int, elapsed: float) -> Dict[str, float]:
+    """지연시간(초) 목록 → ms 백분위 + 처리량"""
+    ms = np.asarray(latencies) * 1000
+    return {
+        "calls": len(latencies),
+        "queries": queries,
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "qps": round(queries / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+class SearchBench:
+    """합성 코퍼스 시드 + 질의 형태별 측정"""
+
+    def __init__(self, config: BenchConfig):
+        self.config = config
+        self.rng = np.random.default_rng(config.seed)
+        self.client = None
+        self.repository: Optional[VectorRepository] = None
+        self.collection: Optional[HybridCollection] = None
+
+    def _sparse(self, rows: int, nnz: int) -> SparseBatch:
+        # 어휘를 nnz 구간으로 나눠 구간마다 1개씩 → 정렬/중복 없는 행을 한 번에 생성
+        stride = self.config.vocab // nnz
+        indices = np.arange(nnz) * stride + self.rng.integers(0, stride, (rows, nnz))
+        return SparseBatch(
+            indptr=np.arange(0, rows * nnz + 1, nnz, dtype=np.int64),
+            indices=indices.ravel().astype(np.int32),
+            values=self.rng.random(rows * nnz, dtype=np.float32),
+        )
+
+    async def seed(self) -> float:
+        """코퍼스 생성/적재 → 적재 시간(초)"""
+        from core.vector_db import create_async_client
+
+        c = self.config
+        self.client = create_async_client(c.location)
+        # 캐시 적중이 측정을 왜곡하지 않도록 캐시 비활성화
+        self.repository = VectorRepository(self.client, cache=SearchCache(maxsize=0))
+        self.collection = HybridCollection(
+            c.collection_name, dense_dim=c.dim, manager=SchemaManager(self.repository)
+        )
+        await self.collection.ensure()
+        await self.repository.ensure_payload_indexes(
+            c.collection_name, {"city": "keyword"}
+        )
+
+        started = time.perf_counter()
+        chunk = 5_000
+        for start in range(0, c.points, chunk):
+            rows = min(chunk, c.points - start)
+            batch = ArrayBatch.of(
+                ids=np.arange(start, start + rows),
+                vectors={
+                    "dense": self.rng.standard_normal((rows, c.dim), dtype=np.float32)
+                },
+                sparse={"bm25": self._sparse(rows, c.nnz)},
+                payloads=[
+                    {"city": f"city_{i % c.cities}", "rank": int(i)}
+                    for i in range(start, start + rows)
+                ],
+            )
+            await self.collection.upsert(batch, wait=True)
+        return time.perf_counter() - started
+
+    async def _measure(
+        self, calls: List[Callable[[], Awaitable[Any]]], queries: int
+    ) -> Dict[str, float]:
+        """warmup 후 concurrency 제한으로 calls 실행 (queries: 전체 질의 수)"""
+        c = self.config
+        for call in calls[: c.warmup]:
+            await call()
+        latencies: List[float] = []
+        semaphore = asyncio.Semaphore(c.concurrency)
+
+        async def timed(call):
+            async with semaphore:
+                started = time.perf_counter()
+                await call()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(timed(call) for call in calls))
+        elapsed = time.perf_counter() - started
+        return summarize(latencies, queries, elapsed)
+
+    async def run(self, scenarios=SCENARIOS) -> Dict[str, Dict[str, float]]:
+        c = self.config
+        name = c.collection_name
+        dense = self.rng.standard_normal((c.queries, c.dim), dtype=np.float32)
+        sparse = self._sparse(c.queries, 4)
+        cities = [f"city_{i % c.cities}" for i in range(c.queries)]
+        hybrid = HybridSearchService(name, repository=self.repository)
+
+        def city_filter(city: str) -> models.Filter:
+            # services.query.search_by_city 와 같은 필터
+            return models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="city", match=models.MatchValue(value=city)
+                    )
+                ]
+            )
+
+        shapes: Dict[str, Any] = {
+            "dense": lambda i: self.repository.query(
+                name, dense[i], using="dense", limit=c.limit
+            ),
+            "filtered": lambda i: self.repository.query(
+                name,
+                dense[i],
+                using="dense",
+                query_filter=city_filter(cities[i]),
+                limit=c.limit,
+            ),
+            "hybrid": lambda i: hybrid.search(dense[i], sparse[i], limit=c.limit),
+        }
+
+        results = {}
+        for scenario in scenarios:
+            if scenario == "batch":
+
+                def batch_call(a: int):
+                    requests = [
+                        models.QueryRequest(
+                            query=dense[i].tolist(),
+                            using="dense",
+                            limit=c.limit,
+                            with_payload=True,
+                        )
+                        for i in range(a, min(a + c.batch_size, c.queries))
+                    ]
+                    # 앱 경로와 같이 repository 를 거침 (프로파일 / planner 검색 파라미터 적용)
+                    return lambda: self.repository.query_batch(name, requests)
+
+                calls = [batch_call(a) for a in range(0, c.queries, c.batch_size)]
+                results[scenario] = await self._measure(calls, c.queries)
+            else:
+                shape = shapes[scenario]
+                calls = [lambda i=i: shape(i) for i in range(c.queries)]
+                results[scenario] = await self._measure(calls, c.queries)
+            logger.info(f"[bench] {scenario}: {results[scenario]}")
+        return results
+
+    async def close(self) -> None:
+        if self.client is None:
+            return
+        for collection_name in await self.collection.manager.versions(
+            self.config.collection_name
+        ):
+            await self.client.delete_collection(collection_name)
+        await self.client.close()
+
+
+async def run_bench(
+    config: Optional[BenchConfig] = None, scenarios=SCENARIOS
+) -> Dict[str, Any]:
+    """시드 → 측정 → JSON 직렬화 가능한 결과"""
+    import qdrant_client
+
+    config = config or BenchConfig()
+    bench = SearchBench(config)
+    try:
+        seed_seconds = await bench.seed()
+        results = await bench.run(scenarios)
+    finally:
+        await bench.close()
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "qdrant_client": getattr(qdrant_client, "__version__", None),
+            "seed_seconds": round(seed_seconds, 3),
+        },
+        "config": asdict(config),
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    # python -m services.search_bench --points 20000 --dim 768 --output bench.json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Qdrant 검색 벤치마크")
+    defaults = BenchConfig()
+    for key, value in asdict(defaults).items():
+        if key == "location":
+            continue
+        parser.add_argument(
+            f"--{key.replace('_', '-')}", type=type(value), default=value
+        )
+    parser.add_argument(
+        "--location", default=":memory:", help='":memory:", 디렉터리 경로, "server"'
+    )
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--output", help="결과 JSON 파일 (미지정시 stdout)")
+    args = vars(parser.parse_args())
+
+    logging.basicConfig(level=logging.INFO)
+    output, scenarios = args.pop("output"), args.pop("scenarios").split(",")
+    if args["location"] == "server":
+        args["location"] = None
+    report = asyncio.run(run_bench(BenchConfig(**args), scenarios))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
@@ -0,0 +1,35 @@
+"""
+공통 테스트 설정
+- async def 테스트는 asyncio.run 으로 실행 (pytest-asyncio 없이)
+- client: 로컬 모드(:memory:) AsyncQdrantClient — 테스트마다 새 DB
+"""
+
+import asyncio
+import inspect
+import warnings
+import pytest
+from core.vector_db import create_async_client
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    kwargs = {
+        name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames
+    }
+    asyncio.run(pyfuncitem.obj(**kwargs))
+    return True
+
+
+@pytest.fixture(autouse=True)
+def _quiet_local_mode():
+    """로컬 모드의 "search_params / payload index 효과 없음" 경고 숨김"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+
+@pytest.fixture
+def client():
+    return create_async_client(":memory:")
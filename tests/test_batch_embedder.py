@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from repositories.single_flight import SingleFlight
+from services.batch_embedder import MicroBatchEmbedder
+
+
+def _recording(calls, delay=0.0):
+    async def batch_fn(texts):
+        calls.append(list(texts))
+        await asyncio.sleep(delay)
+        return [f"e:{t}" for t in texts]
+
+    return batch_fn
+
+
+def _without_flights(embedder):
+    # 배치 자체의 동작만 확인 (single-flight 공유 그룹 미사용)
+    embedder.flights = None
+    return embedder
+
+
+async def test_concurrent_requests_are_coalesced():
+    calls = []
+    embedder = MicroBatchEmbedder(
+        _recording(calls),
+        max_batch_size=100,
+        max_delay=0.01,
+        flights=SingleFlight("test"),
+    )
+    texts = [f"q{i % 5}" for i in range(20)]
+    results = await embedder.embed_many(texts)
+    assert results == [f"e:{t}" for t in texts]
+    # 같은 본문은 single-flight 로 합쳐지고, 서로 다른 본문 5건은 한 배치로
+    assert calls == [[f"q{i}" for i in range(5)]]
+    stats = embedder.stats()
+    assert (stats["batches"], stats["items"], stats["requests"]) == (1, 5, 5)
+
+
+async def test_batches_are_split_at_max_batch_size():
+    calls = []
+    embedder = _without_flights(
+        MicroBatchEmbedder(_recording(calls), max_batch_size=4, max_delay=0.05)
+    )
+    results = await embedder.embed_many([f"q{i}" for i in range(10)])
+    assert results == [f"e:q{i}" for i in range(10)]
+    # 4건이 차면 대기 없이 전송, 남은 2건은 max_delay 후 전송
+    assert [len(c) for c in calls] == [4, 4, 2]
+
+
+async def test_duplicates_within_a_batch_are_computed_once():
+    calls = []
+    embedder = _without_flights(
+        MicroBatchEmbedder(_recording(calls), max_batch_size=100, max_delay=0.01)
+    )
+    results = await embedder.embed_many(["a", "b", "a", "a"])
+    assert results == ["e:a", "e:b", "e:a", "e:a"]
+    assert calls == [["a", "b"]]
+    assert embedder.stats()["requests"] == 4
+
+
+async def test_sync_batch_fn_and_errors_reach_every_caller():
+    def failing(texts):
+        raise RuntimeError("api down")
+
+    embedder = _without_flights(MicroBatchEmbedder(failing, max_delay=0.005))
+    results = await asyncio.gather(embedder("a"), embedder("b"), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert embedder.stats()["errors"] == 1
+
+
+async def test_result_count_mismatch_is_an_error():
+    async def short(texts):
+        return texts[:1]
+
+    embedder = _without_flights(MicroBatchEmbedder(short, max_delay=0.005))
+    with pytest.raises(RuntimeError):
+        await asyncio.gather(embedder("a"), embedder("b"))
@@ -0,0 +1,155 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from qdrant_client import models
+from api.v1.endpoints import search
+from repositories.search_cache import SearchCache
+from repositories.vector_repository import VectorRepository
+from schemas.search_schema import BatchSearchRequest, BatchSearchResponse
+from services import batch_search
+from services.batch_search import BatchSearchService
+
+
+class _Embedder:
+    """텍스트 길이로 dense 벡터를 만드는 가짜 임베더 (호출 기록)"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def embed_many(self, texts):
+        self.calls.append(list(texts))
+        return [[1.0, 0.0] if len(t) < 3 else [0.0, 1.0] for t in texts]
+
+
+async def _collection(client):
+    await client.create_collection(
+        "batch",
+        vectors_config={
+            "dense": models.VectorParams(size=2, distance=models.Distance.DOT)
+        },
+        sparse_vectors_config={"sparse": models.SparseVectorParams()},
+    )
+    await client.upsert(
+        "batch",
+        [
+            models.PointStruct(
+                id=1,
+                vector={
+                    "dense": [1.0, 0.0],
+                    "sparse": models.SparseVector(indices=[3], values=[1.0]),
+                },
+                payload={"city": "London"},
+            ),
+            models.PointStruct(
+                id=2,
+                vector={
+                    "dense": [0.0, 1.0],
+                    "sparse": models.SparseVector(indices=[7], values=[1.0]),
+                },
+                payload={"city": "Berlin"},
+            ),
+        ],
+    )
+
+
+async def test_mixed_queries_keep_request_order(client):
+    await _collection(client)
+    embedder = _Embedder()
+    service = BatchSearchService(
+        VectorRepository(client, cache=SearchCache(maxsize=16)),
+        dense_embedder=embedder,
+    )
+    response = await service.search(
+        BatchSearchRequest(
+            collection_name="batch",
+            using="dense",
+            queries=[
+                {"text": "long text"},
+                {"vector": [1.0, 0.0], "limit": 1},
+                {"sparse": {"indices": [7], "values": [2.0]}, "using": "sparse"},
+                {"text": "ab"},
+                {
+                    "vector": [1.0, 0.0],
+                    "filter": {"must": [{"key": "city", "match": {"value": "Berlin"}}]},
+                },
+            ],
+        )
+    )
+    # 텍스트 질의는 한 번에 임베딩
+    assert embedder.calls == [["long text", "ab"]]
+    assert [[p.id for p in points] for points in response.results] == [
+        [2, 1],
+        [1],
+        [2],
+        [1, 2],
+        [2],
+    ]
+    assert response.results[1][0].payload == {"city": "London"}
+
+
+async def test_vector_only_batch_does_not_create_embedder(client):
+    await _collection(client)
+
+    def factory():
+        raise AssertionError("텍스트 질의가 없으면 임베더를 만들지 않음")
+
+    service = BatchSearchService(
+        VectorRepository(client, cache=SearchCache(maxsize=16)),
+        embedder_factory=factory,
+    )
+    response = await service.search(
+        BatchSearchRequest(
+            collection_name="batch",
+            using="dense",
+            with_payload=False,
+            queries=[{"vector": [0.0, 1.0], "score_threshold": 0.5}],
+        )
+    )
+    assert [(p.id, p.payload) for p in response.results[0]] == [(2, None)]
+
+
+def test_query_must_have_exactly_one_input():
+    for query in ({}, {"vector": [1.0], "text": "a"}):
+        with pytest.raises(ValidationError):
+            BatchSearchRequest(collection_name="batch", queries=[query])
+    with pytest.raises(ValidationError):
+        BatchSearchRequest(collection_name="batch", queries=[])
+
+
+def test_batch_endpoint(monkeypatch):
+    received = []
+
+    class _Service:
+        async def search(self, request):
+            received.append(request)
+            return BatchSearchResponse(
+                results=[[{"id": 1, "score": 0.5}] for _ in request.queries],
+                took_ms=1.0,
+            )
+
+    monkeypatch.setattr(batch_search, "batch_search_service", _Service())
+    app = FastAPI()
+    app.include_router(search.router, prefix="/search")
+    http = TestClient(app)
+
+    response = http.post(
+        "/search/batch",
+        json={
+            "collection_name": "batch",
+            "queries": [{"vector": [1.0, 0.0]}, {"text": "hello", "limit": 3}],
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        [{"id": 1, "score": 0.5, "payload": None}],
+        [{"id": 1, "score": 0.5, "payload": None}],
+    ]
+    assert received[0].queries[1].limit == 3
+
+    invalid = http.post(
+        "/search/batch",
+        json={"collection_name": "batch", "queries": [{"text": "a", "vector": [1]}]},
+    )
+    assert invalid.status_code == 422
+    assert len(received) == 1
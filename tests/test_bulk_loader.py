@@ -0,0 +1,131 @@
+import json
+import uuid
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from qdrant_client import QdrantClient, models
+from repositories.bulk_loader import BulkLoader, LoadSource
+from repositories.search_cache import SearchCache
+from repositories.vector_repository import VectorRepository
+
+N, DIM = 23, 3
+
+
+def _client():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "load",
+        vectors_config=models.VectorParams(size=DIM, distance=models.Distance.DOT),
+    )
+    return client
+
+
+def _files(tmp_path):
+    vectors = np.arange(N * DIM, dtype=np.float32).reshape(N, DIM)
+    np.save(tmp_path / "vectors.npy", vectors)
+    with open(tmp_path / "payloads.ndjson", "w") as f:
+        for i in range(N):
+            f.write(json.dumps({"i": i, "key": f"doc-{i}"}) + "\n")
+    return vectors
+
+
+def _loader(tmp_path, client, **kwargs):
+    options = {"vectors": str(tmp_path / "vectors.npy"), **kwargs}
+    return BulkLoader(
+        LoadSource(**options),
+        "load",
+        client=client,
+        batch_size=4,
+        rows_per_task=10,
+        repository=VectorRepository(cache=SearchCache(maxsize=16)),
+    )
+
+
+def test_npy_and_ndjson_rows_stay_aligned(tmp_path):
+    vectors = _files(tmp_path)
+    client = _client()
+    stats = _loader(
+        tmp_path,
+        client,
+        payloads=str(tmp_path / "payloads.ndjson"),
+        id_mode="row",
+        id_offset=100,
+    ).run()
+    # task 10 + 10 + 3 행, task 마다 4행 단위 배치 → 3 + 3 + 1
+    assert (stats.points, stats.tasks, stats.batches) == (N, 3, 7)
+    records = client.retrieve("load", list(range(100, 100 + N)), with_vectors=True)
+    assert len(records) == N
+    for record in records:
+        row = record.id - 100
+        assert record.payload["i"] == row
+        assert record.vector == vectors[row].tolist()
+
+
+def test_parquet_vectors_and_field_ids(tmp_path):
+    vectors = _files(tmp_path)
+    table = pa.table(
+        {
+            "embedding": pa.FixedSizeListArray.from_arrays(
+                pa.array(vectors.ravel()), DIM
+            ),
+            "key": [f"doc-{i}" for i in range(N)],
+        }
+    )
+    pq.write_table(table, tmp_path / "vectors.parquet", row_group_size=7)
+    pq.write_table(table.select(["key"]), tmp_path / "payloads.parquet")
+    client = _client()
+    loader = _loader(
+        tmp_path,
+        client,
+        vectors=str(tmp_path / "vectors.parquet"),
+        payloads=str(tmp_path / "payloads.parquet"),
+        vector_column="embedding",
+        id_mode="field",
+        id_field="key",
+    )
+    stats = loader.run(start=5, stop=17)
+    assert stats.points == 12
+    namespace = loader.source.namespace
+    point_id = str(uuid.uuid5(namespace, "doc-9"))
+    (record,) = client.retrieve("load", [point_id], with_vectors=True)
+    # id 컬럼은 payload 에도 남음
+    assert record.payload == {"key": "doc-9"}
+    assert record.vector == vectors[9].tolist()
+    assert client.count("load").count == 12
+
+
+def test_rerun_overwrites_the_same_points(tmp_path):
+    _files(tmp_path)
+    client = _client()
+    loader = _loader(tmp_path, client)
+    loader.run()
+    loader.run(stop=12)
+    assert client.count("load").count == N
+
+
+def test_load_invalidates_repository_cache(tmp_path):
+    _files(tmp_path)
+    loader = _loader(tmp_path, _client())
+    before = loader.repository.cache.generation("load")
+    loader.run()
+    assert loader.repository.cache.generation("load") > before
+
+
+def test_payload_row_mismatch_is_rejected(tmp_path):
+    _files(tmp_path)
+    with open(tmp_path / "short.ndjson", "w") as f:
+        f.write(json.dumps({"i": 0}) + "\n")
+    loader = _loader(tmp_path, _client(), payloads=str(tmp_path / "short.ndjson"))
+    with pytest.raises(ValueError):
+        loader.run()
+
+
+def test_memory_location_without_client_is_rejected(tmp_path):
+    _files(tmp_path)
+    with pytest.raises(ValueError):
+        BulkLoader(
+            LoadSource(vectors=str(tmp_path / "vectors.npy")),
+            "load",
+            location=":memory:",
+        )
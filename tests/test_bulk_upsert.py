@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient, models
+from repositories.bulk_upsert import BulkUpserter, BulkUpsertError, bulk_upsert
+from repositories.search_cache import SearchCache
+from repositories.vector_codec import ArrayBatch
+from repositories.vector_repository import VectorRepository
+
+
+def _points(n):
+    for i in range(n):
+        yield models.PointStruct(id=i, vector=[1, i], payload={"i": i})
+
+
+async def _create(client, name="bulk"):
+    await client.create_collection(
+        name,
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+    )
+
+
+async def test_repository_bulk_upsert_batches_and_reports_stats(client):
+    await _create(client)
+    repo = VectorRepository(client, cache=SearchCache(maxsize=16))
+    sizes = []
+    upsert = client.upsert
+
+    async def recording(*args, **kwargs):
+        sizes.append(len(kwargs["points"]))
+        return await upsert(*args, **kwargs)
+
+    client.upsert = recording
+    stats = await repo.bulk_upsert("bulk", _points(1_050), batch_size=100, wait=True)
+    assert sorted(sizes) == [50] + [100] * 10
+    assert (stats.points, stats.batches, stats.retries) == (1_050, 11, 0)
+    assert stats.failed_batches == stats.failed_points == 0
+    assert (await client.count("bulk")).count == 1_050
+
+
+async def test_array_batch_is_sliced(client):
+    await _create(client)
+    ids = np.arange(25)
+    vectors = np.column_stack([np.ones(25), ids]).astype(np.float32)
+    stats = await bulk_upsert(
+        client, "bulk", ArrayBatch.of(ids, vectors), batch_size=10, wait=True
+    )
+    assert (stats.points, stats.batches) == (25, 3)
+    assert (await client.count("bulk")).count == 25
+
+
+async def test_failed_batch_is_retried(client):
+    await _create(client)
+    failures = {"left": 2}
+    upsert = client.upsert
+
+    async def flaky(*args, **kwargs):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise ConnectionError("temporary")
+        return await upsert(*args, **kwargs)
+
+    client.upsert = flaky
+    stats = await bulk_upsert(
+        client, "bulk", _points(30), batch_size=10, retry_backoff=0, wait=True
+    )
+    assert (stats.points, stats.batches, stats.retries) == (30, 3, 2)
+    assert (await client.count("bulk")).count == 30
+
+
+async def test_exhausted_retries_raise_with_stats(client):
+    await _create(client)
+
+    async def broken(*args, **kwargs):
+        raise ConnectionError("down")
+
+    client.upsert = broken
+    with pytest.raises(BulkUpsertError) as info:
+        await bulk_upsert(
+            client,
+            "bulk",
+            _points(10),
+            batch_size=10,
+            max_retries=1,
+            retry_backoff=0,
+        )
+    stats = info.value.stats
+    assert (stats.retries, stats.failed_batches, stats.failed_points) == (1, 1, 10)
+    assert isinstance(info.value.cause, ConnectionError)
+
+
+async def test_errors_are_counted_when_not_raised(client):
+    await _create(client)
+
+    async def broken(*args, **kwargs):
+        raise ConnectionError("down")
+
+    client.upsert = broken
+    stats = await BulkUpserter(
+        client, "bulk", batch_size=5, max_retries=0, raise_on_error=False
+    ).upsert(_points(10))
+    assert stats.points == 0 and stats.failed_batches == 2
+
+
+async def test_sync_local_client_is_serialized():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "bulk",
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+    )
+    upserter = BulkUpserter(client, "bulk", batch_size=100, max_in_flight=4)
+    assert upserter._thread_lock is not None
+    stats = await upserter.upsert(_points(1_000))
+    assert stats.batches == 10 and client.count("bulk").count == 1_000
@@ -0,0 +1,58 @@
+import json
+import uuid
+import pyarrow.parquet as pq
+from qdrant_client import models
+from repositories.collection_export import CollectionExporter
+
+
+async def _collection(client, n=500, uuids=0):
+    await client.create_collection(
+        "export",
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+    )
+    ids = list(range(n)) + [str(uuid.UUID(int=i + 1)) for i in range(uuids)]
+    await client.upsert(
+        "export",
+        [
+            models.PointStruct(id=point_id, vector=[1, i], payload={"i": i})
+            for i, point_id in enumerate(ids)
+        ],
+    )
+    return ids
+
+
+async def test_plan_does_not_scroll_every_id(client):
+    await _collection(client, n=5_000)
+    scrolled = []
+    scroll = client.scroll
+
+    async def counting(*args, **kwargs):
+        scrolled.append(kwargs["limit"])
+        return await scroll(*args, **kwargs)
+
+    client.scroll = counting
+    state = await CollectionExporter(client, "export", "unused", shards=4).plan()
+    assert scrolled == [1]
+    assert len(state.shards) == 4 and state.shards[0].start is None
+    assert state.id_type == "int"
+
+
+async def test_sharded_export_covers_every_point_once(client, tmp_path):
+    ids = await _collection(client, n=500, uuids=3)
+    state = await CollectionExporter(
+        client, "export", tmp_path, format="ndjson", shards=4, page_size=64
+    ).run()
+    assert state.done and state.rows == len(ids) and state.id_type == "str"
+    exported = [
+        json.loads(line)["id"]
+        for path in sorted(tmp_path.glob("*.ndjson"))
+        for line in path.read_text().splitlines()
+    ]
+    assert sorted(map(str, exported)) == sorted(map(str, ids))
+
+
+async def test_parquet_export_with_uuid_ids(client, tmp_path):
+    ids = await _collection(client, n=20, uuids=2)
+    await CollectionExporter(client, "export", tmp_path, shards=2).run()
+    table = pq.read_table(sorted(tmp_path.glob("*.parquet")))
+    assert sorted(table.column("id").to_pylist()) == sorted(map(str, ids))
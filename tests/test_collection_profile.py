@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from qdrant_client import models
+from core.settings import vector_setting
+from repositories import collection_profile
+from repositories.collection_profile import (
+    CollectionProfile,
+    get_profile,
+    load_profiles,
+    profile_for,
+    register_profile,
+)
+from repositories.search_cache import SearchCache
+from repositories.vector_repository import VectorRepository
+from services.profile_tuner import ProfileTuner, TuningGrid, TuningTarget
+
+
+@pytest.fixture(autouse=True)
+def _restore_profiles(monkeypatch):
+    # 등록/지정 결과가 다른 테스트로 새지 않도록
+    monkeypatch.setattr(
+        collection_profile, "PROFILES", dict(collection_profile.PROFILES)
+    )
+    monkeypatch.setattr(
+        vector_setting, "collection_profiles", dict(vector_setting.collection_profiles)
+    )
+
+
+def test_profile_names_are_case_insensitive():
+    register_profile(CollectionProfile(name="Mixed_Case", m=8))
+    assert get_profile("Mixed_Case").m == 8
+    assert get_profile("mixed_case").m == 8
+    assert get_profile("HNSW") is get_profile("hnsw")
+
+
+async def test_tuned_profile_of_mixed_case_collection_is_usable(client, tmp_path):
+    rng = np.random.default_rng(0)
+    await client.create_collection(
+        "Docs",
+        vectors_config=models.VectorParams(size=4, distance=models.Distance.COSINE),
+    )
+    await client.upsert(
+        "Docs",
+        [
+            models.PointStruct(id=i, vector=v.tolist())
+            for i, v in enumerate(rng.standard_normal((60, 4)))
+        ],
+    )
+    tuner = ProfileTuner(
+        client,
+        "Docs",
+        sample_size=50,
+        queries=10,
+        grid=TuningGrid(m=(8,), quantization=(None,), hnsw_ef=(32,)),
+    )
+    result = await tuner.run(TuningTarget(k=5, recall=0.5))
+    assert result.best.profile.name == "tuned_Docs"
+
+    path = tmp_path / "profiles.json"
+    tuner.save(result, str(path))
+    assert load_profiles(str(path)) == {"Docs": "tuned_Docs"}
+    assert profile_for("Docs").name == "tuned_Docs"
+
+    repo = VectorRepository(client, cache=SearchCache(maxsize=0))
+    hits = await repo.query("Docs", [1.0, 0.0, 0.0, 0.0], limit=3)
+    assert len(hits) == 3
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from services.embedding_cache import CachedEmbedder, EmbeddingCache, SparseRow
+
+
+def _dense_fn(calls):
+    def embed(texts):
+        calls.append(list(texts))
+        return np.array([[len(t), ord(t[0])] for t in texts], dtype=np.float32)
+
+    return embed
+
+
+def test_dense_hits_come_from_disk_after_reopen(tmp_path):
+    calls = []
+    first = CachedEmbedder(
+        EmbeddingCache(str(tmp_path), "org/model:v1", hot_size=0), _dense_fn(calls)
+    )
+    expected = first.embed(["a", "bb", "a", "ccc"])
+    # 배치 내 중복은 한 번만 계산
+    assert calls == [["a", "bb", "ccc"]]
+
+    # 새 인스턴스 = 새 프로세스: memmap 에서 읽고 미스만 계산
+    cache = EmbeddingCache(str(tmp_path), "org/model:v1", hot_size=0)
+    second = CachedEmbedder(cache, _dense_fn(calls))
+    got = second.embed(["ccc", "a", "dddd", "bb"])
+    assert calls[1:] == [["dddd"]]
+    np.testing.assert_array_equal(got[[0, 1, 3]], expected[[3, 0, 1]])
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert len(cache.store) == 4
+
+
+def test_float16_store_and_dim_check(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "m", dtype="float16")
+    cache.put_many(["x"], [np.array([0.1, 0.2], dtype=np.float32)])
+    got = EmbeddingCache(str(tmp_path), "m").get_many(["x"])[0]
+    assert got.dtype == np.float32
+    np.testing.assert_allclose(got, [0.1, 0.2], atol=1e-3)
+    with pytest.raises(ValueError):
+        EmbeddingCache(str(tmp_path), "m", dim=3)
+
+
+def test_sparse_rows_round_trip(tmp_path):
+    rows = [
+        SparseRow(np.array([1, 4], np.uint32), np.array([0.5, 2.0], np.float32)),
+        SparseRow(np.array([], np.uint32), np.array([], np.float32)),
+        SparseRow(np.array([9], np.uint32), np.array([1.0], np.float32)),
+    ]
+    EmbeddingCache(str(tmp_path), "bm25", kind="sparse").put_many(["a", "b", "c"], rows)
+    cache = EmbeddingCache(str(tmp_path), "bm25", kind="sparse", hot_size=0)
+    found = cache.get_many(["c", "missing", "a", "b"])
+    assert sorted(found) == [0, 2, 3]
+    for pos, row in [(0, rows[2]), (2, rows[0]), (3, rows[1])]:
+        np.testing.assert_array_equal(found[pos].indices, row.indices)
+        np.testing.assert_array_equal(found[pos].values, row.values)
+
+
+def test_interrupted_append_keeps_complete_rows(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "m")
+    cache.put_many(["a", "b"], np.ones((2, 3), dtype=np.float32))
+    # keys.bin 기록 전 중단: 데이터 파일에만 남은 행은 무시되고 다음 append 에서 덮어씀
+    vectors = tmp_path / "m" / "dense" / "vectors.bin"
+    with open(vectors, "ab") as f:
+        f.write(np.full(3, 7, dtype=np.float32).tobytes())
+    reopened = EmbeddingCache(str(tmp_path), "m")
+    assert len(reopened.store) == 2
+    reopened.put_many(["c"], np.full((1, 3), 2, dtype=np.float32))
+    got = EmbeddingCache(str(tmp_path), "m").get_many(["a", "c"])
+    np.testing.assert_array_equal(got[1], [2, 2, 2])
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from qdrant_client import models
+from repositories.search_cache import SearchCache
+from repositories.vector_repository import VectorRepository
+from services.fanout_search import OK, ERROR, TIMEOUT, FanoutSearchService
+
+SLOW = "fanout_slow"
+
+
+class _SlowService(FanoutSearchService):
+    async def _query_one(self, target, *args):
+        if target.collection_name == SLOW:
+            await asyncio.sleep(1.0)
+        return await super()._query_one(target, *args)
+
+
+async def _setup(client, names, distance=models.Distance.COSINE):
+    for n, name in enumerate(names):
+        await client.create_collection(
+            name, vectors_config=models.VectorParams(size=2, distance=distance)
+        )
+        await client.upsert(
+            name,
+            [models.PointStruct(id=j, vector=[1.0, 0.1 * (j + n)]) for j in range(3)],
+        )
+    return VectorRepository(client, cache=SearchCache(maxsize=0))
+
+
+def _statuses(result):
+    return {s.collection_name: s.status for s in result.statuses}
+
+
+async def test_deadline_returns_partial_results(client):
+    repository = await _setup(client, ["fanout_a", "fanout_b", SLOW])
+    service = _SlowService(repository, deadline=0.1)
+    started = time.perf_counter()
+    result = await service.search(
+        [1.0, 0.0], ["fanout_a", SLOW, "fanout_b", "fanout_missing"], limit=4
+    )
+    assert time.perf_counter() - started < 0.5
+    assert _statuses(result) == {
+        "fanout_a": OK,
+        SLOW: TIMEOUT,
+        "fanout_b": OK,
+        "fanout_missing": ERROR,
+    }
+    assert result.partial
+    assert len(result.hits) == 4
+    assert {h.collection_name for h in result.hits} == {"fanout_a", "fanout_b"}
+
+
+async def test_score_merge_resolves_distances_within_deadline(client):
+    repository = await _setup(
+        client, ["fanout_a", "fanout_b"], distance=models.Distance.EUCLID
+    )
+    get_collection = client.get_collection
+
+    async def slow_get_collection(collection_name, **kwargs):
+        # 거리 척도 조회가 느린 컬렉션도 deadline 에서 잘려야 함
+        if collection_name == "fanout_b":
+            await asyncio.sleep(1.0)
+        return await get_collection(collection_name, **kwargs)
+
+    client.get_collection = slow_get_collection
+    service = FanoutSearchService(repository, deadline=0.1, merge="score")
+    started = time.perf_counter()
+    result = await service.search([1.0, 0.0], ["fanout_a", "fanout_b"], limit=2)
+    assert time.perf_counter() - started < 0.5
+    assert _statuses(result) == {"fanout_a": OK, "fanout_b": TIMEOUT}
+    # euclid 는 거리 → 가까운 포인트가 높은 점수
+    assert [h.point.id for h in result.hits] == [0, 1]
+    assert result.hits[0].score > result.hits[1].score
+    assert service._distances == {("fanout_a", None): models.Distance.EUCLID}
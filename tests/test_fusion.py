@@ -0,0 +1,81 @@
+from collections import defaultdict
+import numpy as np
+import pytest
+from services import fusion
+
+
+def naive_rrf(lists, weights, k=60):
+    scores = defaultdict(float)
+    for weight, (ids, _) in zip(weights, lists):
+        for rank, point_id in enumerate(ids, start=1):
+            scores[point_id] += weight / (k + rank)
+    return scores
+
+
+def naive_weighted(lists, weights):
+    scores = defaultdict(float)
+    for weight, (ids, values) in zip(weights, lists):
+        low, high = min(values), max(values)
+        for point_id, value in zip(ids, values):
+            normalized = (value - low) / (high - low) if high > low else 1.0
+            scores[point_id] += weight * normalized
+    return scores
+
+
+def naive_dbsf(lists, weights):
+    scores = defaultdict(float)
+    for weight, (ids, values) in zip(weights, lists):
+        values = np.asarray(values, dtype=np.float64)
+        mean, std = values.mean(), values.std()
+        for point_id, value in zip(ids, values):
+            normalized = (
+                np.clip((value - (mean - 3 * std)) / (6 * std), 0, 1) if std else 0.5
+            )
+            scores[point_id] += weight * normalized
+    return scores
+
+
+def _lists(mixed_ids: bool):
+    rng = np.random.default_rng(7)
+    lists = []
+    for _ in range(3):
+        ids = rng.choice(50, size=20, replace=False).tolist()
+        if mixed_ids:
+            # 5 와 "5" 는 서로 다른 포인트
+            ids = [str(i) if i % 3 == 0 else i for i in ids]
+        values = np.sort(rng.random(20))[::-1].tolist()
+        lists.append((ids, values))
+    return lists
+
+
+def _ranked(ids, values):
+    dtype = np.int64 if all(isinstance(i, int) for i in ids) else object
+    return fusion.RankedList(
+        np.asarray(ids, dtype=dtype), np.asarray(values, dtype=np.float32)
+    )
+
+
+@pytest.mark.parametrize("mixed_ids", [False, True])
+@pytest.mark.parametrize(
+    "method, naive",
+    [("rrf", naive_rrf), ("weighted", naive_weighted), ("dbsf", naive_dbsf)],
+)
+def test_fusion_matches_naive_reference(method, naive, mixed_ids):
+    lists = _lists(mixed_ids)
+    weights = [1.0, 0.5, 2.0]
+    expected = naive(lists, weights)
+    fused = fusion.fuse(
+        [_ranked(*pair) for pair in lists], method, weights=weights, limit=10
+    )
+
+    assert len(fused.ids) == 10
+    got = dict(zip(fused.ids.tolist(), fused.scores.tolist()))
+    for point_id, score in got.items():
+        assert score == pytest.approx(expected[point_id], rel=1e-5)
+    # 상위 10 건 점수가 기준 구현의 상위 10 건 점수와 같음 (동점 순서는 무관)
+    top = sorted(expected.values(), reverse=True)[:10]
+    assert sorted(got.values(), reverse=True) == pytest.approx(top, rel=1e-5)
+
+
+def test_empty_input():
+    assert len(fusion.fuse([], "rrf").ids) == 0
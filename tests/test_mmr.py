@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from qdrant_client import models
+from core.settings import VectorSettings
+from repositories.search_cache import SearchCache
+from repositories.vector_repository import VectorRepository
+from services.hybrid_search import HybridSearchService
+from services.mmr import mmr, mmr_points, point_vectors
+
+
+def naive_mmr(vectors, relevance, k, lambda_):
+    """정의 그대로의 O(k · N²) 구현"""
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    rel = (relevance - relevance.min()) / (relevance.max() - relevance.min())
+    selected = []
+    while len(selected) < k:
+        best, best_score = None, -np.inf
+        for i in range(len(vectors)):
+            if i in selected:
+                continue
+            penalty = max((unit[i] @ unit[j] for j in selected), default=-np.inf)
+            score = (
+                lambda_ * rel[i]
+                if not selected
+                else lambda_ * rel[i] - (1 - lambda_) * penalty
+            )
+            if score > best_score:
+                best, best_score = i, score
+        selected.append(best)
+    return selected
+
+
+@pytest.mark.parametrize("lambda_", [0.0, 0.3, 0.7, 1.0])
+def test_mmr_matches_naive_reference(lambda_):
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((40, 16)).astype(np.float32)
+    relevance = rng.random(40).astype(np.float32)
+    got = mmr(vectors, 10, lambda_, relevance=relevance).tolist()
+    assert got == naive_mmr(vectors, relevance, 10, lambda_)
+
+
+def test_point_vectors_match_array_conversion():
+    rng = np.random.default_rng(2)
+    vectors = rng.standard_normal((5, 8)).astype(np.float32)
+    points = [
+        models.ScoredPoint(id=i, version=0, score=0.0, vector={"dense": v.tolist()})
+        for i, v in enumerate(vectors)
+    ]
+    np.testing.assert_array_equal(point_vectors(points, "dense"), vectors)
+
+
+def test_points_without_dense_vector_are_kept():
+    points = [
+        models.ScoredPoint(id=1, version=0, score=0.9, vector={"dense": [1.0, 0.0]}),
+        models.ScoredPoint(id=2, version=0, score=0.8, vector={"dense": [1.0, 0.01]}),
+        # sparse 만 매칭된 후보: dense 벡터 없음
+        models.ScoredPoint(
+            id=3,
+            version=0,
+            score=0.7,
+            vector={"bm25": models.SparseVector(indices=[0], values=[1.0])},
+        ),
+        models.ScoredPoint(id=4, version=0, score=0.6, vector={}),
+    ]
+    vectors = point_vectors(points, "dense")
+    assert vectors.shape == (4, 2) and not vectors[2:].any()
+
+    ranked = mmr_points(points, 3, 0.5, using="dense")
+    # 2 는 1 과 거의 같으므로 유사도 0 인 3 이 먼저 선택됨
+    assert [p.id for p in ranked] == [1, 3, 4]
+    assert all(p.vector is None for p in ranked)
+    assert points[0].vector is not None
+
+
+def test_settings_reject_out_of_range_mmr_lambda():
+    with pytest.raises(ValidationError):
+        VectorSettings(vector_db_url="http://localhost:6333", mmr_lambda=1.5)
+    assert (
+        VectorSettings(vector_db_url="http://localhost:6333", mmr_lambda=0.5).mmr_lambda
+        == 0.5
+    )
+
+
+async def test_hybrid_mmr_relevance_is_fused_score(client):
+    await client.create_collection(
+        "hybrid",
+        vectors_config={
+            "dense": models.VectorParams(size=2, distance=models.Distance.COSINE)
+        },
+        sparse_vectors_config={"bm25": models.SparseVectorParams()},
+    )
+    # dense 로는 0 이 가장 가깝지만 sparse 는 9 → 1 순으로 강하게 선호
+    await client.upsert(
+        "hybrid",
+        [
+            models.PointStruct(
+                id=i,
+                vector={
+                    "dense": [1.0, i / 10],
+                    "bm25": models.SparseVector(indices=[0], values=[float(i)]),
+                },
+            )
+            for i in range(1, 10)
+        ],
+    )
+    service = HybridSearchService(
+        "hybrid", VectorRepository(client, cache=SearchCache(maxsize=0))
+    )
+    dense, sparse = [1.0, 0.0], models.SparseVector(indices=[0], values=[1.0])
+    fused = await service.search(dense, sparse, limit=9)
+    # λ=1 → 관련도만 사용: fusion 순위와 같아야 함 (dense 코사인 순위가 아님)
+    ranked = await service.search(dense, sparse, limit=9, mmr_lambda=1.0)
+    assert [p.id for p in ranked] == [p.id for p in fused]
@@ -0,0 +1,146 @@
+from datetime import datetime
+from types import SimpleNamespace
+from qdrant_client import models
+from repositories.payload_index import PayloadIndexManager, filter_fields, same_schema
+from repositories.search_cache import SearchCache
+from repositories.vector_repository import VectorRepository
+
+
+class _IndexedClient:
+    """payload_schema 를 돌려주는 최소 클라이언트 (로컬 모드는 payload 인덱스를 만들지 않음)"""
+
+    def __init__(self, schemas):
+        self.schemas = dict(schemas)
+        self.created, self.deleted = [], []
+
+    async def get_collection(self, collection_name):
+        payload_schema = {
+            key: models.PayloadIndexInfo(
+                data_type=(
+                    schema
+                    if isinstance(schema, models.PayloadSchemaType)
+                    else schema.type
+                ),
+                params=None if isinstance(schema, models.PayloadSchemaType) else schema,
+                points=0,
+            )
+            for key, schema in self.schemas.items()
+        }
+        return SimpleNamespace(payload_schema=payload_schema)
+
+    async def create_payload_index(
+        self, collection_name, field_name, field_schema, wait
+    ):
+        self.created.append(field_name)
+        self.schemas[field_name] = field_schema
+
+    async def delete_payload_index(self, collection_name, field_name, wait):
+        self.deleted.append(field_name)
+        del self.schemas[field_name]
+
+
+def _match(key, value):
+    return models.FieldCondition(key=key, match=models.MatchValue(value=value))
+
+
+def test_filter_fields_infers_index_types():
+    query_filter = models.Filter(
+        must=[
+            _match("city", "London"),
+            models.FieldCondition(key="year", range=models.Range(gte=2000, lt=2010)),
+            models.FieldCondition(key="price", range=models.Range(lte=9.5)),
+            models.FieldCondition(
+                key="at", range=models.DatetimeRange(gte=datetime(2024, 1, 1))
+            ),
+        ],
+        should=[
+            models.FieldCondition(key="tags", match=models.MatchAny(any=[1, 2])),
+            models.Filter(must=[_match("draft", False)]),
+        ],
+        must_not=[
+            models.NestedCondition(
+                nested=models.Nested(
+                    key="authors", filter=models.Filter(must=[_match("name", "x")])
+                )
+            )
+        ],
+    )
+    assert dict(filter_fields(query_filter)) == {
+        "city": models.PayloadSchemaType.KEYWORD,
+        "year": models.PayloadSchemaType.FLOAT,
+        "price": models.PayloadSchemaType.FLOAT,
+        "at": models.PayloadSchemaType.DATETIME,
+        "tags": models.PayloadSchemaType.INTEGER,
+        "draft": models.PayloadSchemaType.BOOL,
+        "authors[].name": models.PayloadSchemaType.KEYWORD,
+    }
+
+
+async def test_repository_records_filters_including_prefetch(client):
+    await client.create_collection(
+        "usage",
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+    )
+    repo = VectorRepository(
+        client, cache=SearchCache(maxsize=0), payload_indexes=PayloadIndexManager()
+    )
+    await repo.query("usage", [1, 0], query_filter=models.Filter(must=[_match("a", 1)]))
+    await repo.query(
+        "usage",
+        prefetch=[
+            models.Prefetch(query=[1, 0], filter=models.Filter(must=[_match("a", "x")]))
+        ],
+        query=models.FusionQuery(fusion=models.Fusion.RRF),
+    )
+    assert repo.payload_indexes.usage("usage") == {
+        "usage": {"a": {"integer": 1, "keyword": 1}}
+    }
+    assert repo.payload_indexes.usage("other") == {}
+
+
+async def test_advise_and_apply_create_only_missing_indexes():
+    manager = PayloadIndexManager()
+    for _ in range(3):
+        manager.record("docs", models.Filter(must=[_match("city", "London")]))
+    manager.record("docs", models.Filter(must=[_match("year", 2020)]))
+    manager.record("docs", models.Filter(must=[_match("lang", "ko")]))
+    client = _IndexedClient(
+        {
+            "year": models.PayloadSchemaType.KEYWORD,
+            "lang": models.PayloadSchemaType.KEYWORD,
+        }
+    )
+    advice = await manager.advise(client, "docs")
+    assert [(a.key, a.status, a.uses) for a in advice] == [
+        ("city", "missing", 3),
+        ("year", "type_mismatch", 1),
+        ("lang", "exists", 1),
+    ]
+    assert [a.key for a in await manager.advise(client, "docs", min_uses=2)] == ["city"]
+    assert await manager.apply_advice(client, "docs") == ["city"]
+    assert client.deleted == []
+
+
+async def test_ensure_rebuilds_mismatches_only_when_asked():
+    tenant = models.KeywordIndexParams(
+        type=models.KeywordIndexType.KEYWORD, is_tenant=True
+    )
+    client = _IndexedClient({"tenant_id": models.PayloadSchemaType.KEYWORD})
+    manager = PayloadIndexManager()
+    assert await manager.ensure(client, "docs", {"tenant_id": tenant}) == []
+    assert await manager.ensure(
+        client, "docs", {"tenant_id": tenant}, rebuild=True
+    ) == ["tenant_id"]
+    assert client.deleted == ["tenant_id"]
+    assert await manager.ensure(client, "docs", {"tenant_id": tenant}) == []
+
+
+def test_same_schema_compares_declared_flags():
+    keyword = models.PayloadSchemaType.KEYWORD
+    tenant = models.KeywordIndexParams(
+        type=models.KeywordIndexType.KEYWORD, is_tenant=True
+    )
+    assert same_schema(keyword, "keyword")
+    assert same_schema(tenant, keyword)
+    assert not same_schema(keyword, tenant)
+    assert not same_schema(keyword, "integer")
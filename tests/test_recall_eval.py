@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from qdrant_client import models
+from services import recall_eval
+from services.recall_eval import (
+    RecallEvaluator,
+    exact_topk,
+    load_vectors,
+    ndcg_at_k,
+    recall_at_k,
+)
+
+
+def _naive(corpus, queries, k, distance):
+    if distance == "cosine":
+        unit = lambda x: x / np.linalg.norm(x, axis=1, keepdims=True)
+        scores = unit(queries) @ unit(corpus).T
+    elif distance == "dot":
+        scores = queries @ corpus.T
+    elif distance == "euclid":
+        scores = -np.linalg.norm(queries[:, None] - corpus[None], axis=2)
+    else:
+        scores = -np.abs(queries[:, None] - corpus[None]).sum(axis=2)
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+@pytest.mark.parametrize("distance", ["cosine", "dot", "euclid", "manhattan"])
+def test_exact_topk_matches_brute_force_across_chunks(distance, monkeypatch):
+    # manhattan 구간 누적 경로도 여러 구간으로 나뉘도록
+    monkeypatch.setattr(recall_eval, "_MANHATTAN_BLOCK", 64)
+    rng = np.random.default_rng(0)
+    corpus = rng.standard_normal((300, 12)).astype(np.float32)
+    queries = rng.standard_normal((7, 12)).astype(np.float32)
+    rows, scores = exact_topk(corpus, queries, 10, distance, chunk_size=64)
+    np.testing.assert_array_equal(rows, _naive(corpus, queries, 10, distance))
+    if distance == "euclid":
+        expected = np.linalg.norm(corpus[rows[0]] - queries[0], axis=1)
+        np.testing.assert_allclose(scores[0], expected, rtol=1e-4)
+    if distance == "manhattan":
+        expected = np.abs(corpus[rows[0]] - queries[0]).sum(axis=1)
+        np.testing.assert_allclose(scores[0], expected, rtol=1e-5)
+
+
+def test_recall_and_ndcg():
+    truth = [[1, 2, 3], [4, 5, 6]]
+    assert recall_at_k(truth, truth, 3) == 1.0
+    assert recall_at_k(truth, [[3, 9, 8], [6, 5, 4]], 3) == pytest.approx(2 / 3)
+    assert ndcg_at_k(truth, truth, 3) == 1.0
+    # 같은 집합이라도 순서가 틀리면 nDCG < 1
+    assert 0 < ndcg_at_k(truth, [[3, 2, 1], [4, 5, 6]], 3) < 1
+    assert ndcg_at_k(truth, [[7, 8, 9], [7, 8, 9]], 3) == 0.0
+
+
+async def test_numpy_truth_matches_exact_search(client):
+    rng = np.random.default_rng(1)
+    corpus = rng.standard_normal((200, 8)).astype(np.float32)
+    queries = rng.standard_normal((5, 8)).astype(np.float32)
+    await client.create_collection(
+        "recall",
+        vectors_config={
+            "dense": models.VectorParams(size=8, distance=models.Distance.COSINE)
+        },
+    )
+    await client.upsert(
+        "recall",
+        [
+            models.PointStruct(id=i, vector={"dense": v.tolist()})
+            for i, v in enumerate(corpus)
+        ],
+    )
+    ids, loaded = await load_vectors(client, "recall", using="dense", page_size=64)
+    assert len(ids) == 200
+    # cosine 컬렉션은 저장 시 정규화
+    unit = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    np.testing.assert_allclose(loaded[np.argsort(ids)], unit, rtol=1e-5)
+
+    evaluator = RecallEvaluator(client, "recall", using="dense")
+    rows, _ = exact_topk(corpus, queries, 5, "cosine")
+    assert await evaluator.ground_truth(queries, 5) == rows.tolist()
+    reports = await evaluator.compare(
+        queries,
+        rows.tolist(),
+        5,
+        {"default": None, "ef": models.SearchParams(hnsw_ef=16)},
+    )
+    assert [r.label for r in reports] == ["default", "ef"]
+    # 로컬 모드는 항상 전수 검색
+    assert all(r.recall == 1.0 and r.ndcg == 1.0 and r.queries == 5 for r in reports)
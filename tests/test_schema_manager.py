@@ -0,0 +1,104 @@
+import pytest
+from qdrant_client import models
+from repositories.schema_manager import CollectionSchema, SchemaManager
+from repositories.search_cache import SearchCache
+from repositories.vector_repository import VectorRepository
+
+
+def _schema(distance=models.Distance.COSINE):
+    return CollectionSchema(
+        name="docs", vectors=models.VectorParams(size=2, distance=distance)
+    )
+
+
+def _points(n=5):
+    return [models.PointStruct(id=i, vector=[1, i], payload={"i": i}) for i in range(n)]
+
+
+def _manager(client):
+    return SchemaManager(VectorRepository(client, cache=SearchCache(maxsize=16)))
+
+
+async def _distance(manager, name="docs"):
+    info = await manager.client.get_collection(name)
+    return info.config.params.vectors.distance
+
+
+async def test_create_rebuild_and_rollback(client):
+    manager = _manager(client)
+    created = await manager.apply(_schema())
+    assert (created.action, created.collection_name) == ("create", "docs_v1")
+    assert (await manager.apply(_schema())).action == "noop"
+    await manager.repository.upsert("docs", _points())
+
+    rebuilt = await manager.apply(_schema(models.Distance.DOT))
+    assert (rebuilt.action, rebuilt.previous) == ("rebuild", "docs_v1")
+    assert await manager.aliases() == {"docs": "docs_v2"}
+    assert (await manager.client.count("docs")).count == 5
+    assert await _distance(manager) == models.Distance.DOT
+
+    assert await manager.rollback("docs") == "docs_v1"
+    assert await _distance(manager) == models.Distance.COSINE
+    assert await manager.rollback("docs") is None
+
+
+async def test_apply_invalidates_cached_results(client):
+    manager = _manager(client)
+    await manager.apply(_schema())
+    repo = manager.repository
+    await repo.upsert("docs", _points())
+    await repo.query("docs", [1, 0], limit=3)
+    await manager.apply(_schema(models.Distance.DOT))
+    await repo.query("docs", [1, 0], limit=3)
+    await manager.rollback("docs")
+    await repo.query("docs", [1, 0], limit=3)
+    assert repo.cache.stats()["hits"] == 0
+
+
+async def test_failed_copy_keeps_current_version(client):
+    manager = _manager(client)
+    await manager.apply(_schema())
+    await manager.repository.upsert("docs", _points())
+
+    def broken(record):
+        raise RuntimeError("transform failed")
+
+    with pytest.raises(RuntimeError):
+        await manager.apply(_schema(models.Distance.DOT), transform=broken)
+    assert await manager.aliases() == {"docs": "docs_v1"}
+    assert await manager.versions("docs") == ["docs_v1"]
+
+
+async def test_legacy_collection_is_kept_until_alias_swap(client):
+    manager = _manager(client)
+    client = manager.client
+    await client.create_collection(
+        "docs",
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+    )
+    await client.upsert("docs", _points())
+
+    result = await manager.apply(_schema(models.Distance.DOT))
+    assert (result.collection_name, result.previous) == ("docs_v2", "docs_v1")
+    assert await manager.rollback("docs") == "docs_v1"
+    assert (await client.count("docs")).count == 5
+    assert await _distance(manager) == models.Distance.COSINE
+
+
+async def test_failed_legacy_alias_swap_preserves_data(client):
+    manager = _manager(client)
+    client = manager.client
+    await client.create_collection(
+        "docs",
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+    )
+    await client.upsert("docs", _points())
+
+    async def broken_swap(alias, collection_name):
+        raise RuntimeError("alias update failed")
+
+    manager._swap_alias = broken_swap
+    with pytest.raises(RuntimeError):
+        await manager.apply(_schema(models.Distance.DOT))
+    assert await manager.versions("docs") == ["docs_v1"]
+    assert (await client.count("docs_v1")).count == 5
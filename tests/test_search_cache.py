@@ -0,0 +1,139 @@
+import pytest
+from qdrant_client import models
+from repositories.query_planner import QueryPlanner
+from repositories.search_cache import SearchCache
+from repositories.vector_repository import VectorRepository
+from services.hybrid_search import HybridSearchService
+
+
+async def _repository(client, **kwargs):
+    await client.create_collection(
+        "cache",
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+    )
+    await client.upsert(
+        "cache",
+        [
+            models.PointStruct(id=i, vector=[1, i], payload={"a": i % 2})
+            for i in range(4)
+        ],
+    )
+    return VectorRepository(client, cache=SearchCache(maxsize=16), **kwargs)
+
+
+async def test_cached_results_are_detached_copies(client):
+    repo = await _repository(client)
+    first = await repo.query("cache", [1, 0], limit=2)
+    first[0].payload["a"] = "mutated"
+    second = await repo.query("cache", [1, 0], limit=2)
+    assert repo.cache.stats()["hits"] == 1
+    assert second[0].payload["a"] != "mutated"
+
+
+@pytest.mark.parametrize("write", ["upsert", "bulk_upsert", "delete"])
+async def test_writes_invalidate_cached_results(client, write):
+    repo = await _repository(client)
+    before = await repo.query("cache", [1, 0], limit=10)
+    if write == "upsert":
+        await repo.upsert("cache", [models.PointStruct(id=9, vector=[1, 0])])
+    elif write == "bulk_upsert":
+        await repo.bulk_upsert(
+            "cache", [models.PointStruct(id=9, vector=[1, 0])], wait=True
+        )
+    else:
+        await repo.delete("cache", [0])
+    after = await repo.query("cache", [1, 0], limit=10)
+    assert repo.cache.stats()["hits"] == 0
+    assert len(after) == len(before) + (-1 if write == "delete" else 1)
+
+
+async def test_writes_invalidate_planner_counts(client):
+    repo = await _repository(client, planner=QueryPlanner(count_ttl=60.0))
+    query_filter = models.Filter(
+        must=[models.FieldCondition(key="a", match=models.MatchValue(value=1))]
+    )
+    counts = []
+
+    async def plan():
+        plan, _ = await repo._plan("cache", query_filter, 10)
+        counts.append((plan.cardinality, plan.cached))
+
+    await plan()
+    await plan()
+    await repo.upsert(
+        "cache", [models.PointStruct(id=9, vector=[1, 0], payload={"a": 1})]
+    )
+    await plan()
+    assert counts == [(2, False), (2, True), (3, False)]
+
+
+async def test_cache_hit_skips_planning(client):
+    # count_ttl=0: planner 의 count 캐시가 아니라 결과 캐시 때문에 건너뛰는지 확인
+    repo = await _repository(client, planner=QueryPlanner(count_ttl=0))
+    query_filter = models.Filter(
+        must=[models.FieldCondition(key="a", match=models.MatchValue(value=1))]
+    )
+    calls = []
+    count = repo.client.count
+
+    async def counting(*args, **kwargs):
+        calls.append(kwargs.get("count_filter"))
+        return await count(*args, **kwargs)
+
+    repo.client.count = counting
+    await repo.query("cache", [1, 0], query_filter=query_filter, limit=2)
+    planned = len(calls)
+    await repo.query("cache", [1, 0], query_filter=query_filter, limit=2)
+    assert planned == 2 and len(calls) == planned
+
+
+async def test_hybrid_cache_hit_skips_prefetch_planning(client):
+    await client.create_collection(
+        "hybrid",
+        vectors_config={
+            "dense": models.VectorParams(size=2, distance=models.Distance.COSINE)
+        },
+        sparse_vectors_config={"bm25": models.SparseVectorParams()},
+    )
+    await client.upsert(
+        "hybrid",
+        [
+            models.PointStruct(
+                id=i,
+                vector={
+                    "dense": [1, i],
+                    "bm25": models.SparseVector(indices=[0], values=[float(i + 1)]),
+                },
+                payload={"a": i % 2},
+            )
+            for i in range(4)
+        ],
+    )
+    repo = VectorRepository(
+        client, cache=SearchCache(maxsize=16), planner=QueryPlanner(count_ttl=0)
+    )
+    counts, prefetches = [], []
+    count, query_points = client.count, client.query_points
+
+    async def counting(*args, **kwargs):
+        counts.append(kwargs.get("count_filter"))
+        return await count(*args, **kwargs)
+
+    async def querying(*args, **kwargs):
+        prefetches.append(kwargs["prefetch"])
+        return await query_points(*args, **kwargs)
+
+    client.count, client.query_points = counting, querying
+    service = HybridSearchService("hybrid", repo)
+    query_filter = models.Filter(
+        must=[models.FieldCondition(key="a", match=models.MatchValue(value=1))]
+    )
+    dense, sparse = [1, 0], models.SparseVector(indices=[0], values=[1.0])
+    first = await service.search(dense, sparse, limit=2, query_filter=query_filter)
+    assert len(counts) == 2
+    # 계획된 파라미터는 dense 분기에만 (sparse 분기는 그대로)
+    assert [branch.params is not None for branch in prefetches[0]] == [True, False]
+
+    second = await service.search(dense, sparse, limit=2, query_filter=query_filter)
+    assert [p.id for p in second] == [p.id for p in first]
+    assert len(counts) == 2 and len(prefetches) == 1
@@ -0,0 +1,83 @@
+import asyncio
+from repositories.single_flight import SingleFlight
+from services.batch_embedder import MicroBatchEmbedder
+
+
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight("test")
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    results = await asyncio.gather(*(flights.do("k", work, 21) for _ in range(5)))
+    assert results == [42] * 5
+    assert calls == [21]
+    assert flights.stats()["collapsed"] == 4
+    assert flights.in_flight == 0
+
+
+async def test_cancelling_one_waiter_keeps_execution_for_others():
+    flights = SingleFlight("test")
+    started = asyncio.Event()
+
+    async def work():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.create_task(flights.do("k", work))
+    second = asyncio.create_task(flights.do("k", work))
+    await started.wait()
+    first.cancel()
+    assert await second == "done"
+    assert first.cancelled()
+    assert flights.stats()["cancelled"] == 0
+
+
+async def test_cancelling_all_waiters_cancels_execution():
+    flights = SingleFlight("test")
+    started = asyncio.Event()
+    finished = []
+
+    async def work():
+        started.set()
+        await asyncio.sleep(10)
+        finished.append(True)
+
+    waiters = [asyncio.create_task(flights.do("k", work)) for _ in range(3)]
+    await started.wait()
+    # fan-out deadline 처럼 모든 호출자가 시간 초과로 취소
+    _, pending = await asyncio.wait(waiters, timeout=0.01)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert finished == []
+    assert flights.in_flight == 0
+    assert flights.stats()["cancelled"] == 1
+    # 취소된 실행에 합쳐지지 않고 새로 실행
+    assert await flights.do("k", asyncio.sleep, 0, "fresh") == "fresh"
+
+
+async def test_embedders_share_results_only_for_the_same_model():
+    flights = SingleFlight("test")
+    seen = {"a": [], "b": []}
+
+    def batch_fn(name):
+        async def embed(texts):
+            seen[name].extend(texts)
+            await asyncio.sleep(0.01)
+            return [f"{name}:{t}" for t in texts]
+
+        return embed
+
+    a1 = MicroBatchEmbedder(batch_fn("a"), max_delay=0, flights=flights, model_key="a")
+    a2 = MicroBatchEmbedder(batch_fn("a"), max_delay=0, flights=flights, model_key="a")
+    b = MicroBatchEmbedder(batch_fn("b"), max_delay=0, flights=flights, model_key="b")
+    results = await asyncio.gather(a1("q"), a2(" q "), b("q"))
+    assert results == ["a:q", "a:q", "b:q"]
+    assert len(seen["a"]) == 1 and seen["b"] == ["q"]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from qdrant_client import models
+from repositories.sparse_batch import SparseBatch
+
+
+def _rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n):
+        nnz = int(rng.integers(0, 6))
+        rows.append(
+            models.SparseVector(
+                indices=sorted(rng.choice(1_000, nnz, replace=False).tolist()),
+                values=rng.random(nnz).astype(np.float32).tolist(),
+            )
+        )
+    return rows
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 4096])
+def test_csr_round_trip(chunk_rows):
+    rows = _rows(50)
+    batch = SparseBatch.from_embeddings(iter(rows), chunk_rows=chunk_rows)
+    assert len(batch) == 50
+    assert batch.nnz == sum(len(r.indices) for r in rows)
+    assert batch.indices.dtype == np.uint32 and batch.values.dtype == np.float32
+    assert batch.to_models() == rows
+    for i, row in enumerate(batch):
+        assert row.indices.tolist() == rows[i].indices
+
+
+def test_slices_share_arrays_and_keep_row_boundaries():
+    rows = _rows(20)
+    batch = SparseBatch.from_embeddings(rows)
+    part = batch[5:12]
+    assert len(part) == 7
+    assert part.indices is batch.indices and part.values is batch.values
+    assert part.to_models() == rows[5:12]
+    assert part[1:3].to_models() == rows[6:8]
+    assert batch[-1].values.tolist() == rows[-1].values
+    assert part.nbytes < batch.nbytes
+
+
+def test_empty_and_invalid_input():
+    empty = SparseBatch.from_embeddings([])
+    assert len(empty) == 0 and empty.to_models() == []
+    with pytest.raises(ValueError):
+        SparseBatch(np.zeros(0, np.int64), np.zeros(0), np.zeros(0))
+    with pytest.raises(ValueError):
+        SparseBatch(np.zeros(2, np.int64), np.zeros(1), np.zeros(2))
+    with pytest.raises(ValueError):
+        SparseBatch.from_embeddings(_rows(4))[0:4:2]
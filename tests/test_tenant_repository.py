@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from qdrant_client import models
+from repositories.search_cache import SearchCache
+from repositories.tenant_repository import POINT_KEY, TenantRepository
+from repositories.vector_codec import ArrayBatch
+from repositories.vector_repository import VectorRepository
+
+COLLECTIONS = {"docs": "tenant_id"}
+
+
+async def _setup(client):
+    await client.create_collection(
+        "docs",
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+    )
+    base = VectorRepository(client, cache=SearchCache(maxsize=16))
+    return (
+        TenantRepository("acme", COLLECTIONS, base),
+        TenantRepository("globex", COLLECTIONS, base),
+    )
+
+
+async def test_same_id_from_two_tenants_does_not_overwrite(client):
+    acme, globex = await _setup(client)
+    await acme.upsert(
+        "docs", [models.PointStruct(id=1, vector=[1, 0], payload={"v": "a"})]
+    )
+    await globex.bulk_upsert(
+        "docs",
+        ArrayBatch.of([1], np.array([[0, 1]], dtype=np.float32), payloads=[{"v": "g"}]),
+        wait=True,
+    )
+    assert (await client.count("docs")).count == 2
+    (hit,) = await acme.query("docs", [1, 0], limit=10)
+    assert hit.payload == {"v": "a", "tenant_id": "acme", POINT_KEY: 1}
+    (hit,) = await globex.query("docs", [1, 0], limit=10)
+    assert hit.payload["v"] == "g" and hit.payload[POINT_KEY] == 1
+
+
+async def test_reads_and_deletes_are_scoped_to_tenant(client):
+    acme, globex = await _setup(client)
+    for repo in (acme, globex):
+        await repo.upsert(
+            "docs",
+            [models.PointStruct(id=i, vector=[1, i]) for i in range(3)],
+        )
+    records, _ = await globex.scroll("docs")
+    assert {r.payload["tenant_id"] for r in records} == {"globex"}
+    (batch,) = await acme.query_batch(
+        "docs", [models.QueryRequest(query=[1, 0], limit=10, with_payload=True)]
+    )
+    assert {p.payload["tenant_id"] for p in batch} == {"acme"}
+
+    await globex.delete("docs", [0, 1])
+    assert await acme.count("docs") == 3
+    assert await globex.count("docs") == 1
+
+
+async def test_writing_another_tenants_payload_is_rejected(client):
+    acme, _ = await _setup(client)
+    with pytest.raises(ValueError):
+        await acme.upsert(
+            "docs",
+            [models.PointStruct(id=1, vector=[1, 0], payload={"tenant_id": "globex"})],
+        )
+
+
+async def test_group_lookup_is_scoped_to_tenant(client):
+    acme, globex = await _setup(client)
+    await client.create_collection(
+        "chunks",
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+    )
+    for repo in (acme, globex):
+        await repo.upsert(
+            "docs",
+            [
+                models.PointStruct(
+                    id="doc-1", vector=[1, 0], payload={"title": repo.tenant_id}
+                )
+            ],
+        )
+    await acme.upsert(
+        "chunks",
+        [
+            models.PointStruct(id=i, vector=[1, i], payload={"doc_id": "doc-1"})
+            for i in range(3)
+        ],
+    )
+    (group,) = await acme.query_groups(
+        "chunks", "doc_id", [1, 0], limit=5, with_lookup="docs"
+    )
+    assert group.id == "doc-1"
+    assert group.lookup.payload["title"] == "acme"
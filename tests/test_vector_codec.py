@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient, models
+from repositories.sparse_batch import SparseBatch, SparseRowView
+from repositories.vector_codec import ArrayBatch, to_query
+
+
+def _sparse_rows():
+    return [
+        SparseRowView(np.array([1, 5]), np.array([0.5, 1.5])),
+        SparseRowView(np.array([], dtype=np.int64), np.array([])),
+        SparseRowView(np.array([7]), np.array([2.0])),
+    ]
+
+
+def test_array_batch_round_trips_through_local_qdrant():
+    dense = np.arange(6, dtype=np.float64).reshape(3, 2) + 1
+    batch = ArrayBatch.of(
+        np.array([10, 11, 12]),
+        {"dense": dense},
+        sparse={"bm25": iter(_sparse_rows())},
+        payloads=[{"i": 0}, None, {"i": 2}],
+    )
+    assert isinstance(batch.sparse["bm25"], SparseBatch)
+
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "codec",
+        vectors_config={
+            "dense": models.VectorParams(size=2, distance=models.Distance.DOT)
+        },
+        sparse_vectors_config={"bm25": models.SparseVectorParams()},
+    )
+    client.upsert("codec", batch.to_models())
+    records = client.retrieve("codec", [10, 11, 12], with_vectors=True)
+    by_id = {r.id: r for r in records}
+    for row, point_id in enumerate([10, 11, 12]):
+        vector = by_id[point_id].vector
+        assert vector["dense"] == dense[row].tolist()
+        expected = _sparse_rows()[row]
+        if expected.indices.size:
+            assert vector["bm25"].indices == expected.indices.tolist()
+            assert vector["bm25"].values == expected.values.tolist()
+    assert by_id[10].payload == {"i": 0}
+
+
+def test_unnamed_vector_is_sent_as_plain_list():
+    vectors = np.ones((2, 3), dtype=np.float32)
+    batch = ArrayBatch.of([1, 2], vectors).to_models()
+    assert batch.ids == [1, 2] and batch.vectors == [[1.0] * 3] * 2
+
+
+def test_slice_is_a_view():
+    vectors = np.zeros((10, 2), dtype=np.float32)
+    part = ArrayBatch.of(np.arange(10), vectors).slice(4, 7)
+    assert len(part) == 3 and np.shares_memory(part.dense[""], vectors)
+
+
+def test_shape_mismatch_is_rejected():
+    with pytest.raises(ValueError):
+        ArrayBatch.of([1, 2, 3], np.zeros((2, 4)))
+    with pytest.raises(ValueError):
+        ArrayBatch.of([1, 2], np.zeros((2, 4)), payloads=[{}])
+
+
+def test_to_query_converts_arrays():
+    assert to_query(np.array([1, 2], dtype=np.float64)) == [1.0, 2.0]
+    sparse = to_query(SparseRowView(np.array([3]), np.array([0.5])))
+    assert isinstance(sparse, models.SparseVector) and sparse.indices == [3]
+    with pytest.raises(ValueError):
+        to_query(np.zeros((2, 2)))